@@ -0,0 +1,142 @@
+"""Benchmarks throughput, latency and drop rate of each module.
+
+Each module (after flattening and filtering with --filter, as in `generate.py`)
+is sampled for --count examples or --max_seconds seconds, whichever comes first.
+Examples are sampled with `generate.sample_example`, so runs with the same
+--seed sample the same examples and can be compared.
+
+Usage (from the repository root):
+
+```shell
+python -m benchmarks.benchmark_modules --filter=polynomials --output=out.json
+```
+
+The results are written as JSON: a dict with the run settings, and a list with
+an entry per module containing examples per second, median and 99th percentile
+latency per example (in milliseconds), the drop rate (fraction of samples
+rejected by `generate.sample_from_module`, by reason), and the peak resident
+set size of the process so far (in megabytes).
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import json
+import platform
+import sys
+import timeit
+
+# Dependency imports
+from absl import app
+from absl import flags
+from absl import logging
+import generate
+import numpy as np
+import six
+
+try:
+  import resource  # Not available on Windows.
+except ImportError:
+  resource = None
+
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_string('regime', 'train', 'Regime to benchmark the modules of')
+flags.DEFINE_integer('count', 200, 'Max num of examples per module')
+flags.DEFINE_float('max_seconds', 10, 'Max time per module, in seconds')
+flags.DEFINE_string('output', None,
+                    'Where to write the JSON results; stdout if not given')
+
+
+def _peak_rss_megabytes():
+  """Returns peak resident set size of this process, or None if unknown."""
+  if resource is None:
+    return None
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # Kilobytes on Linux, bytes on macOS.
+  if sys.platform == 'darwin':
+    peak /= 1024
+  return peak / 1024
+
+
+def benchmark_module(regime, module_name, count, max_seconds, seed):
+  """Benchmarks a single module.
+
+  Args:
+    regime: Key of `generate.filtered_modules`, e.g., 'train'.
+    module_name: Flattened module name, e.g., 'algebra__linear_1d'.
+    count: Maximum number of examples to sample (at least one is sampled).
+    max_seconds: Stop sampling once this much time has passed.
+    seed: Seed passed to `generate.sample_example`.
+
+  Returns:
+    Dict of results (see module docstring).
+  """
+  key = (regime, module_name)
+  generate.drop_stats.pop(key, None)
+  latencies = []
+  start = timeit.default_timer()
+  now = start
+  # Always sample at least one example, so that the statistics are defined.
+  while not latencies or (len(latencies) < count and now - start < max_seconds):
+    generate.sample_example(regime, module_name, len(latencies), seed)
+    before, now = now, timeit.default_timer()
+    latencies.append(now - before)
+  total_seconds = now - start
+  drop_counts = generate.drop_stats.pop(key)
+
+  num_dropped = sum(drop_counts[reason] for reason in generate.DROP_REASONS)
+  num_sampled = num_dropped + drop_counts['accepted']
+  latencies_ms = 1000 * np.asarray(latencies)
+  return collections.OrderedDict([
+      ('regime', regime),
+      ('module', module_name),
+      ('examples', len(latencies)),
+      ('seconds', total_seconds),
+      ('examples_per_second', len(latencies) / total_seconds),
+      ('latency_p50_ms', float(np.percentile(latencies_ms, 50))),
+      ('latency_p99_ms', float(np.percentile(latencies_ms, 99))),
+      ('drop_rate', num_dropped / num_sampled),
+      ('drops', collections.OrderedDict(
+          (reason, drop_counts[reason]) for reason in generate.DROP_REASONS)),
+      ('peak_rss_mb', _peak_rss_megabytes()),
+  ])
+
+
+def main(unused_argv):
+  generate.init_modules()
+  seed = generate.get_seed()
+
+  results = []
+  for module_name in six.iterkeys(generate.filtered_modules[FLAGS.regime]):
+    result = benchmark_module(
+        FLAGS.regime, module_name, FLAGS.count, FLAGS.max_seconds, seed)
+    logging.info(
+        '%s/%s: %.1f examples/s, p50 %.2f ms, p99 %.2f ms, drop rate %.1f%%',
+        FLAGS.regime, module_name, result['examples_per_second'],
+        result['latency_p50_ms'], result['latency_p99_ms'],
+        100 * result['drop_rate'])
+    results.append(result)
+
+  output = collections.OrderedDict([
+      ('seed', seed),
+      ('regime', FLAGS.regime),
+      ('filter', FLAGS.filter),
+      ('count', FLAGS.count),
+      ('max_seconds', FLAGS.max_seconds),
+      ('python', platform.python_version()),
+      ('modules', results),
+  ])
+  if FLAGS.output:
+    with open(FLAGS.output, 'w') as json_file:
+      json.dump(output, json_file, indent=2)
+    logging.info('Written %s', FLAGS.output)
+  else:
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -0,0 +1,34 @@
+"""Tests for mathematics_dataset.benchmarks.benchmark_modules."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+# Dependency imports
+from absl.testing import absltest
+from benchmarks import benchmark_modules
+import generate
+
+
+class BenchmarkModulesTest(absltest.TestCase):
+
+  def testBenchmarkModule(self):
+    generate.init_modules()
+    result = benchmark_modules.benchmark_module(
+        'train', 'algebra__linear_1d', count=5, max_seconds=60, seed=1)
+    self.assertEqual(result['module'], 'algebra__linear_1d')
+    self.assertEqual(result['examples'], 5)
+    self.assertGreater(result['examples_per_second'], 0)
+    self.assertLessEqual(result['latency_p50_ms'], result['latency_p99_ms'])
+    self.assertEqual(result['drop_rate'], 0)
+    self.assertNotIn(('train', 'algebra__linear_1d'), generate.drop_stats)
+
+  def testBenchmarkModule_maxSeconds(self):
+    generate.init_modules()
+    result = benchmark_modules.benchmark_module(
+        'train', 'algebra__linear_1d', count=1000, max_seconds=0, seed=1)
+    self.assertEqual(result['examples'], 1)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,164 @@
+"""Counts questions of the test regimes that also appear in the training data.
+
+Given the --data_dir written by `generate_to_file.py` (in any --format), this
+builds an index of the question fingerprints (see `util/dedup.py`) of every
+module in the --index_regimes (by default all 'train*' subdirectories), then
+probes it with the questions of each module in the --probe_regimes, logging the
+number of overlapping questions per module and in total. Each file is read once,
+streaming, so the memory used is bounded by the index: with --index=exact,
+fingerprints beyond --max_in_memory are spilled to disk; with --index=bloom, a
+Bloom filter is used, which may over-count (see --false_positive_rate).
+
+Passing --match=example only counts overlaps where the answer is also the same.
+
+Passing --counts_output writes the per-module counts as JSON.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import json
+import os
+
+# Dependency imports
+from absl import app
+from absl import flags
+from absl import logging
+from util import dedup
+from util import example_files
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_string('data_dir', None,
+                    'Directory written by generate_to_file.py to check')
+flags.DEFINE_list('index_regimes', None,
+                  'Regimes to index; defaults to the subdirectories starting '
+                  'with "train"')
+flags.DEFINE_list('probe_regimes', ['interpolate', 'extrapolate'],
+                  'Regimes to count overlaps of with the indexed regimes')
+flags.DEFINE_enum('match', 'question', ['question', 'example'],
+                  'Whether to match on the question, or question and answer')
+flags.DEFINE_enum('index', 'exact', ['exact', 'bloom'],
+                  'Exact set of hashes spilled to disk, or a Bloom filter')
+flags.DEFINE_integer('max_in_memory', 2**22,
+                     'For --index=exact, num of hashes kept in memory before '
+                     'spilling to disk')
+flags.DEFINE_float('false_positive_rate', 1e-6,
+                   'For --index=bloom, the probability of wrongly counting a '
+                   'question as overlapping')
+flags.DEFINE_string('counts_output', None, 'Where to write the counts as JSON')
+
+
+def _fingerprint(question, answer, match):
+  if match == 'question':
+    return dedup.fingerprint(question, '')
+  else:
+    return dedup.fingerprint(question, answer)
+
+
+def build_index(paths, index, match):
+  """Adds the fingerprints of the examples in the files `paths` to `index`.
+
+  Args:
+    paths: Iterable of paths of files in `example_files.module_files`.
+    index: `dedup.FingerprintSet` or `dedup.BloomFilter`.
+    match: 'question' or 'example'; what to fingerprint.
+
+  Returns:
+    Number of examples read.
+  """
+  num_examples = 0
+  for path in paths:
+    for question, answer in example_files.iter_examples(path):
+      index.add(_fingerprint(question, answer, match))
+      num_examples += 1
+  return num_examples
+
+
+def count_overlaps(path, index, match):
+  """Returns `Counter` of examples in the file `path`, and those in `index`.
+
+  Args:
+    path: Path of file in `example_files.module_files`.
+    index: Index as filled by `build_index`.
+    match: As for `build_index`.
+
+  Returns:
+    `Counter` with keys 'examples' and 'overlaps'.
+  """
+  counts = collections.Counter(examples=0, overlaps=0)
+  for question, answer in example_files.iter_examples(path):
+    counts['examples'] += 1
+    if _fingerprint(question, answer, match) in index:
+      counts['overlaps'] += 1
+  return counts
+
+
+def _format_counts(counts):
+  return '{} of {} overlapping ({:.2%})'.format(
+      counts['overlaps'], counts['examples'],
+      counts['overlaps'] / max(1, counts['examples']))
+
+
+def main(unused_argv):
+  data_dir = os.path.expanduser(FLAGS.data_dir)
+  index_regimes = FLAGS.index_regimes
+  if index_regimes is None:
+    index_regimes = sorted(
+        regime for regime in os.listdir(data_dir)
+        if regime.startswith('train')
+        and os.path.isdir(os.path.join(data_dir, regime)))
+  if not index_regimes:
+    raise ValueError('No regimes to index in {}'.format(data_dir))
+  index_paths = [path
+                 for regime in index_regimes
+                 for _, path in example_files.module_files(
+                     os.path.join(data_dir, regime))]
+
+  if FLAGS.index == 'exact':
+    index = dedup.FingerprintSet(FLAGS.max_in_memory)
+  else:
+    capacity = sum(
+        example_files.count_examples(path) for path in index_paths)
+    index = dedup.BloomFilter(max(1, capacity), FLAGS.false_positive_rate)
+
+  results = collections.OrderedDict()
+  total_counts = collections.Counter()
+  try:
+    num_indexed = build_index(index_paths, index, FLAGS.match)
+    logging.info('Indexed %d examples (%d distinct) of %s', num_indexed,
+                 len(index), ', '.join(index_regimes))
+    for regime in FLAGS.probe_regimes:
+      regime_dir = os.path.join(data_dir, regime)
+      if not os.path.isdir(regime_dir):
+        logging.warning('Skipping missing regime %s', regime)
+        continue
+      for module_name, path in example_files.module_files(regime_dir):
+        counts = count_overlaps(path, index, FLAGS.match)
+        total_counts.update(counts)
+        results['{}/{}'.format(regime, module_name)] = dict(counts)
+        log = logging.warning if counts['overlaps'] else logging.info
+        log('%s/%s: %s', regime, module_name, _format_counts(counts))
+  finally:
+    index.close()
+  logging.info('Total: %s', _format_counts(total_counts))
+
+  if FLAGS.counts_output:
+    output = collections.OrderedDict([
+        ('data_dir', data_dir),
+        ('index_regimes', index_regimes),
+        ('match', FLAGS.match),
+        ('index', FLAGS.index),
+        ('modules', results),
+        ('total', dict(total_counts)),
+    ])
+    with open(FLAGS.counts_output, 'w') as json_file:
+      json.dump(output, json_file, indent=2)
+    logging.info('Written %s', FLAGS.counts_output)
+
+
+if __name__ == '__main__':
+  flags.mark_flag_as_required('data_dir')
+  app.run(main)
@@ -0,0 +1,51 @@
+"""Tests for mathematics_dataset.check_leakage."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+
+# Dependency imports
+from absl.testing import absltest
+from absl.testing import parameterized
+import check_leakage
+# Imported to check that the flags of the two scripts do not clash.
+import generate_to_file  # pylint: disable=unused-import
+from util import dedup
+
+
+_TRAIN = [('What is 1 + 1?', '2'), ('What is 2 + 2?', '4')]
+_TEST = [('What is 1 + 1?', '2'), ('What is 2 + 2?', '5'),
+         ('What is 3 + 3?', '6')]
+
+
+class CheckLeakageTest(parameterized.TestCase):
+
+  def setUp(self):
+    super(CheckLeakageTest, self).setUp()
+    self._dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self._dir)
+
+  def _write(self, name, examples):
+    path = os.path.join(self._dir, name + '.txt')
+    with open(path, 'w') as text_file:
+      for question, answer in examples:
+        text_file.write(question + '\n' + answer + '\n')
+    return path
+
+  @parameterized.parameters(('question', 2), ('example', 1))
+  def testCountOverlaps(self, match, overlaps):
+    train_path = self._write('train', _TRAIN)
+    test_path = self._write('test', _TEST)
+    index = dedup.FingerprintSet()
+    self.assertEqual(check_leakage.build_index([train_path], index, match), 2)
+    counts = check_leakage.count_overlaps(test_path, index, match)
+    self.assertEqual(counts['examples'], 3)
+    self.assertEqual(counts['overlaps'], overlaps)
+
+
+if __name__ == '__main__':
+  absltest.main()
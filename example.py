@@ -7,8 +7,52 @@ from __future__ import print_function
 import collections
 
 from util import composition
+from util import profiling
 
 
+# Maps name to tuple of `composition.Template`; see `register_templates`.
+_TEMPLATE_TABLES = collections.OrderedDict()
+
+
+def register_templates(name, templates):
+  """Registers a table of question (or description) templates.
+
+  Modules define their tables at module level, so that the templates are
+  parsed once, rather than rebuilding (and reparsing) a list of templates every
+  time a question is sampled, e.g.:
+
+  ```
+  _ADD_TEMPLATES = example.register_templates('arithmetic.add', [
+      'Calculate {p} + {q}.',
+      'What is {p} plus {q}?',
+  ])
+  ...
+  template = random.choice(_ADD_TEMPLATES)
+  ```
+
+  Args:
+    name: Unique name for the table, e.g., 'arithmetic.add'.
+    templates: List of template strings.
+
+  Returns:
+    Tuple of `composition.Template`, in the same order as `templates`.
+
+  Raises:
+    ValueError: If a different table was already registered under `name`.
+  """
+  table = tuple(composition.Template(template) for template in templates)
+  if name in _TEMPLATE_TABLES and _TEMPLATE_TABLES[name] != table:
+    raise ValueError('Templates {} already registered'.format(name))
+  _TEMPLATE_TABLES[name] = table
+  return table
+
+
+def template_tables():
+  """Returns dict mapping name to each table of templates registered."""
+  return _TEMPLATE_TABLES.copy()
+
+
+@profiling.timed('question')
 def question(context, template, **kwargs):
   """Makes a question, using the given context and template.
 
@@ -25,19 +69,20 @@ def question(context, template, **kwargs):
   Arguments:
     context: Instance of `composition.Context`, for extracting entities needed
         for describing the problem.
-    template: A string, like "Calculate the value of {exp}.".
+    template: A string, like "Calculate the value of {exp}." (possibly a
+        `composition.Template` from `register_templates`).
     **kwargs: A dictionary mapping arguments to values, e.g.,
         `{'exp': sympy.Add(2, 3, evaluate=False)}`.
 
   Returns:
-    String.
+    Instance of `composition.Description`; this is only formatted when converted
+    to a string.
   """
   assert isinstance(context, composition.Context)
   assert isinstance(template, str)
   prefix, kwargs = composition.expand_entities(context, **kwargs)
-  if prefix:
-    prefix += ' '
-  return prefix + template.format(**kwargs)
+  return composition.Description.join(
+      ' ', [prefix, composition.Description(template, kwargs)])
 
 
 Problem = collections.namedtuple('Problem', ('question', 'answer'))
@@ -0,0 +1,50 @@
+"""Tests for mathematics_dataset.example."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+# Dependency imports
+from absl.testing import absltest
+import example
+from modules import modules
+from util import composition
+import six
+
+
+class RegisterTemplatesTest(absltest.TestCase):
+
+  def testRegister(self):
+    table = example.register_templates(
+        'example_test.register', ['{p} + {q}', 'Add {p} to {q}.'])
+    self.assertEqual(table, ('{p} + {q}', 'Add {p} to {q}.'))
+    for template in table:
+      self.assertIsInstance(template, composition.Template)
+    self.assertEqual(table[1].field_names(), {'p', 'q'})
+    # Registering the same templates again is fine; different ones are not.
+    example.register_templates(
+        'example_test.register', ['{p} + {q}', 'Add {p} to {q}.'])
+    with self.assertRaisesRegexp(ValueError, 'already registered'):
+      example.register_templates('example_test.register', ['{p} - {q}'])
+
+  def testQuestion(self):
+    template = example.register_templates(
+        'example_test.question', ['What is {p} plus {q}?'])[0]
+    context = composition.Context()
+    question = example.question(context, template, p=2, q=3)
+    self.assertEqual(str(question), 'What is 2 plus 3?')
+
+  def testModuleTemplates(self):
+    # Importing `modules` registers the templates of all modules.
+    self.assertNotEmpty(modules.all_)
+    tables = example.template_tables()
+    self.assertIn('arithmetic.add', tables)
+    for name, table in six.iteritems(tables):
+      self.assertNotEmpty(table, name)
+      for template in table:
+        # Fields are named, so that they can be filled in from keywords.
+        self.assertNotIn('', template.field_names(), name)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -4,7 +4,10 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import bisect
 import collections
+import hashlib
+import random
 import textwrap
 
 # Dependency imports
@@ -13,8 +16,14 @@ from absl import flags
 from absl import logging
 import generate_settings
 from modules import modules
+from modules import train_test_split
+import numpy as np
+from sample import number
 import six
-from six.moves import range
+from sympy.core import assumptions as sympy_assumptions
+from util import composition
+from util import factorization
+from util import profiling
 
 
 FLAGS = flags.FLAGS
@@ -23,11 +32,33 @@ flags.DEFINE_string('filter', '', 'restrict to matching module names')
 flags.DEFINE_integer('per_train_module', 200000, 'Num of examples per train module')
 flags.DEFINE_integer('per_test_module', 1000, 'Num of examples per test module')
 flags.DEFINE_bool('show_dropped', False, 'Whether to print dropped questions')
+flags.DEFINE_integer('seed', None,
+                     'Seed for the generated data; random if not given')
+flags.DEFINE_bool('profile', False,
+                  'Whether to log the time spent per sampling stage and module')
+flags.DEFINE_enum('split_hash', 'blake2b', train_test_split.HASHES,
+                  'Hash assigning values to the train or test split; md5 gives '
+                  'the split of earlier versions of the dataset')
 
 
 filtered_modules = collections.OrderedDict([])
 counts = {}
 
+# Maps `(regime, module_name)` to a `collections.Counter` of the samples that
+# were accepted and dropped (by reason); see `sample_from_module`.
+drop_stats = collections.defaultdict(collections.Counter)
+DROP_REASONS = ('dropped_early', 'dropped_question', 'dropped_answer')
+
+# Whether `sample_example` is running (it is not reentrant).
+_sampling_example = False
+
+
+# SymPy's assumption system shuffles with the global `random` state, but only on
+# cache misses. This makes samples depend on what was sampled before in the same
+# process, so give it a separate generator.
+if hasattr(sympy_assumptions, 'shuffle'):
+  sympy_assumptions.shuffle = random.Random(0).shuffle
+
 
 def _make_entropy_fn(level, num_levels):
   """This returns a function that returns a subrange of entropy.
@@ -80,6 +111,8 @@ def init_modules(train_split=False):
   if filtered_modules:
     return  # already initialized
 
+  train_test_split.set_hash(FLAGS.split_hash)
+
   all_modules = collections.OrderedDict([])
   if train_split:
     all_modules['train-easy'] = modules.train(_make_entropy_fn(0, 3))
@@ -102,56 +135,263 @@ def init_modules(train_split=False):
     filtered_modules[regime_] = _filter_and_flatten(modules_)
 
 
-def sample_from_module(module):
+def sample_from_module(module, drop_counts=None):
   """Samples a problem, ignoring samples with overly long questions / answers.
 
+  Samples are abandoned early (while they are being built) once their question
+  must exceed the maximum length; see `composition.max_question_length`.
+
   Args:
     module: Callable returning a `Problem`.
+    drop_counts: Optional `collections.Counter` to which the number of accepted
+        samples ('accepted') and dropped samples (keyed by the reason, one of
+        `DROP_REASONS`) is added.
 
   Returns:
     Pair `(problem, num_dropped)`, where `problem` is an instance of `Problem`
     and `num_dropped` is an integer >= 0 indicating the number of samples that
     were dropped.
   """
+  if drop_counts is None:
+    drop_counts = collections.Counter()
   num_dropped = 0
   while True:
-    problem = module()
-    question = str(problem.question)
+    try:
+      with composition.max_question_length(
+          generate_settings.MAX_QUESTION_LENGTH):
+        problem = module()
+      with profiling.stage('question'):
+        question = str(problem.question)
+    except composition.QuestionTooLongError as e:
+      num_dropped += 1
+      drop_counts['dropped_early'] += 1
+      if FLAGS.show_dropped:
+        logging.warning('Dropping question early: %s', e)
+      continue
     if len(question) > generate_settings.MAX_QUESTION_LENGTH:
       num_dropped += 1
+      drop_counts['dropped_question'] += 1
       if FLAGS.show_dropped:
         logging.warning('Dropping question: %s', question)
       continue
-    answer = str(problem.answer)
+    with profiling.stage('answer'):
+      answer = str(problem.answer)
     if len(answer) > generate_settings.MAX_ANSWER_LENGTH:
       num_dropped += 1
+      drop_counts['dropped_answer'] += 1
       if FLAGS.show_dropped:
         logging.warning('Dropping question with answer: %s', answer)
       continue
+    drop_counts['accepted'] += 1
     return problem, num_dropped
 
 
-def main(unused_argv):
-  """Prints Q&As from modules according to FLAGS.filter."""
-  init_modules()
+def format_drop_stats(drop_counts):
+  """Returns summary of a `Counter` updated by `sample_from_module`."""
+  num_dropped = sum(drop_counts[reason] for reason in DROP_REASONS)
+  num_sampled = num_dropped + drop_counts['accepted']
+  return 'dropped {} of {} samples ({:.1%}): {}'.format(
+      num_dropped, num_sampled, num_dropped / max(1, num_sampled),
+      ', '.join('{} {}'.format(reason, drop_counts[reason])
+                for reason in DROP_REASONS))
+
+
+def _example_seed(seed, regime, module_name, index):
+  """Returns deterministic integer seed for a single example."""
+  key = '{}/{}/{}/{}'.format(seed, regime, module_name, index)
+  return int(hashlib.sha256(key.encode('utf-8')).hexdigest()[:16], 16)
+
 
-  text_wrapper = textwrap.TextWrapper(
-      width=80, initial_indent=' ', subsequent_indent='  ')
+def sample_example(regime, module_name, index, seed):
+  """Samples the example at position `index` of a module.
 
-  for regime, flat_modules in six.iteritems(filtered_modules):
+  The sampling state is derived from `(seed, regime, module_name, index)` only,
+  so any example can be regenerated without regenerating the examples before it.
+  The global `random` and `np.random` states (which the samplers draw from), and
+  the generator of `number.integers`, are seeded from this for the duration of
+  the call, and restored afterwards.
+
+  As the samplers share the global generators, this is not thread-safe and not
+  reentrant (a nested call raises `RuntimeError`): use one process per worker,
+  as `generate_to_file.py` does. Calls may be freely interleaved with each
+  other and with other uses of the global generators. Samplers must draw from
+  these generators only, and not keep random state between calls.
+
+  Accepted and dropped samples are counted in `drop_stats`. If profiling is
+  enabled, the time taken is recorded under key `'regime/module_name'`.
+
+  Args:
+    regime: Key of `filtered_modules`, e.g., 'train' or 'interpolate'.
+    module_name: Flattened module name, e.g., 'algebra__linear_1d'.
+    index: Integer >= 0; the position of the example in the module.
+    seed: Integer; the seed of the whole dataset.
+
+  Returns:
+    Pair `(problem, num_dropped)`, as for `sample_from_module`.
+
+  Raises:
+    RuntimeError: If called while another call is sampling.
+  """
+  global _sampling_example
+  if _sampling_example:
+    raise RuntimeError('sample_example is not reentrant')
+  module = filtered_modules[regime][module_name]
+  example_seed = _example_seed(seed, regime, module_name, index)
+  random_state = random.getstate()
+  np_random_state = np.random.get_state()
+  random.seed(example_seed)
+  np.random.seed(example_seed % 2**32)
+  generator = number.set_generator(np.random.default_rng(example_seed))
+  _sampling_example = True
+  try:
+    with profiling.module('{}/{}'.format(regime, module_name)):
+      return sample_from_module(module, drop_stats[(regime, module_name)])
+  finally:
+    _sampling_example = False
+    random.setstate(random_state)
+    np.random.set_state(np_random_state)
+    number.set_generator(generator)
+
+
+def _random_seed():
+  return random.SystemRandom().randint(0, 2**32 - 1)
+
+
+def get_seed():
+  """Returns FLAGS.seed, or a random seed (which is logged) if not given."""
+  seed = FLAGS.seed
+  if seed is None:
+    seed = _random_seed()
+  logging.info('Using seed %d', seed)
+  return seed
+
+
+def iter_problems(regime, module_name, count=None, seed=None, start=0,
+                  ignore_errors=False):
+  """Lazily yields examples of a module.
+
+  Args:
+    regime: Key of `filtered_modules`, e.g., 'train' or 'interpolate'.
+    module_name: Flattened module name, e.g., 'algebra__linear_1d'.
+    count: Number of examples to yield; if None, yields indefinitely.
+    seed: Integer seed, as for `sample_example`; random if None.
+    start: Index of the first example.
+    ignore_errors: Whether to skip (and log) examples whose sampling raises an
+        exception, rather than propagating the exception.
+
+  Yields:
+    Triples `(question, answer, metadata)`, where `question` and `answer` are
+    strings, and `metadata` is a dict with keys 'regime', 'module', 'index' and
+    'num_dropped'.
+  """
+  if seed is None:
+    seed = _random_seed()
+  index = start
+  while count is None or index < start + count:
+    try:
+      problem, num_dropped = sample_example(regime, module_name, index, seed)
+      question = str(problem.question)
+      answer = str(problem.answer)
+    except Exception as e:
+      if not ignore_errors:
+        raise
+      logging.warning('Failed to sample %s/%s #%d: %s',
+                      regime, module_name, index, e)
+    else:
+      metadata = {
+          'regime': regime,
+          'module': module_name,
+          'index': index,
+          'num_dropped': num_dropped,
+      }
+      yield question, answer, metadata
+    index += 1
+
+
+def iter_all_problems(regime, per_module=None, weights=None, seed=None,
+                      ignore_errors=False):
+  """Lazily yields examples from all modules of a regime, interleaved.
+
+  Without `weights`, modules take turns (round robin). With `weights`, the
+  module of each example is picked at random in proportion to its weight;
+  modules with zero or no weight are left out. Either way, a module stops
+  contributing once it has yielded `per_module` examples.
+
+  Args:
+    regime: Key of `filtered_modules`, e.g., 'train' or 'interpolate'.
+    per_module: Number of examples per module; if None, uses `counts[regime]`.
+    weights: Optional dict mapping module names to non-negative weights.
+    seed: Integer seed, as for `sample_example`; random if None.
+    ignore_errors: As for `iter_problems`.
+
+  Yields:
+    Triples `(question, answer, metadata)`, as for `iter_problems`.
+  """
+  if per_module is None:
     per_module = counts[regime]
-    for module_name, module in six.iteritems(flat_modules):
-      # These magic print constants make the header bold.
-      print('\033[1m{}/{}\033[0m'.format(regime, module_name))
-      num_dropped = 0
-      for _ in range(per_module):
-        problem, extra_dropped = sample_from_module(module)
-        num_dropped += extra_dropped
-        text = text_wrapper.fill(
-            '{}  \033[92m{}\033[0m'.format(problem.question, problem.answer))
-        print(text)
-      if num_dropped > 0:
-        logging.warning('Dropped %d examples', num_dropped)
+  if seed is None:
+    seed = _random_seed()
+
+  iterators = collections.OrderedDict()
+  for module_name in filtered_modules[regime]:
+    if weights is not None and weights.get(module_name, 0) <= 0:
+      continue
+    iterators[module_name] = iter_problems(
+        regime, module_name, per_module, seed, ignore_errors=ignore_errors)
+
+  if weights is None:
+    while iterators:
+      for module_name in list(iterators):
+        try:
+          yield next(iterators[module_name])
+        except StopIteration:
+          del iterators[module_name]
+  else:
+    # Separate generator, so that the choice of module does not depend on the
+    # sampling of the examples (which reseed the global ones).
+    chooser = random.Random('{}/{}'.format(seed, regime))
+    while iterators:
+      module_names = list(iterators)
+      cumulative_weights = np.cumsum(
+          [weights[name] for name in module_names]).tolist()
+      index = bisect.bisect(
+          cumulative_weights, chooser.random() * cumulative_weights[-1])
+      module_name = module_names[min(index, len(module_names) - 1)]
+      try:
+        yield next(iterators[module_name])
+      except StopIteration:
+        del iterators[module_name]
+
+
+def main(unused_argv):
+  """Prints Q&As from modules according to FLAGS.filter."""
+  with profiling.enabled(FLAGS.profile):
+    init_modules()
+    seed = get_seed()
+
+    text_wrapper = textwrap.TextWrapper(
+        width=80, initial_indent=' ', subsequent_indent='  ')
+
+    for regime, flat_modules in six.iteritems(filtered_modules):
+      per_module = counts[regime]
+      for module_name in flat_modules:
+        # These magic print constants make the header bold.
+        print('\033[1m{}/{}\033[0m'.format(regime, module_name))
+        for question, answer, _ in iter_problems(
+            regime, module_name, per_module, seed):
+          text = text_wrapper.fill(
+              '{}  \033[92m{}\033[0m'.format(question, answer))
+          print(text)
+        module_drop_stats = drop_stats[(regime, module_name)]
+        if sum(module_drop_stats[reason] for reason in DROP_REASONS):
+          logging.warning('%s/%s: %s', regime, module_name,
+                          format_drop_stats(module_drop_stats))
+
+    if FLAGS.profile:
+      logging.info('Time per stage:\n%s', profiling.format_report())
+      logging.info('Factorizations: %s', factorization.cache_info())
+      logging.info('Composed samplers chosen: %s',
+                   composition.sampler_counts().most_common())
 
 
 if __name__ == '__main__':
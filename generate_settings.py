@@ -10,7 +10,7 @@ import string
 MAX_QUESTION_LENGTH = 300
 MAX_ANSWER_LENGTH = 30
 QUESTION_CHARS = (
-    ['', ' '] + list(string.ascii_letters + string.digits + string.punctuation + "ЙЦУКЕНГШЩЗХЪФЫВАПРОЛДЖЭЯЧСМИТЬБЮйцукенгшщзхъфывапролджэячсмитьбю"))
+    ['', ' '] + list(string.ascii_letters + string.digits + string.punctuation + "ЙЦУКЕНГШЩЗХЪФЫВАПРОЛДЖЭЯЧСМИТЬБЮйцукенгшщзхъфывапролджэячсмитьбю" + "Ёё"))
 EMPTY_INDEX = QUESTION_CHARS.index('')
 NUM_INDICES = len(QUESTION_CHARS)
 CHAR_TO_INDEX = {char: index for index, char in enumerate(QUESTION_CHARS)}
@@ -4,10 +4,14 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+import random
+
 # Dependency imports
 from absl.testing import absltest
 from absl.testing import parameterized
 import generate
+import numpy as np
 import six
 from six.moves import range
 
@@ -28,6 +32,109 @@ class GenerateTest(parameterized.TestCase):
         question = module()
         str(question)
 
+  def testSampleFromModule_dropCounts(self):
+    generate.init_modules()
+    module = generate.filtered_modules['train']['algebra__linear_1d']
+    drop_counts = collections.Counter()
+    for _ in range(3):
+      _, num_dropped = generate.sample_from_module(module, drop_counts)
+      self.assertEqual(num_dropped, 0)
+    self.assertEqual(drop_counts, {'accepted': 3})
+    self.assertIn('dropped 0 of 3 samples',
+                  generate.format_drop_stats(drop_counts))
+
+  def testSampleExample(self):
+    generate.init_modules()
+    random.seed(0)
+    random_state = random.getstate()
+    problem, _ = generate.sample_example('train', 'algebra__linear_1d', 5, 123)
+    self.assertEqual(random.getstate(), random_state)
+    # Sampling other examples in between does not affect the result.
+    generate.sample_example('train', 'algebra__linear_1d', 4, 123)
+    problem_again, _ = generate.sample_example(
+        'train', 'algebra__linear_1d', 5, 123)
+    self.assertEqual(str(problem.question), str(problem_again.question))
+    self.assertEqual(str(problem.answer), str(problem_again.answer))
+    questions = set(
+        str(generate.sample_example(
+            'train', 'algebra__linear_1d', index, 123)[0].question)
+        for index in range(5))
+    self.assertGreater(len(questions), 1)
+
+  def testSampleExample_interleaved(self):
+    generate.init_modules()
+
+    def sample(module_name, index):
+      problem, _ = generate.sample_example('train', module_name, index, 123)
+      return str(problem.question), str(problem.answer)
+
+    alone = [sample('algebra__linear_1d', index) for index in range(3)]
+    other_alone = [sample('numbers__gcd', index) for index in range(3)]
+
+    # Alternate between the modules, also drawing from the global generators.
+    random.seed(0)
+    np.random.seed(0)
+    expected_draws = [random.random(), np.random.rand()]
+    random.seed(0)
+    np.random.seed(0)
+    interleaved = []
+    other_interleaved = []
+    draws = []
+    for index in range(3):
+      interleaved.append(sample('algebra__linear_1d', index))
+      if index == 1:
+        draws.append(random.random())
+        draws.append(np.random.rand())
+      other_interleaved.append(sample('numbers__gcd', index))
+    self.assertEqual(interleaved, alone)
+    self.assertEqual(other_interleaved, other_alone)
+    self.assertEqual(draws, expected_draws)
+
+  def testSampleExample_notReentrant(self):
+    generate.init_modules()
+    module = generate.filtered_modules['train']['algebra__linear_1d']
+
+    def nested_module():
+      generate.sample_example('train', 'numbers__gcd', 0, 123)
+      return module()
+
+    generate.filtered_modules['train']['nested'] = nested_module
+    self.addCleanup(generate.filtered_modules['train'].pop, 'nested')
+    with self.assertRaisesRegexp(RuntimeError, 'not reentrant'):
+      generate.sample_example('train', 'nested', 0, 123)
+    # The guard is reset after the failure.
+    generate.sample_example('train', 'algebra__linear_1d', 0, 123)
+
+  def testIterProblems(self):
+    generate.init_modules()
+    problems = list(
+        generate.iter_problems('train', 'algebra__linear_1d', 3, 123, start=2))
+    self.assertLen(problems, 3)
+    for i, (question, answer, metadata) in enumerate(problems):
+      self.assertEqual(metadata['index'], i + 2)
+      self.assertEqual(metadata['module'], 'algebra__linear_1d')
+      problem, _ = generate.sample_example(
+          'train', 'algebra__linear_1d', i + 2, 123)
+      self.assertEqual(question, str(problem.question))
+      self.assertEqual(answer, str(problem.answer))
+
+  def testIterAllProblems_roundRobin(self):
+    generate.init_modules()
+    module_names = list(generate.filtered_modules['interpolate'])
+    problems = list(generate.iter_all_problems('interpolate', 2, seed=123))
+    self.assertEqual([metadata['module'] for _, _, metadata in problems],
+                     module_names * 2)
+
+  def testIterAllProblems_weighted(self):
+    generate.init_modules()
+    weights = {'algebra__linear_1d': 3, 'numbers__gcd': 1, 'numbers__lcm': 0}
+    problems = list(generate.iter_all_problems(
+        'train', 10, weights=weights, seed=123))
+    module_names = [metadata['module'] for _, _, metadata in problems]
+    self.assertEqual(module_names.count('algebra__linear_1d'), 10)
+    self.assertEqual(module_names.count('numbers__gcd'), 10)
+    self.assertNotIn('numbers__lcm', module_names)
+
 
 if __name__ == '__main__':
   absltest.main()
@@ -14,13 +14,49 @@ answer.
 
 Passing --train_split=False will create a single output directory 'train' for
 training data.
+
+Passing --format=shards writes each module as a binary shard plus an index
+instead (see `util/shards.py`), so that example i can be read in O(1). Passing
+--format=npy writes each module as two uint8 `.npy` arrays of character indices
+(see `util/tokenization.py`), which can be loaded without copying or decoding.
+
+Passing --num_workers=N (N > 1) spreads the work over a pool of N processes.
+Each module is split into chunks of --chunk_size examples. Every example is
+sampled with its own seed derived from --seed (see `generate.sample_example`),
+so the output for a given seed does not depend on the number of workers.
+
+Passing --profile logs the time spent per sampling stage and module at the end
+(see `util/profiling.py`).
+
+Passing --dedup=exact or --dedup=bloom drops (question, answer) pairs that were
+already written anywhere in the output (see `util/dedup.py`), and samples extra
+examples (with indices following those of the module) until each module has its
+requested number of unique examples, or --dedup_max_oversample is reached. The
+duplicate rate of each module is logged.
+
+Progress is recorded in `manifest.json` in the output directory, after each
+chunk is durably written: the settings of the run (including the seed), and for
+each module, the number of examples written, the index of the next example to
+sample, the drop (and deduplication) counts, and once the module is complete,
+checksums of its files. Passing --resume continues an interrupted run from its
+manifest: complete modules are verified against their checksums and skipped,
+and each partially written module is truncated to its last recorded chunk and
+continued from there. As every example is sampled with its own seed, the output
+is the same as that of an uninterrupted run.
 """
 
 from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+import hashlib
+import io
+import itertools
+import json
+import multiprocessing
 import os
+import sys
 
 # Dependency imports
 from absl import app
@@ -28,42 +64,495 @@ from absl import flags
 from absl import logging
 import generate
 import six
+from six.moves import map
 from six.moves import range
+from six.moves import zip
+from util import dedup
+from util import example_files
+from util import profiling
+from util import shards
+from util import tokenization
 
 FLAGS = flags.FLAGS
 
 flags.DEFINE_string('output_dir', None, 'Where to write output text')
 flags.DEFINE_boolean('train_split', False,
                      'Whether to split training data by difficulty')
-flags.mark_flag_as_required('output_dir')
+flags.DEFINE_enum('format', 'text', example_files.FORMATS,
+                  'Format of the output files')
+flags.DEFINE_integer('num_workers', 1, 'Num of processes to generate with')
+flags.DEFINE_integer('chunk_size', 1000,
+                     'Num of examples per unit of work given to a process')
+flags.DEFINE_enum('dedup', 'none', ['none', 'exact', 'bloom'],
+                  'Whether to drop duplicate (question, answer) pairs, using an '
+                  'exact set of hashes spilled to disk, or a Bloom filter')
+flags.DEFINE_integer('dedup_max_in_memory', 2**22,
+                     'For --dedup=exact, num of hashes kept in memory before '
+                     'spilling to disk')
+flags.DEFINE_float('dedup_false_positive_rate', 1e-6,
+                   'For --dedup=bloom, the probability of wrongly dropping an '
+                   'example as a duplicate')
+flags.DEFINE_float('dedup_max_oversample', 1.0,
+                   'With --dedup, max num of extra examples sampled per module '
+                   '(to replace duplicates), as a fraction of its count')
+flags.DEFINE_boolean('resume', False,
+                     'Whether to continue an interrupted run writing to '
+                     'output_dir, from its manifest')
 
+_MANIFEST = 'manifest.json'
+
+# Number of bytes read at a time when computing checksums.
+_BLOCK_SIZE = 2**20
+
+# Max num of chunks per worker that are sampled ahead of the one being written.
+_CHUNKS_AHEAD_PER_WORKER = 4
+
+
+class _TextWriter(object):
+  """Writes lines alternating between question and answer."""
+
+  def __init__(self, path, num_existing=0):
+    if num_existing:
+      # Keep the first `num_existing` examples, and append after them.
+      with open(path, 'r+b') as text_file:
+        for _ in range(2 * num_existing):
+          if not text_file.readline().endswith(b'\n'):
+            raise ValueError('{} has fewer than {} examples'.format(
+                path, num_existing))
+        text_file.truncate()
+      self._file = io.open(path, 'a', encoding='utf-8')
+    else:
+      self._file = io.open(path, 'w', encoding='utf-8')
+
+  def write(self, question, answer):
+    self._file.write(question + '\n')
+    self._file.write(answer + '\n')
+
+  def flush(self):
+    self._file.flush()
+    os.fsync(self._file.fileno())
+
+  def close(self):
+    self._file.close()
+
+
+def _open_writer(path, count, num_existing=0):
+  """Returns writer for FLAGS.format.
+
+  Args:
+    path: Path of the output, without file extension.
+    count: Maximum number of examples that will be written.
+    num_existing: Number of examples already written to the output by an
+        interrupted writer, which are kept (and appended to).
+
+  Returns:
+    Writer with methods `write(question, answer)`, `flush()` and `close()`.
+  """
+  if FLAGS.format == 'text':
+    return _TextWriter(path + example_files.TEXT_SUFFIX, num_existing)
+  elif FLAGS.format == 'shards':
+    return shards.ShardWriter(path + example_files.SHARD_SUFFIX, num_existing)
+  elif FLAGS.format == 'npy':
+    return tokenization.ArrayWriter(path, count, num_existing)
+  else:
+    raise ValueError('Unknown format {}'.format(FLAGS.format))
 
-def main(unused_argv):
-  generate.init_modules(FLAGS.train_split)
 
-  output_dir = os.path.expanduser(FLAGS.output_dir)
-  if os.path.exists(output_dir):
-    logging.fatal('output dir %s already exists', output_dir)
-  logging.info('Writing to %s', output_dir)
-  os.makedirs(output_dir)
+def _work_units(seed, records):
+  """Returns list of units of work, in the order they are written out.
 
+  Args:
+    seed: Integer; the seed of the whole run.
+    records: Dict of the modules in the manifest (see `_module_record`); the
+        complete modules are skipped, and the others continued from their
+        'next_index'.
+
+  Returns:
+    List of tuples `(regime, module_name, chunk_index, num_chunks, start, count,
+    seed)`, where the chunk consists of the examples with indices in
+    `[start, start + count)`, and `chunk_index` counts from the first chunk
+    still to be written of the module.
+  """
+  units = []
   for regime, flat_modules in six.iteritems(generate.filtered_modules):
-    regime_dir = os.path.join(output_dir, regime)
-    os.mkdir(regime_dir)
     per_module = generate.counts[regime]
-    for module_name, module in six.iteritems(flat_modules):
-      path = os.path.join(regime_dir, module_name + '.txt')
-      with open(path, 'w') as text_file:
-        for _ in range(per_module):
-          try:
-            problem, _ = generate.sample_from_module(module)
-          except Exception as e:
-            print(e)
-            continue
-          text_file.write(str(problem.question) + '\n')
-          text_file.write(str(problem.answer) + '\n')
-      logging.info('Written %s', path)
+    for module_name in flat_modules:
+      record = records.get(_module_key(regime, module_name))
+      if record is not None and record['complete']:
+        continue
+      first = 0 if record is None else record['next_index']
+      num_chunks = max(
+          1, (per_module - first + FLAGS.chunk_size - 1) // FLAGS.chunk_size)
+      for chunk_index in range(num_chunks):
+        start = first + chunk_index * FLAGS.chunk_size
+        count = min(FLAGS.chunk_size, per_module - start)
+        units.append(
+            (regime, module_name, chunk_index, num_chunks, start, count, seed))
+  return units
+
+
+def _module_key(regime, module_name):
+  """Returns key of a module in the manifest, e.g., 'train/algebra__linear_1d'."""
+  return '{}/{}'.format(regime, module_name)
+
+
+def _module_record():
+  """Returns manifest entry of a module that has not been written yet.
+
+  Returns:
+    Dict with keys:
+    *   'complete': Whether the module has been written and closed.
+    *   'examples': Number of examples durably written.
+    *   'next_index': Index of the next example to sample (`start` of the next
+        work unit).
+    *   'drop_counts': Dict of `generate.drop_stats` of the module.
+    *   'dedup_counts': Dict of the counts updated by `_write_examples`.
+    *   'checksums': Dict mapping file name to SHA-256 hex digest, once complete.
+  """
+  return {'complete': False, 'examples': 0, 'next_index': 0,
+          'drop_counts': {}, 'dedup_counts': {}, 'checksums': {}}
+
+
+def _settings(seed):
+  """Returns dict of the flags that determine the output, for the manifest."""
+  return {
+      'seed': seed,
+      'train_split': FLAGS.train_split,
+      'filter': FLAGS.filter,
+      'per_train_module': FLAGS.per_train_module,
+      'per_test_module': FLAGS.per_test_module,
+      'split_hash': FLAGS.split_hash,
+      'format': FLAGS.format,
+      'dedup': FLAGS.dedup,
+      'dedup_false_positive_rate': FLAGS.dedup_false_positive_rate,
+      'dedup_max_oversample': FLAGS.dedup_max_oversample,
+  }
+
+
+def _write_manifest(output_dir, manifest):
+  """Atomically replaces the manifest in `output_dir`."""
+  path = os.path.join(output_dir, _MANIFEST)
+  with io.open(path + '.tmp', 'w', encoding='utf-8') as manifest_file:
+    json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+    manifest_file.flush()
+    os.fsync(manifest_file.fileno())
+  os.rename(path + '.tmp', path)
+
+
+def _checksums(path):
+  """Returns dict mapping the file names of a module to SHA-256 hex digests."""
+  checksums = {}
+  for file_path in example_files.paths(path, FLAGS.format):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as module_file:
+      for block in iter(lambda: module_file.read(_BLOCK_SIZE), b''):
+        digest.update(block)
+    checksums[os.path.basename(file_path)] = digest.hexdigest()
+  return checksums
+
+
+def _start_or_resume(output_dir):
+  """Creates `output_dir`, or loads its manifest if resuming.
+
+  Args:
+    output_dir: Output directory.
+
+  Returns:
+    Manifest, as a dict with keys 'settings' (see `_settings`) and 'modules'
+    (mapping `_module_key` to `_module_record`).
+  """
+  if not os.path.exists(output_dir):
+    logging.info('Writing to %s', output_dir)
+    os.makedirs(output_dir)
+    manifest = {'settings': _settings(generate.get_seed()), 'modules': {}}
+    _write_manifest(output_dir, manifest)
+    return manifest
+
+  if not FLAGS.resume:
+    logging.fatal('output dir %s already exists (pass --resume to continue '
+                  'writing to it)', output_dir)
+  manifest_path = os.path.join(output_dir, _MANIFEST)
+  if not os.path.exists(manifest_path):
+    logging.fatal('Cannot resume: %s does not exist', manifest_path)
+  with io.open(manifest_path, encoding='utf-8') as manifest_file:
+    manifest = json.load(manifest_file)
+  seed = manifest['settings']['seed'] if FLAGS.seed is None else FLAGS.seed
+  if manifest['settings'] != _settings(seed):
+    logging.fatal('Cannot resume: settings %s differ from those of %s: %s',
+                  _settings(seed), manifest_path, manifest['settings'])
+
+  for key, record in sorted(six.iteritems(manifest['modules'])):
+    if record['complete']:
+      checksums = _checksums(os.path.join(output_dir, key))
+      if checksums != record['checksums']:
+        logging.fatal('Cannot resume: files of %s have changed', key)
+  num_complete = sum(
+      record['complete'] for record in six.itervalues(manifest['modules']))
+  logging.info('Resuming writing to %s (seed %d); %d modules complete',
+               output_dir, seed, num_complete)
+  return manifest
+
+
+def _restore_seen(output_dir, records, seen):
+  """Adds the examples already written to the set of fingerprints `seen`."""
+  for key, record in sorted(six.iteritems(records)):
+    path = example_files.paths(os.path.join(output_dir, key), FLAGS.format)[0]
+    examples = itertools.islice(
+        example_files.iter_examples(path), record['examples'])
+    for question, answer in examples:
+      seen.add(dedup.fingerprint(question, answer))
+
+
+def _init_worker(argv, train_split):
+  """Prepares a worker process (which may not have inherited parsed flags)."""
+  if not FLAGS.is_parsed():
+    FLAGS(argv)
+  if FLAGS.profile:
+    profiling.enable()
+  generate.init_modules(train_split)
+
+
+def _generate_chunk(unit):
+  """Samples a chunk of examples.
+
+  Args:
+    unit: Tuple as returned by `_work_units`.
+
+  Returns:
+    Triple `(examples, drop_counts, profile_stats)`, where `examples` is a list
+    of `(question, answer)` string pairs, `drop_counts` counts the accepted and
+    dropped samples (see `generate.sample_from_module`), and `profile_stats` are
+    the stats recorded while profiling (see `profiling.pop_stats`).
+  """
+  regime, module_name, _, _, start, count, seed = unit
+  problems = generate.iter_problems(
+      regime, module_name, count, seed, start=start, ignore_errors=True)
+  examples = [(question, answer) for question, answer, _ in problems]
+  # Nothing is recorded for a chunk without samples.
+  drop_counts = generate.drop_stats.pop(
+      (regime, module_name), collections.Counter())
+  return examples, drop_counts, profiling.pop_stats()
+
+
+def _map_chunks(pool, units):
+  """Yields the result of `_generate_chunk` for each of `units`, in order.
+
+  Unlike `pool.imap`, which submits all the units at once, this keeps at most
+  `_CHUNKS_AHEAD_PER_WORKER` units per worker submitted to the pool ahead of
+  the one yielded. This bounds the memory used by chunks waiting to be written,
+  and the wait for units submitted later (see `_oversample`).
+
+  Args:
+    pool: `multiprocessing.Pool`, or None to sample in this process.
+    units: Iterable of tuples as returned by `_work_units`.
+
+  Yields:
+    Triples as returned by `_generate_chunk`.
+  """
+  if pool is None:
+    for unit in units:
+      yield _generate_chunk(unit)
+    return
+  max_pending = _CHUNKS_AHEAD_PER_WORKER * FLAGS.num_workers
+  pending = collections.deque()
+  for unit in units:
+    pending.append(pool.apply_async(_generate_chunk, (unit,)))
+    if len(pending) >= max_pending:
+      yield pending.popleft().get()
+  while pending:
+    yield pending.popleft().get()
+
+
+def _open_dedup():
+  """Returns set of fingerprints for FLAGS.dedup, or None if not deduplicating.
+
+  Returns:
+    Instance of `dedup.FingerprintSet` or `dedup.BloomFilter` (sized for the
+    examples of all modules), or None.
+  """
+  if FLAGS.dedup == 'none':
+    return None
+  elif FLAGS.dedup == 'exact':
+    return dedup.FingerprintSet(FLAGS.dedup_max_in_memory)
+  elif FLAGS.dedup == 'bloom':
+    capacity = sum(
+        generate.counts[regime] * len(flat_modules)
+        for regime, flat_modules in six.iteritems(generate.filtered_modules))
+    return dedup.BloomFilter(max(1, capacity), FLAGS.dedup_false_positive_rate)
+  else:
+    raise ValueError('Unknown dedup {}'.format(FLAGS.dedup))
+
+
+def _write_examples(writer, examples, seen, dedup_counts, limit):
+  """Writes examples, skipping duplicates if `seen` is not None.
+
+  Args:
+    writer: Writer as returned by `_open_writer`.
+    examples: List of `(question, answer)` pairs.
+    seen: Set of fingerprints of the examples already written (see
+        `_open_dedup`), or None.
+    dedup_counts: `Counter` of the 'unique' (written) and 'duplicate' (if
+        `seen` is not None) examples of the module; updated.
+    limit: If `seen` is not None, the examples are only written until
+        `dedup_counts['unique']` reaches this.
+  """
+  for question, answer in examples:
+    if seen is not None:
+      if dedup_counts['unique'] >= limit:
+        return
+      fingerprint = dedup.fingerprint(question, answer)
+      if fingerprint in seen:
+        dedup_counts['duplicate'] += 1
+        continue
+    try:
+      writer.write(question, answer)
+    except ValueError as e:  # E.g., not representable in FLAGS.format.
+      logging.warning('Skipping example: %s', e)
+      continue
+    dedup_counts['unique'] += 1
+    # Only examples that were written are added, so that `seen` can be restored
+    # from the output when resuming.
+    if seen is not None:
+      seen.add(fingerprint)
+
+
+def _oversample(
+    pool, writer, seen, dedup_counts, regime, module_name, seed):
+  """Samples extra examples until the module has its count of unique ones.
+
+  The extra examples have indices `count, count + 1, ...` (where `count` is the
+  number of examples of the module), and are written in that order, so the
+  output does not depend on the number of workers.
+
+  Args:
+    pool: `multiprocessing.Pool`, or None to sample in this process. Its
+        workers are shared with `main`, which keeps a bounded number of chunks
+        submitted (see `_map_chunks`).
+    writer: Writer as returned by `_open_writer`.
+    seen: Set of fingerprints, as returned by `_open_dedup`.
+    dedup_counts: `Counter` as for `_write_examples`; also counts the
+        'oversampled' examples.
+    regime: Key of `generate.filtered_modules`.
+    module_name: Flattened module name.
+    seed: Integer; the seed of the whole run.
+  """
+  count = generate.counts[regime]
+  end = count + int(FLAGS.dedup_max_oversample * count)
+  start = count
+  while dedup_counts['unique'] < count and start < end:
+    # Sample (in parallel) as many examples as are missing.
+    missing = min(count - dedup_counts['unique'], end - start)
+    units = []
+    for chunk_start in range(start, start + missing, FLAGS.chunk_size):
+      chunk_count = min(FLAGS.chunk_size, start + missing - chunk_start)
+      units.append((regime, module_name, None, None, chunk_start, chunk_count,
+                    seed))
+    start += missing
+    dedup_counts['oversampled'] += missing
+    for examples, drop_counts, profile_stats in _map_chunks(pool, units):
+      generate.drop_stats[(regime, module_name)].update(drop_counts)
+      profiling.merge_stats(profile_stats)
+      _write_examples(writer, examples, seen, dedup_counts, count)
+
+
+def _format_dedup_counts(dedup_counts):
+  """Returns summary of the `Counter` updated by `_write_examples`."""
+  num_sampled = dedup_counts['unique'] + dedup_counts['duplicate']
+  return 'duplicates {} of {} ({:.1%}); oversampled {}; unique {}'.format(
+      dedup_counts['duplicate'], num_sampled,
+      dedup_counts['duplicate'] / max(1, num_sampled),
+      dedup_counts['oversampled'], dedup_counts['unique'])
+
+
+def main(unused_argv):
+  with profiling.enabled(FLAGS.profile):
+    generate.init_modules(FLAGS.train_split)
+
+    output_dir = os.path.expanduser(FLAGS.output_dir)
+    manifest = _start_or_resume(output_dir)
+    seed = manifest['settings']['seed']
+    records = manifest['modules']
+    units = _work_units(seed, records)
+    seen = _open_dedup()
+    if seen is not None:
+      _restore_seen(output_dir, records, seen)
+    pool = None
+    if FLAGS.num_workers > 1:
+      pool = multiprocessing.Pool(
+          FLAGS.num_workers, initializer=_init_worker,
+          initargs=(sys.argv, FLAGS.train_split))
+    chunks = _map_chunks(pool, units)
+
+    # Restored after creating the pool, so that the workers don't inherit them.
+    dedup_counts = collections.defaultdict(collections.Counter)
+    for key, record in six.iteritems(records):
+      regime, module_name = key.split('/')
+      generate.drop_stats[(regime, module_name)].update(record['drop_counts'])
+      dedup_counts[(regime, module_name)].update(record['dedup_counts'])
+
+    writer = None
+    try:
+      for unit, (examples, drop_counts, profile_stats) in zip(units, chunks):
+        regime, module_name, chunk_index, num_chunks, start, count, _ = unit
+        generate.drop_stats[(regime, module_name)].update(drop_counts)
+        profiling.merge_stats(profile_stats)
+        key = _module_key(regime, module_name)
+        path = os.path.join(output_dir, regime, module_name)
+        module_dedup_counts = dedup_counts[(regime, module_name)]
+        if chunk_index == 0:
+          if not os.path.isdir(os.path.dirname(path)):
+            os.mkdir(os.path.dirname(path))
+          record = records.setdefault(key, _module_record())
+          writer = _open_writer(
+              path, generate.counts[regime], num_existing=record['examples'])
+          # Examples written after the last chunk recorded were truncated.
+          module_dedup_counts['unique'] = record['examples']
+        _write_examples(writer, examples, seen, module_dedup_counts,
+                        generate.counts[regime])
+        if chunk_index == num_chunks - 1:
+          if seen is not None:
+            _oversample(pool, writer, seen, module_dedup_counts, regime,
+                        module_name, seed)
+          writer.close()
+          writer = None
+          record['complete'] = True
+          record['checksums'] = _checksums(path)
+          logging.info('Written %s; %s', path, generate.format_drop_stats(
+              generate.drop_stats[(regime, module_name)]))
+          if seen is not None:
+            log = (logging.info
+                   if module_dedup_counts['unique'] >= generate.counts[regime]
+                   else logging.warning)
+            log('%s: %s', path, _format_dedup_counts(module_dedup_counts))
+        else:
+          writer.flush()
+        record['examples'] = module_dedup_counts['unique']
+        record['next_index'] = start + count
+        record['drop_counts'] = dict(generate.drop_stats[(regime, module_name)])
+        record['dedup_counts'] = dict(module_dedup_counts)
+        _write_manifest(output_dir, manifest)
+    finally:
+      if writer is not None:
+        # Not closed (which would truncate npy arrays), so that the interrupted
+        # module can be resumed from the manifest.
+        writer.flush()
+      if pool is not None:
+        pool.close()
+        pool.join()
+      if seen is not None:
+        seen.close()
+
+    if seen is not None:
+      total_counts = collections.Counter()
+      for module_dedup_counts in six.itervalues(dedup_counts):
+        total_counts.update(module_dedup_counts)
+      logging.info('Deduplication (%s): %s', FLAGS.dedup,
+                   _format_dedup_counts(total_counts))
+
+    if FLAGS.profile:
+      logging.info('Time per stage:\n%s', profiling.format_report())
 
 
 if __name__ == '__main__':
+  flags.mark_flag_as_required('output_dir')
   app.run(main)
@@ -0,0 +1,254 @@
+# coding=utf-8
+"""Tests for mathematics_dataset.generate_to_file."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import functools
+import json
+import os
+import random
+
+# Dependency imports
+from absl import logging
+from absl.testing import absltest
+from absl.testing import flagsaver
+from absl.testing import parameterized
+import example
+import generate
+import generate_to_file
+from util import example_files
+
+
+def _few_distinct_module(template):
+  """Module sampling from only 40 distinct problems, so that many repeat."""
+  value = random.randint(0, 39)
+  return example.Problem(question=template.format(value), answer=str(value))
+
+
+class _Interrupted(Exception):
+  pass
+
+
+class _Fatal(Exception):
+  pass
+
+
+class _LazyPool(object):
+  """Stand-in for `multiprocessing.Pool`, running tasks when they are got."""
+
+  def __init__(self):
+    self.num_pending = 0
+    self.max_pending = 0
+
+  def apply_async(self, function, args):
+    self.num_pending += 1
+    self.max_pending = max(self.max_pending, self.num_pending)
+    return _LazyResult(self, function, args)
+
+
+class _LazyResult(object):
+
+  def __init__(self, pool, function, args):
+    self._pool = pool
+    self._function = function
+    self._args = args
+
+  def get(self):
+    self._pool.num_pending -= 1
+    return self._function(*self._args)
+
+
+class GenerateToFileTest(parameterized.TestCase):
+
+  def _init_few_distinct_modules(self, count):
+    """Makes `generate` sample just two modules with few distinct problems."""
+    for dict_ in [generate.filtered_modules, generate.counts]:
+      self.addCleanup(dict_.update, dict(dict_))
+      self.addCleanup(dict_.clear)
+      dict_.clear()
+    generate.filtered_modules['train'] = collections.OrderedDict(
+        [('few_distinct',
+          functools.partial(_few_distinct_module, 'What is {}?')),
+         ('few_distinct_2',
+          functools.partial(_few_distinct_module, 'Let x = {}. What is x?'))])
+    generate.counts['train'] = count
+    generate.drop_stats.clear()
+    self.addCleanup(generate.drop_stats.clear)
+
+  def _run(self, output_dir, **flag_values):
+    """Runs `main` with dedup, overriding the flags given in `flag_values`."""
+    flag_values = dict(
+        dict(output_dir=output_dir, seed=1, num_workers=1, chunk_size=5,
+             dedup='exact', dedup_max_oversample=1.0),
+        **flag_values)
+    # As in a new process.
+    generate.drop_stats.clear()
+    with flagsaver.flagsaver(**flag_values):
+      generate_to_file.main(None)
+
+  def _run_interrupted(self, output_dir, num_manifests, **flag_values):
+    """Runs `main`, interrupted after writing `num_manifests` manifests."""
+    write_manifest = generate_to_file._write_manifest
+    num_written = [0]
+
+    def interrupting_write_manifest(output_dir, manifest):
+      if num_written[0] == num_manifests:
+        raise _Interrupted()
+      num_written[0] += 1
+      write_manifest(output_dir, manifest)
+
+    generate_to_file._write_manifest = interrupting_write_manifest
+    try:
+      with self.assertRaises(_Interrupted):
+        self._run(output_dir, **flag_values)
+    finally:
+      generate_to_file._write_manifest = write_manifest
+
+  def _read_files(self, output_dir):
+    """Returns dict mapping path relative to `output_dir` to file contents."""
+    contents = {}
+    for directory, _, filenames in os.walk(output_dir):
+      for filename in filenames:
+        path = os.path.join(directory, filename)
+        with open(path, 'rb') as file_:
+          contents[os.path.relpath(path, output_dir)] = file_.read()
+    return contents
+
+  def _generate(self, num_workers):
+    """Runs `main` with dedup; returns examples of a module and the manifest."""
+    output_dir = os.path.join(self.create_tempdir().full_path, 'output')
+    self._run(output_dir, num_workers=num_workers)
+    path = os.path.join(output_dir, 'train', 'few_distinct.txt')
+    return (list(example_files.iter_examples(path)),
+            self._read_manifest(output_dir))
+
+  def _read_manifest(self, output_dir):
+    manifest_path = os.path.join(output_dir, generate_to_file._MANIFEST)
+    with open(manifest_path) as manifest_file:
+      return json.load(manifest_file)
+
+  def testGenerateChunk(self):
+    generate.init_modules()
+    examples, drop_counts, _ = generate_to_file._generate_chunk(
+        ('train', 'algebra__linear_1d', 0, 1, 5, 3, 1))
+    self.assertLen(examples, 3)
+    self.assertEqual(drop_counts['accepted'], 3)
+    self.assertNotIn(('train', 'algebra__linear_1d'), generate.drop_stats)
+
+  def testGenerateChunk_empty(self):
+    generate.init_modules()
+    examples, drop_counts, _ = generate_to_file._generate_chunk(
+        ('train', 'algebra__linear_1d', 0, 1, 0, 0, 1))
+    self.assertEqual(examples, [])
+    self.assertEqual(drop_counts, {})
+
+  @flagsaver.flagsaver(num_workers=2)
+  def testMapChunks(self):
+    self._init_few_distinct_modules(40)
+    units = [('train', 'few_distinct', None, None, start, 1, 1)
+             for start in range(40)]
+    expected = list(generate_to_file._map_chunks(None, units))
+    self.assertLen(expected, 40)
+    pool = _LazyPool()
+    self.assertEqual(list(generate_to_file._map_chunks(pool, units)), expected)
+    self.assertEqual(pool.max_pending,
+                     2 * generate_to_file._CHUNKS_AHEAD_PER_WORKER)
+
+  def testTextWriter_nonAscii(self):
+    path = os.path.join(self.create_tempdir().full_path, 'module.txt')
+    writer = generate_to_file._TextWriter(path)
+    writer.write(u'Сколько будет 2 + 2?', u'4')
+    writer.write(u'Combien font 3 × 2 ?', u'6')
+    writer.close()
+    # Resuming keeps the first example, and appends after it.
+    writer = generate_to_file._TextWriter(path, num_existing=1)
+    writer.write(u'Wie viel ist 1 − 1?', u'0')
+    writer.close()
+    with open(path, 'rb') as text_file:
+      self.assertEqual(
+          text_file.read().decode('utf-8'),
+          u'Сколько будет 2 + 2?\n4\nWie viel ist 1 − 1?\n0\n')
+    self.assertEqual(
+        list(example_files.iter_examples(path)),
+        [(u'Сколько будет 2 + 2?', u'4'), (u'Wie viel ist 1 − 1?', u'0')])
+
+  def testMain_oversamplesWithWorkers(self):
+    self._init_few_distinct_modules(20)
+    # The first module is oversampled while the workers sample the second.
+    examples, manifest = self._generate(num_workers=2)
+    self.assertLen(examples, 20)
+    self.assertLen(set(examples), 20)
+    for key in ['train/few_distinct', 'train/few_distinct_2']:
+      record = manifest['modules'][key]
+      self.assertTrue(record['complete'])
+      self.assertGreater(record['dedup_counts']['oversampled'], 0)
+      self.assertEqual(record['dedup_counts']['unique'], 20)
+
+    self.assertEqual(self._generate(num_workers=1)[0], examples)
+
+  @parameterized.product(
+      format_=example_files.FORMATS, num_workers=[1, 2])
+  def testMain_resume(self, format_, num_workers):
+    self._init_few_distinct_modules(20)
+    temp_dir = self.create_tempdir().full_path
+    expected_dir = os.path.join(temp_dir, 'expected')
+    self._run(expected_dir, format=format_, num_workers=num_workers)
+
+    # The manifest is written when starting, and after each of the 4 chunks of
+    # each module (the last including the oversampling).
+    output_dir = os.path.join(temp_dir, 'output')
+    self._run_interrupted(
+        output_dir, 3, format=format_, num_workers=num_workers)
+    manifest = self._read_manifest(output_dir)
+    self.assertEqual(
+        manifest['modules']['train/few_distinct']['next_index'], 10)
+    # Interrupted again, with the second module partially written.
+    self._run_interrupted(output_dir, 4, format=format_,
+                          num_workers=num_workers, resume=True)
+    manifest = self._read_manifest(output_dir)
+    self.assertTrue(manifest['modules']['train/few_distinct']['complete'])
+    self.assertEqual(
+        manifest['modules']['train/few_distinct_2']['next_index'], 10)
+    self._run(output_dir, format=format_, num_workers=num_workers,
+              resume=True)
+
+    expected = self._read_files(expected_dir)
+    self.assertIn(example_files.paths(
+        os.path.join('train', 'few_distinct_2'), format_)[0], expected)
+    self.assertEqual(self._read_files(output_dir), expected)
+
+  def _assert_fatal(self, regexp, output_dir, **flag_values):
+    with self.assertRaisesRegexp(_Fatal, regexp):
+      self._run(output_dir, **flag_values)
+
+  def testMain_resumeFatal(self):
+    def fatal(msg, *args, **unused_kwargs):
+      raise _Fatal(msg % args)
+    self.addCleanup(setattr, logging, 'fatal', logging.fatal)
+    logging.fatal = fatal
+
+    self._init_few_distinct_modules(20)
+    output_dir = os.path.join(self.create_tempdir().full_path, 'output')
+    self._run_interrupted(output_dir, 6)
+    files_before = self._read_files(output_dir)
+
+    self._assert_fatal('already exists', output_dir)
+    self._assert_fatal('settings .* differ', output_dir, seed=2, resume=True)
+    self._assert_fatal('settings .* differ', output_dir, format='npy',
+                       resume=True)
+    self.assertEqual(self._read_files(output_dir), files_before)
+
+    path = os.path.join(output_dir, 'train', 'few_distinct.txt')
+    with open(path, 'ab') as text_file:
+      text_file.write(b'What is 100?\n100\n')
+    self._assert_fatal('files of train/few_distinct have changed', output_dir,
+                       resume=True)
+    os.remove(os.path.join(output_dir, generate_to_file._MANIFEST))
+    self._assert_fatal('does not exist', output_dir, resume=True)
+
+
+if __name__ == '__main__':
+  absltest.main()
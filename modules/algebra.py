@@ -142,6 +142,27 @@ def _polynomial_coeffs_with_roots(roots, scale_entropy):
   return [coeff * scale * lcm for coeff in coeffs]
 
 
+_POLYNOMIAL_ROOTS_TEMPLATES = example.register_templates(
+    'algebra.polynomial_roots', [
+        'Пусть {equality}. Чему равен {variable}?',
+        'Пусть {equality}. Вычислите {variable}.',
+        'Предположим, что {equality}. Чему равен {variable}?',
+        'Предположим, что {equality}. Вычислите {variable}.',
+        'Чему равен {variable} в {equality}?',
+        'Решите {equality} для {variable}.',
+        'Найдите такой {variable}, что {equality}.',
+        'Найдите {variable} при условии, что {equality}.',
+        'Определите {variable}, при котором {equality}.',
+        'Определите {variable} при условии, что {equality}.',
+        'Решите {equality}.'
+    ])
+
+
+_FACTOR_TEMPLATES = example.register_templates('algebra.factor', [
+    'Преобразуйте выражение {expression}.',
+])
+
+
 def polynomial_roots(value, sample_args, context=None):
   """E.g., "Solve 2*x**2 - 18 = 0."."""
   del value  # not currently used
@@ -185,19 +206,7 @@ def polynomial_roots(value, sample_args, context=None):
     #     'Solve {equality}.'
     # ])
 
-    template = random.choice([
-        'Пусть {equality}. Чему равен {variable}?',
-        'Пусть {equality}. Вычислите {variable}.',
-        'Предположим, что {equality}. Чему равен {variable}?',
-        'Предположим, что {equality}. Вычислите {variable}.',
-        'Чему равен {variable} в {equality}?',
-        'Решите {equality} для {variable}.',
-        'Найдите такой {variable}, что {equality}.',
-        'Найдите {variable} при условии, что {equality}.',
-        'Определите {variable}, при котором {equality}.',
-        'Определите {variable} при условии, что {equality}.',
-        'Решите {equality}.'
-    ])
+    template = random.choice(_POLYNOMIAL_ROOTS_TEMPLATES)
     return example.Problem(
         question=example.question(
             context, template, equality=equality, variable=variable),
@@ -215,14 +224,17 @@ def polynomial_roots(value, sample_args, context=None):
     #     'Factor {expression}.',
     # ])
 
-    template = random.choice([
-        'Преобразуйте выражение {expression}.',
-    ])
+    template = random.choice(_FACTOR_TEMPLATES)
     return example.Problem(
         question=example.question(context, template, expression=expression),
         answer=factored)
 
 
+_LINEAR_SYSTEM_TEMPLATES = example.register_templates('algebra.linear_system', [
+    'Решите {equations} для {variable}.',
+])
+
+
 def _solve_linear_system(degree, value, sample_args, context=None):
   """Solve linear equations."""
   is_question = context is None
@@ -268,9 +280,7 @@ def _solve_linear_system(degree, value, sample_args, context=None):
   equations = ', '.join([str(equation) for equation in equations])
 
   if is_question:
-    template = random.choice([
-        'Решите {equations} для {variable}.',
-    ])
+    template = random.choice(_LINEAR_SYSTEM_TEMPLATES)
     return example.Problem(
         example.question(
             context, template, equations=equations,
@@ -334,6 +344,14 @@ class _PolynomialSequence(object):
     return self._sympy.subs(self._variable, n)
 
 
+_SEQUENCE_NEXT_TERM_TEMPLATES = example.register_templates(
+    'algebra.sequence_next_term', [
+        'Какой следующий элемент последовательности {sequence}?',
+        'Продолжите последовательность: {sequence}?',
+        'Чему равен следующий элемент {sequence}?',
+    ])
+
+
 def sequence_next_term(min_entropy, max_entropy):
   """E.g., "What is the next term in the sequence 1, 2, 3?"."""
   entropy = random.uniform(min_entropy, max_entropy)
@@ -352,11 +370,7 @@ def sequence_next_term(min_entropy, max_entropy):
   #     'What is the next term in {sequence}?',
   # ])
 
-  template = random.choice([
-      'Какой следующий элемент последовательности {sequence}?',
-      'Продолжите последовательность: {sequence}?',
-      'Чему равен следующий элемент {sequence}?',
-  ])
+  template = random.choice(_SEQUENCE_NEXT_TERM_TEMPLATES)
   answer = sequence.term(num_terms + 1)
 
   return example.Problem(
@@ -364,6 +378,12 @@ def sequence_next_term(min_entropy, max_entropy):
       answer=answer)
 
 
+_SEQUENCE_NTH_TERM_TEMPLATES = example.register_templates(
+    'algebra.sequence_nth_term', [
+        'Чему равен {variable}-й элемент последовательности {sequence}?',
+    ])
+
+
 def sequence_nth_term(min_entropy, max_entropy):
   """E.g., "What is the nth term in the sequence 1, 2, 3?"."""
   entropy = random.uniform(min_entropy, max_entropy)
@@ -376,9 +396,7 @@ def sequence_nth_term(min_entropy, max_entropy):
   sequence_sample = [sequence.term(n + 1) for n in range(num_terms)]
   sequence_sample = display.NumberList(sequence_sample)
 
-  template = random.choice([
-      'Чему равен {variable}-й элемент последовательности {sequence}?',
-  ])
+  template = random.choice(_SEQUENCE_NTH_TERM_TEMPLATES)
   answer = sequence.sympy
 
   return example.Problem(
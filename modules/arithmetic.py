@@ -119,6 +119,21 @@ def _value_sampler(value):
                    .format(value, type(value)))
 
 
+_ADD_TEMPLATES = example.register_templates('arithmetic.add', [
+    '{p} + {q}',
+    '{p}+{q}',
+    'Рассчитайте {p} + {q}.',
+    'Сложите {p} и {q}.',
+    'Прибавьте {p} к {q}.',
+    'Найдите сумму {p} и {q}.',
+    'Чему равна сумма {p} и {q}.',
+    'Сколько получится, если сложить {p} и {q}.',
+    'Сколько будет {p} плюс {q}?',
+    'Вычислите {p} + {q}.',
+    'Чему равно {p} + {q}?',
+])
+
+
 def _add_question_or_entity(context, p, q, is_question):
   """Generates entity or question for adding p + q."""
   value = p.value + q.value
@@ -138,19 +153,7 @@ def _add_question_or_entity(context, p, q, is_question):
     #     'What is {p} + {q}?',
     # ])
 
-    template = random.choice([
-        '{p} + {q}',
-        '{p}+{q}',
-        'Рассчитайте {p} + {q}.',
-        'Сложите {p} и {q}.',
-        'Прибавьте {p} к {q}.',
-        'Найдите сумму {p} и {q}.',
-        'Чему равна сумма {p} и {q}.',
-        'Сколько получится, если сложить {p} и {q}.',
-        'Сколько будет {p} плюс {q}?',
-        'Вычислите {p} + {q}.',
-        'Чему равно {p} + {q}?',
-    ])
+    template = random.choice(_ADD_TEMPLATES)
     return example.Problem(
         question=example.question(context, template, p=p, q=q),
         answer=value)
@@ -162,6 +165,26 @@ def _add_question_or_entity(context, p, q, is_question):
         p=p, q=q)
 
 
+_SUB_TEMPLATES = example.register_templates('arithmetic.sub', [
+    '{p} - {q}',
+    'Рассчитайте {p} - {q}.',
+    'Сколько будет {p} минус {q}?',
+    'Сколько будет {p} отнять {q}?',
+    'Какое число на {q} меньше {p}?',
+    'Отнимите {q} от {p}.',
+    'Вычислите {p} - {q}.',
+    'Чему равно {p} - {q}?',
+])
+
+
+_SUB_DIFFERENCE_TEMPLATES = example.register_templates(
+    'arithmetic.sub_difference', [
+        'Чему равна {} {}?'.format(adjective, pair)
+        for adjective in ['разница']
+        for pair in ['{p} и {q}', '{q} и {p}']
+    ])
+
+
 def _sub_question_or_entity(context, p, q, is_question):
   """Generates entity or question for subtraction p - q."""
   value = p.value - q.value
@@ -177,21 +200,10 @@ def _sub_question_or_entity(context, p, q, is_question):
     #     'Calculate {p} - {q}.',
     #     'What is {p} - {q}?',
     # ]
-    templates = [
-        '{p} - {q}',
-        'Рассчитайте {p} - {q}.',
-        'Сколько будет {p} минус {q}?',
-        'Сколько будет {p} отнять {q}?',
-        'Какое число на {q} меньше {p}?',
-        'Отнимите {q} от {p}.',
-        'Вычислите {p} - {q}.',
-        'Чему равно {p} - {q}?',
-    ]
+    templates = _SUB_TEMPLATES
     if sympy.Ge(p.value, q.value):
       # We calculate p - q, so the difference (|p - q|) is the correct answer.
-      for adjective in ['разница']:
-        for pair in ['{p} и {q}', '{q} и {p}']:
-          templates.append('Чему равна {} {}?'.format(adjective, pair))
+      templates += _SUB_DIFFERENCE_TEMPLATES
     template = random.choice(templates)
     return example.Problem(
         question=example.question(context, template, p=p, q=q),
@@ -271,6 +283,19 @@ def add_or_sub_in_base(sample_args):
       answer=display.NumberInBase(answer, base))
 
 
+_MUL_TEMPLATES = example.register_templates('arithmetic.mul', [
+    '{p}' + ops.MUL_SYMBOL + '{q}',
+    '{p} ' + ops.MUL_SYMBOL + ' {q}',
+    'Вычислите {p}' + ops.MUL_SYMBOL + '{q}.',
+    'Рассчитайте {p} ' + ops.MUL_SYMBOL + ' {q}.',
+    'Умножьте {p} и {q}.',
+    'Чему равно произведение {p} и {q}?',
+    'Умножьте {p} на {q}.',
+    'Сколько будет {p} умножить на {q}?',
+    'Каков результат произведения {p} и {q}?',
+])
+
+
 def mul(value, sample_args, context=None):
   """Returns random question for multiplying two numbers."""
   del value  # unused
@@ -296,18 +321,7 @@ def mul(value, sample_args, context=None):
     #     '{p} times {q}',
     #     'What is {p} times {q}?',
     # ]
-    templates = [
-        '{p}' + ops.MUL_SYMBOL + '{q}',
-        '{p} ' + ops.MUL_SYMBOL + ' {q}',
-        'Вычислите {p}' + ops.MUL_SYMBOL + '{q}.',
-        'Рассчитайте {p} ' + ops.MUL_SYMBOL + ' {q}.',
-        'Умножьте {p} и {q}.',
-        'Чему равно произведение {p} и {q}?',
-        'Умножьте {p} на {q}.',
-        'Сколько будет {p} умножить на {q}?',
-        'Каков результат произведения {p} и {q}?',
-    ]
-    template = random.choice(templates)
+    template = random.choice(_MUL_TEMPLATES)
     return example.Problem(
         question=example.question(context, template, p=p, q=q),
         answer=answer
@@ -320,6 +334,14 @@ def mul(value, sample_args, context=None):
         p=p, q=q)
 
 
+_DIV_TEMPLATES = example.register_templates('arithmetic.div', [
+    'Разделите {p} на {q}.',
+    'Чему равно {p} разделить на {q}',
+    'Сколько получится, если {p} поделить на {q}?',
+    'Чему равен результат деления {p} на {q}.',
+])
+
+
 def div(value, sample_args, context=None):
   """Returns random question for dividing two numbers."""
   del value  # unused
@@ -343,12 +365,7 @@ def div(value, sample_args, context=None):
   p, q = context.sample(sample_args, [p, q])
 
   if is_question:
-    template = random.choice([
-        'Разделите {p} на {q}.',
-        'Чему равно {p} разделить на {q}',
-        'Сколько получится, если {p} поделить на {q}?',
-        'Чему равен результат деления {p} на {q}.',
-    ])
+    template = random.choice(_DIV_TEMPLATES)
     return example.Problem(
         question=example.question(context, template, p=p, q=q),
         answer=answer
@@ -361,6 +378,27 @@ def div(value, sample_args, context=None):
         p=p, q=q)
 
 
+_ROOT_TEMPLATES = example.register_templates('arithmetic.root', [
+    'Сколько получится, если {value} возвести в степень 1/{one_over_exponent} и округлить до целого числа?',
+])
+
+
+_ROOT_ORDINAL_TEMPLATES = example.register_templates(
+    'arithmetic.root_ordinal', [
+        'Чему равен {ordinal} корень от {value}? Ответ округлите до целого числа.',
+    ])
+
+
+_ROOT_SQUARE_TEMPLATES = example.register_templates('arithmetic.root_square', [
+    'Чему равен квадратный корень {value}? Ответ округлите до целого числа.',
+])
+
+
+_ROOT_CUBE_TEMPLATES = example.register_templates('arithmetic.root_cube', [
+    'Чему равен корень кубический {value}? Ответ округлите до целого числа.',
+])
+
+
 def nearest_integer_root(sample_args):
   """E.g., "Calculate the cube root of 35 to the nearest integer."."""
   context = composition.Context()
@@ -380,9 +418,7 @@ def nearest_integer_root(sample_args):
   #     'What is {value} to the power of 1/{one_over_exponent}, to the nearest'
   #     ' integer?',
   # ]
-  templates = [
-      'Сколько получится, если {value} возвести в степень 1/{one_over_exponent} и округлить до целого числа?',
-  ]
+  templates = _ROOT_TEMPLATES
 
 
   if one_over_exponent != 2:  # "What is the second root of 4?" never used.
@@ -391,24 +427,18 @@ def nearest_integer_root(sample_args):
     #     'What is the {ordinal} root of {value} to the nearest integer?',
     # ]
 
-    templates += [
-        'Чему равен {ordinal} корень от {value}? Ответ округлите до целого числа.',
-    ]
+    templates += _ROOT_ORDINAL_TEMPLATES
 
   if one_over_exponent == 2:
     # templates += [
         # 'What is the square root of {value} to the nearest integer?',
     # ]
-    templates += [
-        'Чему равен квадратный корень {value}? Ответ округлите до целого числа.',
-    ]
+    templates += _ROOT_SQUARE_TEMPLATES
   elif one_over_exponent == 3:
     # templates += [
     #     'What is the cube root of {value} to the nearest integer?',
     # ]
-    templates += [
-        'Чему равен корень кубический {value}? Ответ округлите до целого числа.',
-    ]
+    templates += _ROOT_CUBE_TEMPLATES
 
   template = random.choice(templates)
 
@@ -420,6 +450,15 @@ def nearest_integer_root(sample_args):
       answer=answer)
 
 
+_CALCULATE_TEMPLATES = example.register_templates('arithmetic.calculate', [
+    # '{op}',
+    'Чему равно {op}?',
+    'Решите {op}.',
+    'Вычислите {op}.',
+    # 'What is the value of {op}?',
+])
+
+
 def _calculate(value, sample_args, context, add_sub, mul_div, length=None):
   """Questions for evaluating arithmetic expressions."""
   is_question = context is None
@@ -447,13 +486,7 @@ def _calculate(value, sample_args, context, add_sub, mul_div, length=None):
     #     'Calculate {op}.',
     #     'What is the value of {op}?',
     # ])
-    template = random.choice([
-        # '{op}',
-        'Чему равно {op}?',
-        'Решите {op}.',
-        'Вычислите {op}.',
-        # 'What is the value of {op}?',
-    ])
+    template = random.choice(_CALCULATE_TEMPLATES)
     return example.Problem(
         question=example.question(context, template, op=op),
         answer=value)
@@ -614,6 +647,12 @@ def _sample_surd(base, entropy, max_power, multiples_only):
   return which()
 
 
+_SIMPLIFY_SURD_TEMPLATES = example.register_templates(
+    'arithmetic.simplify_surd', [
+        'Упростите {exp}.',
+    ])
+
+
 def simplify_surd(value, sample_args, context=None):
   """E.g., "Simplify (2 + 5*sqrt(3))**2."."""
   del value  # unused
@@ -631,9 +670,7 @@ def simplify_surd(value, sample_args, context=None):
   exp = _sample_surd(base, entropy, max_power=2, multiples_only=False)
   simplified = sympy.expand(sympy.simplify(exp))
 
-  template = random.choice([
-      'Упростите {exp}.',
-  ])
+  template = random.choice(_SIMPLIFY_SURD_TEMPLATES)
   return example.Problem(
       question=example.question(context, template, exp=exp),
       answer=simplified)
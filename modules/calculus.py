@@ -69,30 +69,45 @@ def _generate_polynomial(num_variables, entropy, derivative_order,
       [extra_coefficients, coefficients], axis=derivative_axis)
 
 
-def _template(module_count, derivative_order, num_variables):
-  """Selects appropriate template."""
-  templates = [
-      'Найдите {nth_fem_gen} производную {eq} по {var}.',
-      'Чему равна {nth_fem} производная {eq} по {var}?',
-  ]
-  if derivative_order == 1:
-    templates += [
+_DERIVATIVE_TEMPLATES = example.register_templates('calculus.derivative', [
+    'Найдите {nth_fem_gen} производную {eq} по {var}.',
+    'Чему равна {nth_fem} производная {eq} по {var}?',
+])
+
+
+_FIRST_DERIVATIVE_TEMPLATES = example.register_templates(
+    'calculus.first_derivative', [
         'Продифференцируйте {eq} по переменной {var}.',
         'Продифференцируйте {eq} по {var}.',
         'Чему равна производная {eq} по {var}?',
-    ]
+    ])
 
-  derivative_variable_is_unambiguous = num_variables == 1 and module_count == 1
-  if derivative_variable_is_unambiguous:
-    templates += [
+
+_DERIVATIVE_UNAMBIGUOUS_TEMPLATES = example.register_templates(
+    'calculus.derivative_unambiguous', [
         'Найдите {nth_fem_gen} производную {eq}.',
         'Чему равна {nth_fem} производная {eq}?',
-    ]
+    ])
+
+
+_FIRST_DERIVATIVE_UNAMBIGUOUS_TEMPLATES = example.register_templates(
+    'calculus.first_derivative_unambiguous', [
+        'Продифференцируйте {eq}.',
+        'Найдите производную {eq}?',
+    ])
+
+
+def _template(module_count, derivative_order, num_variables):
+  """Selects appropriate template."""
+  templates = _DERIVATIVE_TEMPLATES
+  if derivative_order == 1:
+    templates += _FIRST_DERIVATIVE_TEMPLATES
+
+  derivative_variable_is_unambiguous = num_variables == 1 and module_count == 1
+  if derivative_variable_is_unambiguous:
+    templates += _DERIVATIVE_UNAMBIGUOUS_TEMPLATES
     if derivative_order == 1:
-      templates += [
-          'Продифференцируйте {eq}.',
-          'Найдите производную {eq}?',
-      ]
+      templates += _FIRST_DERIVATIVE_UNAMBIGUOUS_TEMPLATES
 
   return random.choice(templates)
 
@@ -161,7 +176,7 @@ def _differentiate_polynomial(value, sample_args, context, num_variables):
 
   if is_question:
     template = _template(context.module_count, derivative_order, len(variables))
-    answer = polynomials.coefficients_to_polynomial(value, variables).sympy()
+    answer = polynomials.coefficients_to_sympy(value, variables)
     return example.Problem(
         question=example.question(
             context, template, eq=polynomial, var=variable, nth=nth, 
@@ -79,6 +79,58 @@ def test_extra():
   }
 
 
+_PAIR_BIGGER_TEMPLATES = example.register_templates(
+    'comparison.pair_bigger', [
+        'Что больше: {left} или {right}?',
+        'Какое из чисел больше: {left} или {right}?',
+    ])
+
+
+_PAIR_SMALLER_TEMPLATES = example.register_templates(
+    'comparison.pair_smaller', [
+        'Что меньше: {left} или {right}?',
+        'Какое число меньше: {left} или {right}?'
+    ])
+
+
+_COMPARISON_TEMPLATES = {
+    '<': example.register_templates('comparison.lt', [
+        'Правда ли, что {left} ' + ops.LT_SYMBOL + ' {right}?',
+        '{left} меньше, чем {right}?',
+        'Число {left} меньше числа {right}?',
+    ]),
+    '<=': example.register_templates('comparison.le', [
+        'Правда ли, что {left} ' + ops.LE_SYMBOL + ' {right}?',
+        'Правда ли, что {left} меньше или равно {right}?',
+        'Число {left} не больше {right}?',
+        'Число {left} не превосходит {right}?',
+    ]),
+    '>': example.register_templates('comparison.gt', [
+        'Правда ли, что {left} ' + ops.GT_SYMBOL + ' {right}?',
+        '{left} больше, чем {right}?',
+        'Число {left} больше числа {right}?',
+    ]),
+    '>=': example.register_templates('comparison.ge', [
+        'Правда ли, что {left} ' + ops.GE_SYMBOL + ' {right}?',
+        'Правда ли, что {left} больше или равно {right}?',
+        'Число {left} не меньше {right}?',
+    ]),
+    '=': example.register_templates('comparison.eq', [
+        'Правда ли, что {left} ' + ops.EQ_SYMBOL + ' {right}?',
+        'Равны ли {left} и {right}?',
+        'Число {left} равно числу {right}?',
+        'Одинаковы ли {left} и {right}?',
+    ]),
+    '!=': example.register_templates('comparison.ne', [
+        'Правда ли, что {left} ' + ops.NE_SYMBOL + ' {right}?',
+        'Число {left} не равно {right}?',
+        'Числа {left} и {right} не равны?',
+        'Значения числа {left} и числа {right} отличаются?',
+        '{left} и {right} не равны друг другу?',
+    ]),
+}
+
+
 def _make_comparison_question(context, left, right):
   """Makes a question for comparing two values."""
   if random.choice([False, True]) and sympy.Ne(left.value, right.value):
@@ -86,17 +138,11 @@ def _make_comparison_question(context, left, right):
     if random.choice([False, True]):
       answer = (
           left.handle if sympy.Gt(left.value, right.value) else right.handle)
-      template = random.choice([
-          'Что больше: {left} или {right}?',
-          'Какое из чисел больше: {left} или {right}?',
-      ])
+      template = random.choice(_PAIR_BIGGER_TEMPLATES)
     else:
       answer = (
           left.handle if sympy.Lt(left.value, right.value) else right.handle)
-      template = random.choice([
-          'Что меньше: {left} или {right}?',
-          'Какое число меньше: {left} или {right}?'
-      ])
+      template = random.choice(_PAIR_SMALLER_TEMPLATES)
     return example.Problem(
         question=example.question(context, template, left=left, right=right),
         answer=answer)
@@ -110,45 +156,8 @@ def _make_comparison_question(context, left, right):
       '!=': sympy.Ne,
   }
 
-  templates = {
-      '<': [
-          'Правда ли, что {left} ' + ops.LT_SYMBOL + ' {right}?',
-          '{left} меньше, чем {right}?',
-          'Число {left} меньше числа {right}?',
-      ],
-      '<=': [
-          'Правда ли, что {left} ' + ops.LE_SYMBOL + ' {right}?',
-          'Правда ли, что {left} меньше или равно {right}?',
-          'Число {left} не больше {right}?',
-          'Число {left} не превосходит {right}?',
-      ],
-      '>': [
-          'Правда ли, что {left} ' + ops.GT_SYMBOL + ' {right}?',
-          '{left} больше, чем {right}?',
-          'Число {left} больше числа {right}?',
-      ],
-      '>=': [
-          'Правда ли, что {left} ' + ops.GE_SYMBOL + ' {right}?',
-          'Правда ли, что {left} больше или равно {right}?',
-          'Число {left} не меньше {right}?',
-      ],
-      '=': [
-          'Правда ли, что {left} ' + ops.EQ_SYMBOL + ' {right}?',
-          'Равны ли {left} и {right}?',
-          'Число {left} равно числу {right}?',
-          'Одинаковы ли {left} и {right}?',
-      ],
-      '!=': [
-          'Правда ли, что {left} ' + ops.NE_SYMBOL + ' {right}?',
-          'Число {left} не равно {right}?',
-          'Числа {left} и {right} не равны?',
-          'Значения числа {left} и числа {right} отличаются?',
-          '{left} и {right} не равны друг другу?',
-      ],
-  }
-
   comparison = random.choice(list(comparisons.keys()))
-  template = random.choice(templates[comparison])
+  template = random.choice(_COMPARISON_TEMPLATES[comparison])
   question = example.question(context, template, left=left, right=right)
   answer = comparisons[comparison](left.value, right.value)
 
@@ -274,15 +283,14 @@ def _unique_values(entropy, only_integers=False, count=None):
   if count is None:
     count = random.randint(*_sort_count_range(entropy))
 
-  if only_integers:
-    sampler = functools.partial(number.integer, signed=True)
-  else:
-    sampler = integer_or_rational_or_decimal
-
   for _ in range(1000):
     entropies = entropy * np.random.dirichlet(np.ones(count))
     entropies = np.maximum(1, entropies)
-    values = [sampler(ent) for ent in entropies]
+    if only_integers:
+      values = [sympy.Integer(value)
+                for value in number.integers(entropies, signed=True)]
+    else:
+      values = [integer_or_rational_or_decimal(ent) for ent in entropies]
     if len(sympy.FiniteSet(*values)) == len(values):
       return values
   raise ValueError('Could not generate {} unique values with entropy={}'
@@ -14,6 +14,7 @@ from modules import train_test_split
 from sample import number
 from util import composition
 from util import display
+from util import factorization
 import six
 import sympy
 
@@ -160,7 +161,7 @@ def check_one_ending(num):
 def _factor_non_decimal(value):
   """Extras x dividing value such that x is coprime to 2 and 5."""
   result = 1
-  factors = sympy.factorint(value)
+  factors = factorization.factorint(value)
   for factor, power in six.iteritems(factors):
     if factor not in [2, 5]:
       result *= factor ** power
@@ -179,6 +180,22 @@ def _sample_conversion_decimal(dimension, is_extrapolation):
   return base_value, base_unit, target_value, target_unit
 
 
+_CONVERSION_DECIMAL_TEMPLATES = example.register_templates(
+    'measurement.conversion_decimal', [
+        'Сколько {target_name_skolko} в {base_value} {base_name_v}?',
+        'Переведите {base_value} {base_name_perevedi} в {target_name}.',
+        'Сконвертируйте {base_value} {base_name_perevedi} в {target_name}.',
+    ])
+
+
+_CONVERSION_DECIMAL_SYMBOL_TEMPLATES = example.register_templates(
+    'measurement.conversion_decimal_symbol', [
+        'Сколько {target_name_skolko} в {base_value}{base_symbol}?',
+        'Переведите {base_value}{base_symbol} в {target_name}?',
+        'Сконвертируйте {base_value}{base_symbol} в {target_name}.',
+    ])
+
+
 def _conversion_decimal(context, is_train, is_extrapolation):
   """E.g., "How many grams are in 5kg?"."""
   dimension = random.choice(DIMENSIONS)
@@ -189,17 +206,9 @@ def _conversion_decimal(context, is_train, is_extrapolation):
       break
 
 
-  templates = [
-      'Сколько {target_name_skolko} в {base_value} {base_name_v}?',
-      'Переведите {base_value} {base_name_perevedi} в {target_name}.',
-      'Сконвертируйте {base_value} {base_name_perevedi} в {target_name}.',
-  ]
+  templates = _CONVERSION_DECIMAL_TEMPLATES
   if base_unit.symbol is not None:
-    templates += [
-        'Сколько {target_name_skolko} в {base_value}{base_symbol}?',
-        'Переведите {base_value}{base_symbol} в {target_name}?',
-        'Сконвертируйте {base_value}{base_symbol} в {target_name}.',
-    ]
+    templates += _CONVERSION_DECIMAL_SYMBOL_TEMPLATES
   template = random.choice(templates)
 
   base_name = base_unit.name
@@ -229,6 +238,15 @@ def _conversion_decimal(context, is_train, is_extrapolation):
   return example.Problem(question=question, answer=target_value)
 
 
+# Pairs of template and the grammatical case of the base value in it.
+_CONVERSION_FRACTION_TEMPLATES_AND_CASES = list(zip(
+    example.register_templates('measurement.conversion_fraction', [
+        'Сколько {target_name_skolko} в {base_value} {base_name_fraction}?',
+        'Переведите {base_value} {base_name_fraction} в {target_name}?',
+    ]),
+    ['v', 'perevedi']))
+
+
 def _conversion_fraction(context, is_train):
   """E.g., "How many grams are in three quarters of a kg?"."""
   dimension = random.choice(DIMENSIONS)
@@ -250,10 +268,7 @@ def _conversion_fraction(context, is_train):
         and (allow_zero or answer != 0)):
       break
 
-  template, case = random.choice([
-      ('Сколько {target_name_skolko} в {base_value} {base_name_fraction}?', 'v'),
-      ('Переведите {base_value} {base_name_fraction} в {target_name}?', 'perevedi'),
-  ])
+  template, case = random.choice(_CONVERSION_FRACTION_TEMPLATES_AND_CASES)
 
   if sympy.denom(base_value) > 20 or random.choice([False, True]):
     base_value_string = base_value  # Will be represented as e.g., 2/3.
@@ -282,15 +297,29 @@ def conversion(is_train, is_extrapolation):
     return _conversion_fraction(context, is_train=is_train)
 
 
+_TIME_START_TEMPLATES = example.register_templates('measurement.time_start', [
+    'Сейчас {end}. Сколько времени было {duration} минут назад?',
+])
+
+
+_TIME_END_TEMPLATES = example.register_templates('measurement.time_end', [
+    'Сейчас {start}. Сколько будет через {duration} минут?',
+])
+
+
+_TIME_DURATION_TEMPLATES = example.register_templates(
+    'measurement.time_duration', [
+        'Сколько минут между {start} и {end}?',
+    ])
+
 
 def time(is_train):
   """Questions for calculating start, end, or time differences."""
   context = composition.Context()
   start_minutes = random.randint(1, 24*60 - 1)
-  while True:
-    duration_minutes = random.randint(1, 12*60 - 1)
-    if train_test_split.is_train(duration_minutes) == is_train:
-      break
+  train_durations, test_durations = train_test_split.split_range(1, 12*60)
+  duration_minutes = random.choice(
+      train_durations if is_train else test_durations)
   end_minutes = start_minutes + duration_minutes
 
   def format_24hr(minutes):
@@ -307,9 +336,7 @@ def time(is_train):
   which_question = random.randint(0, 3)
   if which_question == 0:
     # Question: What is start = end - duration?
-    template = random.choice([
-        'Сейчас {end}. Сколько времени было {duration} минут назад?',
-    ])
+    template = random.choice(_TIME_START_TEMPLATES)
 
 
     return example.Problem(
@@ -318,18 +345,14 @@ def time(is_train):
         answer=start)
   elif which_question == 1:
     # Question: What is end = start + duration?
-    template = random.choice([
-        'Сейчас {start}. Сколько будет через {duration} минут?',
-    ])
+    template = random.choice(_TIME_END_TEMPLATES)
     return example.Problem(
         question=example.question(
             context, template, duration=duration_minutes, start=start),
         answer=end)
   else:
     # Question: What is duration = end - start?
-    template = random.choice([
-        'Сколько минут между {start} и {end}?',
-    ])
+    template = random.choice(_TIME_DURATION_TEMPLATES)
     return example.Problem(
         question=example.question(context, template, start=start, end=end),
         answer=duration_minutes)
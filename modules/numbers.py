@@ -13,6 +13,7 @@ import example
 from sample import number
 from util import composition
 from util import display
+from util import factorization
 import numpy as np
 import six
 from six.moves import range
@@ -97,6 +98,12 @@ def test_extra():
   }
 
 
+_PLACE_VALUE_TEMPLATES = example.register_templates('numbers.place_value', [
+    'Какая цифра в числе {integer} соответствует разряду {place_name}.',
+    'Какая цифра стоит в разряде {place_name} в числе {integer}?',
+])
+
+
 def place_value(value, sample_args, context=None):
   """E.g., "Q: What is the tens digit of 31859? A: 5."""
   del value  # unused for now
@@ -128,12 +135,18 @@ def place_value(value, sample_args, context=None):
   return example.Problem(
       question=example.question(
           context,
-          np.random.choice(['Какая цифра в числе {integer} соответствует разряду {place_name}.',
-          'Какая цифра стоит в разряде {place_name} в числе {integer}?',]),
+          _PLACE_VALUE_TEMPLATES[
+              np.random.randint(len(_PLACE_VALUE_TEMPLATES))],
           place_name=place_name, integer=entity.expression_else_handle),
       answer=answer)
 
 
+_ROUND_NUMBER_TEMPLATES = example.register_templates('numbers.round_number', [
+    'Округлите {input} до {description}.',
+    'Сколько получится, если {input} округлить до {description}?',
+])
+
+
 # TODO(b/124040078): add to composition system?
 def round_number(value, sample_args, context=None):
   """Question for rounding integers and decimals."""
@@ -229,10 +242,7 @@ def round_number(value, sample_args, context=None):
       dps = display.StringNumber(dps, case='do')
     description = description.format(dps=dps, ending=ending)
 
-  template = random.choice([
-      'Округлите {input} до {description}.',
-      'Сколько получится, если {input} округлить до {description}?',
-  ])
+  template = random.choice(_ROUND_NUMBER_TEMPLATES)
 
   return example.Problem(
       question=example.question(
@@ -297,6 +307,18 @@ def is_prime(value, sample_args, context=None):
       answer=answer)
 
 
+_IS_FACTOR_TEMPLATES = example.register_templates('numbers.is_factor', [
+    # 'Is {maybe_factor} a factor of {value}?',
+    # 'Is {value} a multiple of {maybe_factor}?',
+    'Является ли {maybe_factor} делителем {value}?',
+])
+
+
+_IS_EVEN_TEMPLATES = example.register_templates('numbers.is_even', [
+    'Является ли {value} четным?',
+])
+
+
 def is_factor(value, sample_args, context=None):
   """E.g., "Is 5 a factor of 48?"."""
   del value  # unused
@@ -317,15 +339,9 @@ def is_factor(value, sample_args, context=None):
 
   (entity,) = context.sample(sample_args, [integer])
 
-  templates = [
-      # 'Is {maybe_factor} a factor of {value}?',
-      # 'Is {value} a multiple of {maybe_factor}?',
-      'Является ли {maybe_factor} делителем {value}?',
-  ]
+  templates = _IS_FACTOR_TEMPLATES
   if maybe_factor == 2:
-    templates += [
-        'Является ли {value} четным?',
-    ]
+    templates += _IS_EVEN_TEMPLATES
   template = random.choice(templates)
 
   answer = integer % maybe_factor == 0
@@ -336,6 +352,15 @@ def is_factor(value, sample_args, context=None):
       answer=answer)
 
 
+_LIST_PRIME_FACTORS_TEMPLATES = example.register_templates(
+    'numbers.list_prime_factors', [
+        # 'What are the prime factors of {integer}?',
+        # 'List the prime factors of {integer}.',
+        'Найдите простые делители числа {integer}?',
+        'Перечислите простые делители числа {integer}.',
+    ])
+
+
 def list_prime_factors(value, sample_args, context=None):
   """E.g., "What are the prime factors of 36?"."""
   del value  # unused for now
@@ -348,13 +373,8 @@ def list_prime_factors(value, sample_args, context=None):
   integer = number.integer(entropy, signed=False, min_abs=2)
 
   (entity,) = context.sample(sample_args, [integer])
-  prime_factors = sorted(sympy.factorint(integer).keys())
-  template = random.choice([
-      # 'What are the prime factors of {integer}?',
-      # 'List the prime factors of {integer}.',
-      'Найдите простые делители числа {integer}?',
-      'Перечислите простые делители числа {integer}.',
-  ])
+  prime_factors = sorted(factorization.factorint(integer).keys())
+  template = random.choice(_LIST_PRIME_FACTORS_TEMPLATES)
   return example.Problem(
       question=example.question(
           context, template, integer=entity.expression_else_handle),
@@ -377,6 +397,20 @@ def _pair_with_large_hidden_factor(entropy):
   return p, q
 
 
+_LCM_TEMPLATES = example.register_templates('numbers.lcm', [
+    'Найдите {adjective} общий множитель {p} и {q}.',
+    'Какой {adjective} общий множитель у {p} и {q}?',
+])
+
+
+_COMMON_DENOMINATOR_TEMPLATES = example.register_templates(
+    'numbers.common_denominator', [
+        'Найдите общий знаменатель {p} и {q}.',
+        'Чему равен общий знаменатель {p} и {q}?',
+        # 'Calculate the common denominator of {p} and {q}.',
+    ])
+
+
 def lcm(value, sample_args, context=None):
   """Question for least common multiple of p and q."""
   del value  # unused
@@ -392,10 +426,7 @@ def lcm(value, sample_args, context=None):
     p, q = context.sample(sample_args, [p, q])
     # Ask the question directly.
     adjective = random.choice(['наименьший'])
-    template = random.choice([
-        'Найдите {adjective} общий множитель {p} и {q}.',
-        'Какой {adjective} общий множитель у {p} и {q}?',
-    ])
+    template = random.choice(_LCM_TEMPLATES)
     return example.Problem(
         question=example.question(
             context, template, adjective=adjective, p=p.expression_else_handle,
@@ -407,11 +438,7 @@ def lcm(value, sample_args, context=None):
     q = number.integer(2, signed=True, coprime_to=q) / q
     p, q = context.sample(sample_args, [p, q])
 
-    template = random.choice([
-        'Найдите общий знаменатель {p} и {q}.',
-        'Чему равен общий знаменатель {p} и {q}?',
-        # 'Calculate the common denominator of {p} and {q}.',
-    ])
+    template = random.choice(_COMMON_DENOMINATOR_TEMPLATES)
     return example.Problem(
         question=example.question(
             context, template, p=p.expression_else_handle,
@@ -422,7 +449,7 @@ def lcm(value, sample_args, context=None):
 def _random_coprime_pair(entropy):
   """Returns a pair of random coprime integers."""
   coprime_product = number.integer(entropy, False, min_abs=1)
-  factors = sympy.factorint(coprime_product)
+  factors = factorization.factorint(coprime_product)
   def take():
     prime = random.choice(list(factors.keys()))
     power = factors[prime]
@@ -443,6 +470,12 @@ def _random_coprime_pair(entropy):
   return left, right
 
 
+_GCD_TEMPLATES = example.register_templates('numbers.gcd', [
+    'Расчитайте {adjective} {p} и {q}.',
+    'Чему равен {adjective} {p} и {q}?',
+])
+
+
 # @composition.module(number.is_positive_integer)
 def gcd(value, sample_args, context=None):
   """Question for greatest common divisor of p and q."""
@@ -468,10 +501,7 @@ def gcd(value, sample_args, context=None):
                + random.choice(['знаменатель']))
 
   if is_question:
-    template = random.choice([
-        'Расчитайте {adjective} {p} и {q}.',
-        'Чему равен {adjective} {p} и {q}?',
-    ])
+    template = random.choice(_GCD_TEMPLATES)
     return example.Problem(
         question=example.question(
             context, template, adjective=adjective, p=p, q=q),
@@ -484,6 +514,12 @@ def gcd(value, sample_args, context=None):
         adjective=adjective, p=p, q=q)
 
 
+_DIV_REMAINDER_TEMPLATES = example.register_templates('numbers.div_remainder', [
+    'Расчитайте остаток от деления {p} на {q}.',
+    'Чему равен остаток деления {p} на {q}?',
+])
+
+
 # @composition.module(number.is_positive_integer)
 def div_remainder(value, sample_args, context=None):
   """E.g., "What is the remainder when 27 is divided by 5?"."""
@@ -507,10 +543,7 @@ def div_remainder(value, sample_args, context=None):
   p, q = context.sample(sample_args, [p, q])
 
   if is_question:
-    template = random.choice([
-        'Расчитайте остаток от деления {p} на {q}.',
-        'Чему равен остаток деления {p} на {q}?',
-    ])
+    template = random.choice(_DIV_REMAINDER_TEMPLATES)
     return example.Problem(
         question=example.question(
             context, template, p=p.expression_else_handle,
@@ -524,6 +557,14 @@ def div_remainder(value, sample_args, context=None):
         p=p, q=q)
 
 
+_BASE_CONVERSION_TEMPLATES = example.register_templates(
+    'numbers.base_conversion', [
+        # '{from_str} (base {from_base}) to base {to_base}',
+        'Приведите {from_str} (по основанию {from_base}) к основанию {to_base}.',
+        # 'What is {from_str} (base {from_base}) in base {to_base}?',
+    ])
+
+
 def base_conversion(min_entropy, max_entropy):
   """E.g., "What is 17 base 8 in base 10?"."""
   context = composition.Context()
@@ -540,11 +581,7 @@ def base_conversion(min_entropy, max_entropy):
       min_entropy - entropy_used, max_entropy - entropy_used)
 
   value = number.integer(entropy, signed=True)
-  template = random.choice([
-      # '{from_str} (base {from_base}) to base {to_base}',
-      'Приведите {from_str} (по основанию {from_base}) к основанию {to_base}.',
-      # 'What is {from_str} (base {from_base}) in base {to_base}?',
-  ])
+  template = random.choice(_BASE_CONVERSION_TEMPLATES)
   return example.Problem(
       question=example.question(
           context, template,
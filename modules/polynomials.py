@@ -68,6 +68,15 @@ def test_extra():
   }
 
 
+_COEFFICIENT_NAMED_TEMPLATES = example.register_templates(
+    'polynomials.coefficient_named', [
+        'Выразите {expression} в форме {canonical} и найдите {target}.',
+        'Преобразуйте {expression} в форму {canonical} и найдите {target}.',
+        # 'Express {expression} in the form {canonical} and give {target}.',
+        # 'Rearrange {expression} to the form {canonical} and give {target}.',
+    ])
+
+
 def coefficient_named(value, sample_args, context=None):
   """E.g., "Express x^2 + 2x in the form h * x^2 + k * x + t and give h."."""
   del value  # not used
@@ -98,12 +107,7 @@ def coefficient_named(value, sample_args, context=None):
   value = coefficients[power]
   named_coeff = named_coeffs[power]
 
-  template = random.choice([
-      'Выразите {expression} в форме {canonical} и найдите {target}.',
-      'Преобразуйте {expression} в форму {canonical} и найдите {target}.',
-      # 'Express {expression} in the form {canonical} and give {target}.',
-      # 'Rearrange {expression} to the form {canonical} and give {target}.',
-  ])
+  template = random.choice(_COEFFICIENT_NAMED_TEMPLATES)
   return example.Problem(
       question=example.question(
           context, template, expression=expression, canonical=canonical,
@@ -210,8 +214,7 @@ def add(value, sample_args, context=None):
       c1.handle * fn1.handle.apply(var) + c2.handle * fn2.handle.apply(var))
 
   if is_question:
-    answer = polynomials.coefficients_to_polynomial(value.coefficients, var)
-    answer = answer.sympy()
+    answer = polynomials.coefficients_to_sympy(value.coefficients, var)
     template = random.choice(_TEMPLATES)
     return example.Problem(
         question=example.question(context, template, composed=expression),
@@ -228,6 +231,11 @@ def add(value, sample_args, context=None):
         composed=expression)
 
 
+_EXPAND_TEMPLATES = example.register_templates('polynomials.expand', [
+    'Раскройте скобки {expression}.'
+])
+
+
 def expand(value, sample_args, context=None):
   """E.g., "Expand (x**2 + 1)**2."."""
   del value  # not used
@@ -242,9 +250,7 @@ def expand(value, sample_args, context=None):
   entropy -= math.log10(max_order - min_order + 1)
   expression_ = polynomials.sample_with_brackets(variable, order, entropy)
   expanded = sympy.expand(expression_)
-  template = random.choice([
-      'Раскройте скобки {expression}.'
-  ])
+  template = random.choice(_EXPAND_TEMPLATES)
   return example.Problem(
       question=example.question(context, template, expression=expression_),
       answer=expanded)
@@ -283,7 +289,7 @@ def collect(value, sample_args, context=None):
   num_variables = coefficients.ndim
   variables = [sympy.Symbol(context.pop()) for _ in range(num_variables)]
   unsimplified = polynomials.coefficients_to_polynomial(coefficients, variables)
-  simplified = unsimplified.sympy().expand()
+  simplified = polynomials.coefficients_to_sympy(value.coefficients, variables)
 
   # Bit of a hack: handle the very rare case where no number constants appearing
   if not ops.number_constants(unsimplified):
@@ -327,10 +333,8 @@ def compose(value, sample_args, context=None):
 
   variable = sympy.var(context.pop())
 
-  poly_f = polynomials.coefficients_to_polynomial(coeffs_f, variable)
-  poly_g = polynomials.coefficients_to_polynomial(coeffs_g, variable)
-
-  poly_f_g = poly_f.sympy().subs(variable, poly_g.sympy()).expand()
+  coeffs_f_g = polynomials.compose_coefficients(coeffs_f, coeffs_g)
+  poly_f_g = polynomials.coefficients_to_sympy(coeffs_f_g, variable)
 
   expression = composition.FunctionHandle(entity_f, entity_g).apply(variable)
 
@@ -340,6 +344,12 @@ def compose(value, sample_args, context=None):
       answer=poly_f_g)
 
 
+_SIMPLIFY_POWER_TEMPLATES = example.register_templates(
+    'polynomials.simplify_power', [
+        'Упростите {unsimplified} при условии, что переменная {variable} положительна.',
+    ])
+
+
 def simplify_power(value, sample_args, context=None):
   """E.g., "Simplify ((x**2)**3/x**4)**2/x**3."."""
   del value  # unused
@@ -352,9 +362,7 @@ def simplify_power(value, sample_args, context=None):
   unsimplified = polynomials.sample_messy_power(variable, entropy)
   answer = unsimplified.sympy()
 
-  template = random.choice([
-      'Упростите {unsimplified} при условии, что переменная {variable} положительна.',
-  ])
+  template = random.choice(_SIMPLIFY_POWER_TEMPLATES)
   return example.Problem(
       example.question(
           context, template, unsimplified=unsimplified, variable=variable),
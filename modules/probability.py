@@ -18,20 +18,21 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import bisect
 import collections
 import functools
+import math
 import random
 import string
 import re
 
 # Dependency imports
-from mathematics_dataset import example
-from mathematics_dataset.modules import train_test_split
+import example
+from modules import train_test_split
 from util import combinatorics
 from util import composition
 from util import display
 from util import probability
-import numpy as np
 from six.moves import range
 from six.moves import zip
 
@@ -118,6 +119,12 @@ def _word_series(words, conjunction='и'):
   return '{} {} {}'.format(', '.join(words[:-1]), conjunction, words[-1])
 
 
+_LEVEL_SET_EVENT_TEMPLATES = example.register_templates(
+    'probability.level_set_event', [
+        '{verbing} {counts_and_values}',
+    ])
+
+
 def _level_set_event(values, length, verb):
   """Generates `LevelSetEvent`; see _generate_sequence_event."""
   counts = combinatorics.uniform_non_negative_integers_with_sum(
@@ -134,9 +141,7 @@ def _level_set_event(values, length, verb):
       if counts_dict[value] > 0
   ]
   counts_and_values = _word_series(counts_and_values)
-  template = random.choice([
-      '{verbing} {counts_and_values}',
-  ])
+  template = random.choice(_LEVEL_SET_EVENT_TEMPLATES)
   verbing = _GERUNDS[verb]
   event_description = template.format(
       counts_and_values=counts_and_values, verbing=verbing)
@@ -148,20 +153,82 @@ LetterBag = collections.namedtuple(
     ('weights', 'random_variable', 'letters_distinct', 'bag_contents'))
 
 
-def _sample_letter_bag(is_train, min_total):
-  """Samples a "container of letters" and returns info on it."""
-  while True:
+# Maps `(split hash, is_train, min_total)` to pair `(cumulative_weights,
+# partitions)`; see `_letter_counts_table`.
+_LETTER_COUNTS_TABLES = {}
+
+
+def _letter_counts_table(is_train, min_total):
+  """Returns table for sampling letter counts in the given split.
+
+  The letter counts are distributed as when sampling the number of distinct
+  letters and the total uniformly, then the counts uniformly given those, and
+  rejecting counts whose sorted values are not in the split.
+
+  Args:
+    is_train: Boolean; the split.
+    min_total: Minimum total number of letters.
+
+  Returns:
+    Pair `(cumulative_weights, partitions)` of lists, where `partitions`
+    contains the sorted letter counts in the split, and `cumulative_weights`
+    the cumulative sum of their probabilities (unnormalized).
+  """
+  key = (train_test_split.get_hash(), is_train, min_total)
+  table = _LETTER_COUNTS_TABLES.get(key)
+  if table is not None:
+    return table
+  cumulative_weights = []
+  partitions = []
+  cumulative_weight = 0.0
+  for num_distinct_letters in range(1, _MAX_DISTINCT_LETTERS + 1):
+    min_letters_total = max(num_distinct_letters, min_total)
+    max_letters_total = min(
+        _MAX_TOTAL_LETTERS, num_distinct_letters * _MAX_LETTER_REPEAT)
+    for num_letters_total in range(min_letters_total, max_letters_total + 1):
+      # Number of orderings of letter counts with this total (compositions),
+      # each of which is sampled with equal probability.
+      num_counts = (
+          math.factorial(num_letters_total - 1)
+          // math.factorial(num_distinct_letters - 1)
+          // math.factorial(num_letters_total - num_distinct_letters))
+      weight = 1 / (max_letters_total - min_letters_total + 1) / num_counts
+      for partition in combinatorics.partitions(
+          num_letters_total, num_distinct_letters):
+        if train_test_split.is_train(partition) == is_train:
+          cumulative_weight += (
+              weight * combinatorics.number_orderings(partition))
+          cumulative_weights.append(cumulative_weight)
+          partitions.append(partition)
+  table = _LETTER_COUNTS_TABLES[key] = (cumulative_weights, partitions)
+  return table
+
+
+def _sample_letter_counts(is_train, min_total):
+  """Returns list of counts of distinct letters, for `_sample_letter_bag`."""
+  if is_train is None:
     num_distinct_letters = random.randint(1, _MAX_DISTINCT_LETTERS)
     num_letters_total = random.randint(
         max(num_distinct_letters, min_total),
         min(_MAX_TOTAL_LETTERS, num_distinct_letters * _MAX_LETTER_REPEAT))
-    letter_counts = combinatorics.uniform_positive_integers_with_sum(
+    return combinatorics.uniform_positive_integers_with_sum(
         num_distinct_letters, num_letters_total)
 
-    # Test/train split.
-    if (is_train is None
-        or train_test_split.is_train(sorted(letter_counts)) == is_train):
-      break
+  # Test/train split: sample the sorted counts from those in the split, then
+  # order them uniformly.
+  cumulative_weights, partitions = _letter_counts_table(is_train, min_total)
+  index = bisect.bisect(
+      cumulative_weights, random.random() * cumulative_weights[-1])
+  letter_counts = list(partitions[min(index, len(partitions) - 1)])
+  random.shuffle(letter_counts)
+  return letter_counts
+
+
+def _sample_letter_bag(is_train, min_total):
+  """Samples a "container of letters" and returns info on it."""
+  letter_counts = _sample_letter_counts(is_train, min_total)
+  num_distinct_letters = len(letter_counts)
+  num_letters_total = sum(letter_counts)
 
   letters_distinct = random.sample(_LETTERS, num_distinct_letters)
   weights = {i: 1 for i in range(num_letters_total)}
@@ -214,17 +281,18 @@ def _swr_space(is_train, sample_range):
   return sample.letters_distinct, space, random_variable
 
 
+_SWR_PROBABILITY_TEMPLATES = example.register_templates(
+    'probability.swr_probability', [
+        '{random_variable_capitalize}. Какова вероятность {event}?',
+        '{random_variable_capitalize}. Рассчитайте вероятность {event}.',
+        'Чему равна вероятность {event} при условии, что {random_variable}?',
+        'Рассчитайте вероятность {event} при условии, что {random_variable}.',
+    ])
+
+
 def _sample_without_replacement_probability_question(
     is_train, event_fn, sample_range):
   """Question for prob of some event when sampling without replacement."""
-  def too_big(event_in_space):
-    if isinstance(event_in_space, probability.SequenceEvent):
-      size = len(event_in_space.all_sequences())
-    else:
-      assert isinstance(event_in_space, probability.FiniteProductEvent)
-      size = np.prod([len(event.values) for event in event_in_space.events])
-    return size > int(2e5)
-
   allow_trivial_prob = random.random() < _MAX_FRAC_TRIVIAL_PROB
 
   while True:
@@ -234,20 +302,13 @@ def _sample_without_replacement_probability_question(
     event, event_description = event_fn(
         values=distinct_letters, length=space.n_samples, verb='выбрать')
     event_in_space = random_variable.inverse(event)
-    if too_big(event_in_space):
-      continue
     answer = space.probability(event_in_space)
     if answer not in [0, 1] or allow_trivial_prob:
       break
 
   context = composition.Context()
 
-  template = random.choice([
-      '{random_variable_capitalize}. Какова вероятность {event}?',
-      '{random_variable_capitalize}. Рассчитайте вероятность {event}.',
-      'Чему равна вероятность {event} при условии, что {random_variable}?',
-      'Рассчитайте вероятность {event} при условии, что {random_variable}.',
-  ])
+  template = random.choice(_SWR_PROBABILITY_TEMPLATES)
   question = example.question(
       context,
       template,
@@ -1,4 +1,17 @@
-"""Utility for train/test split based on hash value."""
+"""Utility for train/test split based on hash value.
+
+A value is assigned to the train or test split by hashing `str(value)` (UTF-8
+encoded). Two hashes are available, selected with `set_hash`:
+
+*   'blake2b' (the default): an 8-byte BLAKE2b digest, which is cheaper to
+    compute.
+*   'md5': the assignment of earlier versions of the dataset, kept for
+    compatibility.
+
+Assignments are memoized, and `split_range` returns precomputed tables of the
+train and test values of a small range of integers, so that callers can sample
+directly from the allowed values instead of rejecting those in the other split.
+"""
 
 from __future__ import absolute_import
 from __future__ import division
@@ -6,8 +19,81 @@ from __future__ import print_function
 
 import hashlib
 
+# Dependency imports
+from six.moves import range
+
+
+HASHES = ('blake2b', 'md5')
+
+# Maximum number of memoized assignments; the cache is cleared when full.
+CACHE_SIZE = 2**16
+
+_hash = 'blake2b'
+
+# Maps `str(value)` to whether it is in the train split, for `_hash`.
+_cache = {}
+
+# Maps `(start, stop)` to pair of tuples `(train_values, test_values)`.
+_range_tables = {}
+
+
+def set_hash(name):
+  """Sets the hash used to assign values to splits (one of `HASHES`)."""
+  global _hash
+  if name not in HASHES:
+    raise ValueError('Unknown hash {}; expected one of {}'.format(name, HASHES))
+  if name != _hash:
+    _hash = name
+    _cache.clear()
+    _range_tables.clear()
+
+
+def get_hash():
+  """Returns the name of the hash set by `set_hash`."""
+  return _hash
+
+
+def _is_train_uncached(key):
+  """Returns whether the string `key` is in the train split, for `_hash`."""
+  data = key.encode('utf-8')
+  if _hash == 'blake2b':
+    digest = hashlib.blake2b(data, digest_size=8).digest()
+  else:
+    digest = hashlib.md5(data).digest()
+  # Same as `int(hexdigest, 16) % 2 == 0`: the parity of the last byte.
+  return not bytearray(digest)[-1] & 1
+
 
 def is_train(value):
   """Returns whether `value` should be used in a training question."""
-  value_as_string = str(value).encode('utf-8')
-  return int(hashlib.md5(value_as_string).hexdigest(), 16) % 2 == 0
+  key = str(value)
+  result = _cache.get(key)
+  if result is None:
+    if len(_cache) >= CACHE_SIZE:
+      _cache.clear()
+    result = _cache[key] = _is_train_uncached(key)
+  return result
+
+
+def split_range(start, stop):
+  """Returns the integers in `range(start, stop)` in each split.
+
+  Args:
+    start: Integer.
+    stop: Integer.
+
+  Returns:
+    Pair of tuples `(train_values, test_values)`, each in increasing order.
+  """
+  tables = _range_tables.get((start, stop))
+  if tables is None:
+    train_values = []
+    test_values = []
+    for value in range(start, stop):
+      if _is_train_uncached(str(value)):
+        train_values.append(value)
+      else:
+        test_values.append(value)
+    tables = _range_tables[(start, stop)] = (
+        tuple(train_values), tuple(test_values))
+  return tables
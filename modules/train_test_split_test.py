@@ -0,0 +1,54 @@
+"""Tests for mathematics_dataset.modules.train_test_split."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import hashlib
+
+# Dependency imports
+from absl.testing import absltest
+from absl.testing import parameterized
+from modules import train_test_split
+from six.moves import range
+
+
+class TrainTestSplitTest(parameterized.TestCase):
+
+  def setUp(self):
+    super(TrainTestSplitTest, self).setUp()
+    self.addCleanup(train_test_split.set_hash, train_test_split.get_hash())
+
+  def testIsTrain_md5(self):
+    train_test_split.set_hash('md5')
+    for value in list(range(100)) + [[1, 2], 'abc', 0.5]:
+      expected = int(hashlib.md5(str(value).encode('utf-8')).hexdigest(),
+                     16) % 2 == 0
+      self.assertEqual(train_test_split.is_train(value), expected)
+
+  def testSetHash(self):
+    values = list(range(100))
+    train_test_split.set_hash('md5')
+    md5_split = [train_test_split.is_train(value) for value in values]
+    train_test_split.set_hash('blake2b')
+    blake2b_split = [train_test_split.is_train(value) for value in values]
+    self.assertNotEqual(md5_split, blake2b_split)
+    with self.assertRaisesRegexp(ValueError, 'Unknown hash'):
+      train_test_split.set_hash('sha1')
+
+  @parameterized.parameters('blake2b', 'md5')
+  def testSplitRange(self, name):
+    train_test_split.set_hash(name)
+    train_values, test_values = train_test_split.split_range(1, 720)
+    self.assertEqual(sorted(train_values + test_values), list(range(1, 720)))
+    for value in train_values:
+      self.assertTrue(train_test_split.is_train(value))
+    for value in test_values:
+      self.assertFalse(train_test_split.is_train(value))
+    # Roughly balanced.
+    self.assertGreater(len(train_values), 250)
+    self.assertGreater(len(test_values), 250)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -12,6 +12,7 @@ import random
 from sample import number
 from sample import ops
 from util import combinatorics
+from util import factorization
 import numpy as np
 import six
 from six.moves import zip
@@ -84,7 +85,7 @@ def _entropy_of_factor_split(integer):
   if integer == 0:
     return 0
   # Gives dict of form {factor: multiplicity}
-  factors = sympy.factorint(integer)
+  factors = factorization.factorint(integer)
   return sum(math.log10(mult + 1) for mult in six.itervalues(factors))
 
 
@@ -94,7 +95,7 @@ def _split_factors(integer):
   if integer == 0:
     return [1, 0]
   # Gives dict of form {factor: multiplicity}
-  factors = sympy.factorint(integer)
+  factors = factorization.factorint(integer)
   left = sympy.Integer(1)
   right = sympy.Integer(1)
   for factor, mult in six.iteritems(factors):
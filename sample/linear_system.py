@@ -12,7 +12,6 @@ from sample import ops
 from sample import polynomials
 import numpy as np
 from six.moves import range
-import sympy
 
 
 def _make_equals_zero_split(monomials):
@@ -34,21 +33,52 @@ def _make_equals_zero_split(monomials):
 
 
 def _is_trivial_in(matrix, variable):
-  """Returns true if matrix_ij == 0 for some i and all j != variable."""
+  """Returns true if matrix_ij == 0 for some i and all j != variable.
+
+  Args:
+    matrix: Square matrix, or array of shape `[..., size, size]` of them.
+    variable: Integer in `[0, size)`.
+
+  Returns:
+    Boolean, or boolean array with shape `matrix.shape[:-2]`.
+  """
   matrix = np.asarray(matrix)
-  assert matrix.ndim == 2 and matrix.shape[0] == matrix.shape[1]
-  size = matrix.shape[0]
+  assert matrix.ndim >= 2 and matrix.shape[-1] == matrix.shape[-2]
+  size = matrix.shape[-1]
   if size == 1:
-    return False
-  for i in range(size):
-    all_zero = True
-    for j in range(size):
-      if j != variable and matrix[i, j] != 0:
-        all_zero = False
-        break
-    if all_zero:
-      return True
-  return False
+    return np.zeros(matrix.shape[:-2], dtype=bool)[()]
+  others = np.delete(matrix, variable, axis=-1)
+  return np.any(np.all(others == 0, axis=-1), axis=-1)
+
+
+def _determinant(matrix):
+  """Returns exact determinant of square integer matrix (Bareiss algorithm)."""
+  matrix = [[int(entry) for entry in row] for row in matrix]
+  size = len(matrix)
+  sign = 1
+  previous_pivot = 1
+  for k in range(size - 1):
+    if matrix[k][k] == 0:
+      for i in range(k + 1, size):
+        if matrix[i][k] != 0:
+          matrix[k], matrix[i] = matrix[i], matrix[k]
+          sign = -sign
+          break
+      else:
+        return 0
+    pivot = matrix[k][k]
+    for i in range(k + 1, size):
+      for j in range(k + 1, size):
+        # Exact division (Sylvester's identity).
+        matrix[i][j] = (
+            (matrix[i][j] * pivot - matrix[i][k] * matrix[k][j])
+            // previous_pivot)
+    previous_pivot = pivot
+  return sign * matrix[-1][-1] if size else 1
+
+
+# Number of candidate matrices sampled at once by `_invertible_matrix`.
+_CANDIDATES = 8
 
 
 def _invertible_matrix(degree, entropy, non_trivial_in):
@@ -56,19 +86,18 @@ def _invertible_matrix(degree, entropy, non_trivial_in):
   matrix_entropies = entropy * np.random.dirichlet(np.ones(degree * degree))
   matrix_entropies = np.reshape(matrix_entropies, [degree, degree])
   matrix_entropies = np.maximum(1, matrix_entropies)
+  candidate_entropies = np.tile(
+      np.reshape(matrix_entropies.T, [1, -1]), [_CANDIDATES, 1])
 
   while True:
-    def gen(i, j):
-      return number.integer(matrix_entropies[i, j], True)
-
-    matrix = [[gen(i, j) for i in range(degree)] for j in range(degree)]  # pylint: disable=g-complex-comprehension
-    if non_trivial_in is not None and _is_trivial_in(matrix, non_trivial_in):
-      continue
-    if sympy.det(sympy.Matrix(matrix)) != 0:
-      break
-
-  matrix = np.asarray(matrix).astype(int)
-  return matrix
+    candidates = np.reshape(
+        number.integers(candidate_entropies, True),
+        [_CANDIDATES, degree, degree])
+    if non_trivial_in is not None:
+      candidates = candidates[~_is_trivial_in(candidates, non_trivial_in)]
+    for matrix in candidates:
+      if _determinant(matrix) != 0:
+        return np.asarray(matrix).astype(int)
 
 
 def linear_system(variables, solutions, entropy, non_trivial_in=None,
@@ -24,6 +24,24 @@ class ExpressionWithValueTest(parameterized.TestCase):
     self.assertEqual(linear_system._is_trivial_in([[1, 2], [0, 3]], 0), False)
     self.assertEqual(linear_system._is_trivial_in([[1, 2], [0, 3]], 1), True)
 
+  def testIsTrivialIn_batch(self):
+    matrices = [[[1, 2], [3, 4]], [[1, 2], [3, 0]], [[0, 2], [0, 3]]]
+    self.assertEqual(
+        list(linear_system._is_trivial_in(matrices, 0)), [False, True, False])
+
+  def testDeterminant(self):
+    self.assertEqual(linear_system._determinant([[5]]), 5)
+    self.assertEqual(linear_system._determinant([[0, 1], [1, 0]]), -1)
+    self.assertEqual(linear_system._determinant([[1, 2], [2, 4]]), 0)
+    for _ in range(100):
+      size = random.randint(1, 4)
+      matrix = [[random.randint(-10**12, 10**12) for _ in range(size)]
+                for _ in range(size)]
+      if random.choice([False, True]):
+        matrix[0][0] = 0
+      self.assertEqual(linear_system._determinant(matrix),
+                       sympy.Matrix(matrix).det())
+
   @parameterized.parameters([1, 2, 3])
   def testLinearSystem(self, degree):
     for _ in range(100):  # test a few times
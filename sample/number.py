@@ -9,6 +9,8 @@ import random
 
 # Dependency imports
 from util import display
+from util import factorization
+from util import profiling
 import numpy as np
 import six
 import sympy
@@ -16,13 +18,29 @@ import sympy
 
 def _coprime_density(value):
   """Returns float > 0; asymptotic density of integers coprime to `value`."""
-  factors = sympy.factorint(value)
+  factors = factorization.factorint(value)
   density = 1.0
   for prime in six.iterkeys(factors):
     density *= 1 - 1 / prime
   return density
 
 
+def _integer_range(entropy, signed, min_abs, coprime_to):
+  """Returns inclusive range `[low, high]` that `integer` samples from."""
+  max_ = math.pow(10, entropy)
+  max_ += min_abs
+  if coprime_to >= 2:
+    max_ = max_ / _coprime_density(coprime_to) + 1
+
+  if signed:
+    max_ = int(math.ceil(max_ / 2))
+    return -max_, max_
+  else:
+    max_ = int(math.ceil(max_))
+    return min_abs, max_
+
+
+@profiling.timed('number')
 def integer(entropy, signed, min_abs=0, coprime_to=1):
   """Returns an integer from a set of size ceil(10**entropy).
 
@@ -40,29 +58,86 @@ def integer(entropy, signed, min_abs=0, coprime_to=1):
     Integer.
   """
   assert isinstance(min_abs, int) and not isinstance(min_abs, bool)
-  coprime_to = abs(coprime_to)
+  coprime_to = abs(int(coprime_to))
   assert min_abs >= 0
 
-  max_ = math.pow(10, entropy)
-  max_ += min_abs
-  if coprime_to >= 2:
-    max_ = max_ / _coprime_density(coprime_to) + 1
+  range_ = _integer_range(entropy, signed, min_abs, coprime_to)
+  return sympy.Integer(_random_integer(range_, min_abs, coprime_to))
 
-  if signed:
-    max_ = int(math.ceil(max_ / 2))
-    range_ = [-max_, max_]
-  else:
-    max_ = int(math.ceil(max_))
-    range_ = [min_abs, max_]
 
+def _random_integer(range_, min_abs, coprime_to):
+  """Returns python integer sampled as by `integer`, in the range `range_`."""
   while True:
     value = random.randint(*range_)
-    if abs(value) >= min_abs and sympy.gcd(value, coprime_to) == 1:
-      break
+    if abs(value) >= min_abs and sympy.igcd(value, coprime_to) == 1:
+      return value
+
+
+# `integers` samples with numpy batches of at least `_MIN_VECTORIZED` values, of
+# magnitude less than `_MAX_VECTORIZED`; otherwise it samples each value with
+# `integer`, which is faster for small batches.
+_MIN_VECTORIZED = 64
+_MAX_VECTORIZED = 2**62
+
+# Generator that `integers` samples batches with; `generate.sample_example` sets
+# one seeded for each example.
+_generator = np.random.default_rng()
+
+
+def set_generator(generator):
+  """Sets the `np.random.Generator` used by `integers`; returns the previous."""
+  global _generator
+  previous = _generator
+  _generator = generator
+  return previous
+
+
+@profiling.timed('number')
+def integers(entropies, signed, min_abs=0, coprime_to=1):
+  """Returns a batch of integers, as if calling `integer` for each entropy.
+
+  Batches of at least `_MIN_VECTORIZED` values are drawn together with the
+  numpy `Generator` set by `set_generator` (redrawing just those violating
+  `min_abs` or `coprime_to`), which is faster than separate calls to `integer`
+  (but uses different random numbers). Smaller batches are sampled as by
+  `integer`.
+
+  Args:
+    entropies: Array-like of floats >= 0.
+    signed: Boolean. Whether to also return negative numbers.
+    min_abs: Integer >= 0. The minimum absolute value.
+    coprime_to: Optional integer >= 1. The returned integers are guaranteed to
+        be coprime to `coprime_to`, with entropy still accounted for.
+
+  Returns:
+    List of python integers, one for each entry of the flattened `entropies`.
+  """
+  assert isinstance(min_abs, int) and not isinstance(min_abs, bool)
+  coprime_to = abs(int(coprime_to))
+  assert min_abs >= 0
+
+  entropies = np.reshape(np.asarray(entropies, dtype=np.float64), [-1])
+  ranges = [_integer_range(entropy, signed, min_abs, coprime_to)
+            for entropy in entropies]
+  if (len(entropies) < _MIN_VECTORIZED
+      or any(high >= _MAX_VECTORIZED for _, high in ranges)):
+    return [_random_integer(range_, min_abs, coprime_to) for range_ in ranges]
+  lows, highs = np.array(ranges, dtype=np.int64).reshape([-1, 2]).T
+
+  values = np.zeros(len(entropies), dtype=np.int64)
+  pending = np.arange(len(entropies))
+  while pending.size:
+    sampled = _generator.integers(lows[pending], highs[pending], endpoint=True)
+    values[pending] = sampled
+    valid = np.abs(sampled) >= min_abs
+    if coprime_to >= 2:
+      valid &= np.gcd(sampled, coprime_to) == 1
+    pending = pending[~valid]
 
-  return sympy.Integer(value)
+  return values.tolist()
 
 
+@profiling.timed('number')
 def non_integer_rational(entropy, signed):
   """Similar args to `integer`. Entropy split between denom and numer."""
   numer_entropy = random.uniform(0, entropy)
@@ -72,6 +147,7 @@ def non_integer_rational(entropy, signed):
   return sympy.Rational(numer, denom)
 
 
+@profiling.timed('number')
 def integer_or_rational(entropy, signed, min_abs=0):
   """Returns a rational, with 50% probability of it being an integer."""
   if random.choice([False, True]):
@@ -80,6 +156,7 @@ def integer_or_rational(entropy, signed, min_abs=0):
     return non_integer_rational(entropy, signed)
 
 
+@profiling.timed('number')
 def non_integer_decimal(entropy, signed):
   """Returns a random decimal; integer divided by random power of ten.
 
@@ -100,6 +177,7 @@ def non_integer_decimal(entropy, signed):
       return display.Decimal(sympy.Rational(base, divisor))
 
 
+@profiling.timed('number')
 def integer_or_decimal(entropy, signed):
   """Returns integer or non-integer decimal; 50% probability of each."""
   if random.choice([False, True]):
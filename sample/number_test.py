@@ -9,6 +9,7 @@ import random
 # Dependency imports
 from absl.testing import absltest
 from absl.testing import parameterized
+import numpy as np
 from sample import number
 from six.moves import range
 import sympy
@@ -37,6 +38,46 @@ class NumberTest(parameterized.TestCase):
     self.assertTrue(saw_zero)
     self.assertTrue(saw_nonzero)
 
+  @parameterized.parameters(False, True)
+  def testIntegers(self, signed):
+    samples = number.integers([1] * 1000, signed=signed, min_abs=2,
+                              coprime_to=10)
+    self.assertLen(samples, 1000)
+    # Range size is (10**1 + min_abs) / density(10) + 1 = 31.
+    candidates = range(-16, 17) if signed else range(2, 32)
+    allowed = [value for value in candidates
+               if abs(value) >= 2 and value % 2 != 0 and value % 5 != 0]
+    for sample in samples:
+      self.assertIsInstance(sample, int)
+    self.assertEqual(set(samples), set(allowed))
+
+  def testIntegers_sameRangeAsInteger(self):
+    for entropy in [0, 0.5, 2]:
+      samples = set(number.integers([entropy] * 1000, signed=True))
+      low, high = min(samples), max(samples)
+      for _ in range(100):
+        self.assertBetween(number.integer(entropy, signed=True), low, high)
+
+  def testIntegers_setGenerator(self):
+    entropies = [3] * number._MIN_VECTORIZED
+    previous = number.set_generator(np.random.default_rng(7))
+    self.addCleanup(number.set_generator, previous)
+    samples = number.integers(entropies, signed=True)
+    number.set_generator(np.random.default_rng(7))
+    self.assertEqual(number.integers(entropies, signed=True), samples)
+
+  def testIntegers_small(self):
+    random.seed(7)
+    samples = number.integers([3, 2], signed=True)
+    random.seed(7)
+    self.assertEqual(
+        samples, [number.integer(3, signed=True), number.integer(2, signed=True)])
+
+  def testIntegers_large(self):
+    samples = number.integers([30, 1], signed=True)
+    self.assertLen(samples, 2)
+    self.assertTrue(all(isinstance(sample, int) for sample in samples))
+
   def testNonIntegerRational(self):
     for _ in range(1000):
       entropy = random.uniform(0, 10)
@@ -47,6 +47,13 @@ _MUL_PRECEDENCE = 4
 _ADD_PRECEDENCE = 5
 
 
+def _needs_brackets(child_precedence, parent_precedence,
+                    bracket_if_same_precedence):
+  return (parent_precedence < child_precedence
+          or (parent_precedence == child_precedence
+              and bracket_if_same_precedence))
+
+
 def bracketed(child, parent, bracket_if_same_precedence):
   """Returns string representation of `child`, possibly bracketed.
 
@@ -63,14 +70,53 @@ def bracketed(child, parent, bracket_if_same_precedence):
   if not isinstance(child, Op):
     child = Constant(child)
 
-  child_precedence = child.precedence
-  parent_precedence = parent.precedence
-  if (parent_precedence > child_precedence
-      or (parent_precedence == child_precedence
-          and not bracket_if_same_precedence)):
-    return str(child)
-  else:
+  if _needs_brackets(child.precedence, parent.precedence,
+                     bracket_if_same_precedence):
     return '({})'.format(child)
+  else:
+    return str(child)
+
+
+class _Renderer(object):
+  """Renders an op tree to a string, without recursion.
+
+  Ops describe their string form as a list of "pieces" (see `Op._pieces`):
+  strings, and child ops to be rendered in their place. The renderer expands
+  these with an explicit stack, appending strings to a single list which is
+  joined at the end, and computes the precedence of each op at most once.
+  """
+
+  def __init__(self):
+    self._precedences = {}
+
+  def precedence(self, op):
+    """Returns `op.precedence`, cached for this rendering."""
+    key = id(op)
+    precedence = self._precedences.get(key)
+    if precedence is None:
+      precedence = op.precedence
+      self._precedences[key] = precedence
+    return precedence
+
+  def bracketed(self, child, parent, bracket_if_same_precedence):
+    """Returns pieces for `child`, bracketed as for `bracketed`."""
+    if _needs_brackets(self.precedence(child), self.precedence(parent),
+                       bracket_if_same_precedence):
+      return ['(', child, ')']
+    else:
+      return [child]
+
+  def render(self, op):
+    """Returns the string form of `op`."""
+    out = []
+    stack = [op]
+    while stack:
+      item = stack.pop()
+      if isinstance(item, six.string_types):
+        out.append(item)
+      else:
+        stack.extend(reversed(item._pieces(self)))
+    return ''.join(out)
 
 
 def _flatten(iterable):
@@ -104,19 +150,29 @@ class Op(object):
   This needs to support being transformed into sympy (and possibly in the future
   other types such as an appropriately formatted string), when given the op
   arguments.
+
+  Ops use `__slots__` (subclasses must declare theirs too), as many are created
+  per generated expression.
   """
 
+  __slots__ = ('_children',)
+
   def __init__(self, children):
     """Initialize this `Op` base class.
 
     Args:
       children: Iterable structure containing child ops.
     """
-    assert isinstance(children, (list, dict, tuple))
-    flat_children = _flatten(children)
-    flat_children = [child if isinstance(child, Op) else Constant(child)
-                     for child in flat_children]
-    children = _pack_sequence_as(children, flat_children)
+    if isinstance(children, (list, tuple)):
+      # Common case (e.g., `Add` and `Mul`): no structure to flatten and repack.
+      children = [child if isinstance(child, Op) else Constant(child)
+                  for child in children]
+    else:
+      assert isinstance(children, dict)
+      flat_children = _flatten(children)
+      flat_children = [child if isinstance(child, Op) else Constant(child)
+                       for child in flat_children]
+      children = _pack_sequence_as(children, flat_children)
     self._children = children
 
   @property
@@ -124,17 +180,33 @@ class Op(object):
     """Returns iterable or dict over immediate children."""
     return self._children
 
-  def descendants(self):
-    """Returns list of all descendants (self, children, grandchildren, etc)."""
-    descendants = [self]
-    flat_children = _flatten(self._children)
-    for child in flat_children:
-      descendants += child.descendants()
-    return descendants
-
   @abc.abstractmethod
+  def _pieces(self, renderer):
+    """Returns list of strings and child ops making up this op's string form.
+
+    Args:
+      renderer: `_Renderer`, for bracketing children.
+    """
+
   def __str__(self):
     """Returns a string format of this op."""
+    return _Renderer().render(self)
+
+  def descendants(self):
+    """Returns list of all descendants (self, children, grandchildren, etc)."""
+    return list(self.iter_descendants())
+
+  def iter_descendants(self):
+    """Yields all descendants, in the same order as `descendants`."""
+    stack = [self]
+    while stack:
+      op = stack.pop()
+      yield op
+      children = op._children
+      if children:
+        if not isinstance(children, list):
+          children = _flatten(children)
+        stack.extend(reversed(children))
 
   @abc.abstractmethod
   def sympy(self):
@@ -161,14 +233,20 @@ class Op(object):
 class Constant(Op):
   """Returns a constant value; a nullary op."""
 
+  __slots__ = ('_value',)
+
   def __init__(self, value):
     super(Constant, self).__init__([])
     if isinstance(value, six.integer_types):
       value = sympy.Integer(value)
     self._value = value
 
-  def __str__(self):
-    return str(self._value)
+  def _pieces(self, renderer):
+    del renderer  # unused
+    if isinstance(self._value, sympy.Integer):
+      # Same as `str`, without going through the sympy printer.
+      return [str(self._value.p)]
+    return [str(self._value)]
 
   def sympy(self):
     return self._value
@@ -185,8 +263,9 @@ class Constant(Op):
     """Returns whether it's a simple number, rather than a division or neg."""
     if isinstance(self._value, sympy.Symbol):
       return True
+    elif isinstance(self._value, sympy.Integer):
+      return self._value.p >= 0
     elif (isinstance(self._value, int)
-          or isinstance(self._value, sympy.Integer)
           or isinstance(self._value, display.Decimal)
           or isinstance(self._value, np.int64)):
       return self._value >= 0
@@ -208,6 +287,8 @@ class Constant(Op):
 class _SumLikeOp(Op):
   """Abstract op for sum-like terms which may contain negative entries."""
 
+  __slots__ = ()
+
   @abc.abstractmethod
   def expanded_signs_and_terms(self):
     """Returns a list of arguments, plus any sub-arguments from sub-adds.
@@ -217,27 +298,26 @@ class _SumLikeOp(Op):
     the inner add have been extracted).
     """
 
-  def __str__(self):
+  def _pieces(self, renderer):
     signs_and_terms = self.expanded_signs_and_terms()
     if not signs_and_terms:
-      return '0'
+      return ['0']
+    pieces = []
     for i, (sign, term) in enumerate(signs_and_terms):
       if i == 0:
-        if sign:
-          expression = bracketed(term, self, True)
-        else:
-          expression = '-' + bracketed(term, self, True)
+        if not sign:
+          pieces.append('-')
       else:
-        if sign:
-          expression += ' + ' + bracketed(term, self, True)
-        else:
-          expression += ' - ' + bracketed(term, self, True)
-    return expression
+        pieces.append(' + ' if sign else ' - ')
+      pieces += renderer.bracketed(term, self, True)
+    return pieces
 
 
 class Identity(_SumLikeOp):
   """The identity op (a unitary op)."""
 
+  __slots__ = ()
+
   def __init__(self, input_):
     super(Identity, self).__init__({'input': input_})
 
@@ -247,8 +327,9 @@ class Identity(_SumLikeOp):
     else:
       return [(True, self.children['input'])]
 
-  def __str__(self):
-    return str(self.children['input'])
+  def _pieces(self, renderer):
+    del renderer  # unused
+    return [self.children['input']]
 
   def sympy(self):
     return self.children['input'].sympy()
@@ -261,6 +342,8 @@ class Identity(_SumLikeOp):
 class Neg(_SumLikeOp):
   """Negation, a unary op. Also has special display when appearing in a sum."""
 
+  __slots__ = ()
+
   def __init__(self, arg):
     super(Neg, self).__init__({'input': arg})
 
@@ -285,6 +368,8 @@ class Neg(_SumLikeOp):
 class Add(_SumLikeOp):
   """Addition."""
 
+  __slots__ = ()
+
   def __init__(self, *args):
     super(Add, self).__init__(args)
 
@@ -313,12 +398,14 @@ class Add(_SumLikeOp):
 class Sub(Op):
   """Subtraction."""
 
+  __slots__ = ()
+
   def __init__(self, left, right):
     super(Sub, self).__init__({'left': left, 'right': right})
 
-  def __str__(self):
-    return (bracketed(self.children['left'], self, False) + ' - '
-            + bracketed(self.children['right'], self, True))
+  def _pieces(self, renderer):
+    return (renderer.bracketed(self.children['left'], self, False) + [' - ']
+            + renderer.bracketed(self.children['right'], self, True))
 
   def sympy(self):
     return sympy.Add(
@@ -332,15 +419,20 @@ class Sub(Op):
 class Mul(Op):
   """Multiplication."""
 
+  __slots__ = ()
+
   def __init__(self, *args):
     super(Mul, self).__init__(args)
 
-  def __str__(self):
+  def _pieces(self, renderer):
     if not self.children:
-      return '1'
-    else:
-      args = [bracketed(arg, self, False) for arg in self.children]
-      return MUL_SYMBOL.join(args)
+      return ['1']
+    pieces = []
+    for i, arg in enumerate(self.children):
+      if i:
+        pieces.append(MUL_SYMBOL)
+      pieces += renderer.bracketed(arg, self, False)
+    return pieces
 
   def sympy(self):
     return sympy.Mul(*[sympy.sympify(arg) for arg in self.children])
@@ -353,13 +445,15 @@ class Mul(Op):
 class Div(Op):
   """Division."""
 
+  __slots__ = ()
+
   def __init__(self, numer, denom):
     super(Div, self).__init__({'numer': numer, 'denom': denom})
 
-  def __str__(self):
-    return u'{}{}{}'.format(
-        bracketed(self.children['numer'], self, True), DIV_SYMBOL,
-        bracketed(self.children['denom'], self, True))
+  def _pieces(self, renderer):
+    return (renderer.bracketed(self.children['numer'], self, True)
+            + [DIV_SYMBOL]
+            + renderer.bracketed(self.children['denom'], self, True))
 
   def sympy(self):
     return sympy.Mul(
@@ -373,13 +467,14 @@ class Div(Op):
 class Pow(Op):
   """Power a to the power b."""
 
+  __slots__ = ()
+
   def __init__(self, a, b):
     super(Pow, self).__init__({'a': a, 'b': b})
 
-  def __str__(self):
-    return u'{}{}{}'.format(
-        bracketed(self.children['a'], self, True), POW_SYMBOL,
-        bracketed(self.children['b'], self, True))
+  def _pieces(self, renderer):
+    return (renderer.bracketed(self.children['a'], self, True) + [POW_SYMBOL]
+            + renderer.bracketed(self.children['b'], self, True))
 
   def sympy(self):
     return sympy.Pow(
@@ -393,11 +488,14 @@ class Pow(Op):
 class Sqrt(Op):
   """Square root of a value."""
 
+  __slots__ = ()
+
   def __init__(self, a):
     super(Sqrt, self).__init__({'a': a})
 
-  def __str__(self):
-    return 'sqrt({})'.format(self.children['a'])
+  def _pieces(self, renderer):
+    del renderer  # unused
+    return ['sqrt(', self.children['a'], ')']
 
   def sympy(self):
     return sympy.sqrt(self.children['a'])
@@ -410,11 +508,14 @@ class Sqrt(Op):
 class Eq(Op):
   """Equality."""
 
+  __slots__ = ()
+
   def __init__(self, left, right):
     super(Eq, self).__init__({'left': left, 'right': right})
 
-  def __str__(self):
-    return '{} = {}'.format(self.children['left'], self.children['right'])
+  def _pieces(self, renderer):
+    del renderer  # unused
+    return [self.children['left'], ' = ', self.children['right']]
 
   def sympy(self):
     return sympy.Eq(self.children['left'], self.children['right'])
@@ -428,9 +529,8 @@ def number_constants(expressions):
   """Returns list of integer, rational, decimal constants in the expressions."""
   if isinstance(expressions, Op):
     expressions = [expressions]
-  descendants = []
-  for expression in expressions:
-    descendants += expression.descendants()
-  candidate_constants = [op for op in descendants if isinstance(op, Constant)]
-  return [constant for constant in candidate_constants
-          if number.is_integer_or_rational_or_decimal(constant.value)]
+  return [op
+          for expression in expressions
+          for op in expression.iter_descendants()
+          if isinstance(op, Constant)
+          and number.is_integer_or_rational_or_decimal(op.value)]
@@ -151,6 +151,20 @@ class OpsTest(absltest.TestCase):
     self.assertEqual(str(op), '2 + 3 = 4')
     self.assertEqual(op.sympy(), False)
 
+  def testStr_deep(self):
+    # Deeper than the recursion limit.
+    op = ops.Constant(1)
+    for _ in range(5000):
+      op = ops.Sub(op, ops.Mul(2, ops.Sqrt(3)))
+    self.assertEqual(str(op), ' - '.join(['1'] + ['2*sqrt(3)'] * 5000))
+
+  def testBracketed(self):
+    self.assertEqual(ops.bracketed(ops.Add(1, 2), ops.Mul(3), False), '(1 + 2)')
+    self.assertEqual(ops.bracketed(ops.Mul(1, 2), ops.Mul(3), False), '1*2')
+    self.assertEqual(ops.bracketed(ops.Mul(1, 2), ops.Mul(3), True), '(1*2)')
+    self.assertEqual(ops.bracketed(-2, ops.Mul(3), False), '-2')
+    self.assertEqual(ops.bracketed(-2, ops.Pow(2, 3), True), '(-2)')
+
   def testDescendants(self):
     constants = [ops.Constant(i) for i in range(6)]
 
@@ -181,6 +195,23 @@ class OpsTest(absltest.TestCase):
     expression = ops.Neg(constant)
     self.assertEqual(set(expression.descendants()), set([constant, expression]))
 
+  def testIterDescendants(self):
+    constants = [ops.Constant(i) for i in range(4)]
+    mul = ops.Mul(constants[1], constants[2])
+    sub = ops.Sub(ops.Add(constants[0], mul), constants[3])
+    self.assertEqual(
+        list(sub.iter_descendants()),
+        [sub, sub.children['left'], constants[0], mul, constants[1],
+         constants[2], constants[3]])
+    self.assertEqual(list(sub.iter_descendants()), sub.descendants())
+
+    # Deeper than the recursion limit.
+    op = ops.Constant(1)
+    for _ in range(5000):
+      op = ops.Neg(op)
+    self.assertLen(op.descendants(), 5001)
+    self.assertLen(ops.number_constants(op), 1)
+
   def testNumberConstants(self):
     constant = ops.Constant(3)
     expression = ops.Neg(constant)
@@ -11,6 +11,7 @@ import random
 from sample import number
 from sample import ops
 from util import combinatorics
+from util import factorization
 import numpy as np
 import six
 from six.moves import range
@@ -106,8 +107,7 @@ def integers_with_sum(value, count, entropy):
   term_entropies = entropy * np.random.dirichlet(np.ones(count))
   term_entropies = np.maximum(min_term_entropy, term_entropies)
 
-  terms = [number.integer(term_entropy, signed=True)
-           for term_entropy in term_entropies]
+  terms = number.integers(term_entropies, signed=True)
 
   delta = value - sum(terms)
   deltas = _split_value_equally(delta, count)
@@ -277,6 +277,37 @@ def coefficients_to_polynomial(coefficients, variables):
   return ops.Add(*monomials)
 
 
+def coefficients_to_sympy(coefficients, variables):
+  """Returns the sympy polynomial with the given array of coefficients.
+
+  Unlike `coefficients_to_polynomial`, this does not use any randomness, and
+  the result is already expanded (each power appears once), so it is a cheaper
+  way of building answers than expanding a rendered polynomial.
+
+  Args:
+    coefficients: Array, such that `coefficients[i, j, ..., k]` is the
+        coefficient of x**i * y**j * ... * z**k.
+    variables: Variable, or list of variables (one per axis).
+
+  Returns:
+    Sympy expression.
+  """
+  coefficients = np.asarray(coefficients)
+  if not isinstance(variables, (list, tuple)):
+    variables = [variables]
+  terms = []
+  for power in zip(*np.nonzero(coefficients)):
+    coefficient = coefficients[power]
+    if isinstance(coefficient, np.integer):
+      coefficient = int(coefficient)
+    factors = [sympy.sympify(coefficient)]
+    for variable, exponent in zip(variables, power):
+      if exponent > 0:
+        factors.append(variable ** int(exponent))
+    terms.append(sympy.Mul(*factors))
+  return sympy.Add(*terms)
+
+
 def sample(variables, degrees, entropy, length=None):
   coefficients = sample_expanded_coefficients(degrees, entropy, length)
   return coefficients_to_polynomial(coefficients, variables)
@@ -303,8 +334,67 @@ def add_coefficients(coeffs1, coeffs2):
   return coeffs1 + coeffs2
 
 
+def _product_dtype(coeffs1, coeffs2):
+  """Returns dtype that holds products of entries of the arrays exactly."""
+  if coeffs1.dtype == object or coeffs2.dtype == object:
+    return object
+  if (np.issubdtype(coeffs1.dtype, np.integer)
+      and np.issubdtype(coeffs2.dtype, np.integer)):
+    bound = (int(np.max(np.abs(coeffs1))) * int(np.max(np.abs(coeffs2)))
+             * min(coeffs1.size, coeffs2.size))
+    if bound < 2**62:
+      return np.int64
+    return object  # exact python integers
+  return np.result_type(coeffs1, coeffs2)
+
+
+def multiply_coefficients(coeffs1, coeffs2):
+  """Multiplies together two sets of coefficients over same set of variables."""
+  coeffs1 = np.asarray(coeffs1)
+  coeffs2 = np.asarray(coeffs2)
+  assert coeffs1.ndim == coeffs2.ndim
+  if coeffs1.size == 0 or coeffs2.size == 0:
+    return np.zeros([0] * coeffs1.ndim, dtype=np.int64)
+
+  dtype = _product_dtype(coeffs1, coeffs2)
+  coeffs2 = coeffs2.astype(dtype)
+  shape = np.array(coeffs1.shape) + np.array(coeffs2.shape) - 1
+  result = np.zeros(shape, dtype=dtype)
+  for index in zip(*np.nonzero(coeffs1)):
+    window = tuple(slice(start, start + length)
+                   for start, length in zip(index, coeffs2.shape))
+    coefficient = coeffs1[index]
+    if dtype == object and isinstance(coefficient, np.integer):
+      coefficient = int(coefficient)
+    result[window] += coefficient * coeffs2
+  return result
+
+
+def compose_coefficients(coeffs_f, coeffs_g):
+  """Returns coefficients of f(g), given those of univariate f and of g.
+
+  Args:
+    coeffs_f: 1-dimensional array of coefficients of f.
+    coeffs_g: Array of coefficients of g (over any number of variables).
+
+  Returns:
+    Array of coefficients of f(g) (over the same variables as g), trimmed.
+  """
+  coeffs_f = np.asarray(coeffs_f)
+  coeffs_g = np.asarray(coeffs_g)
+  assert coeffs_f.ndim == 1
+  constant_shape = [1] * coeffs_g.ndim
+  # Horner's method: f(g) = f_0 + g * (f_1 + g * (f_2 + ...)).
+  result = np.zeros(constant_shape, dtype=coeffs_f.dtype)
+  for coefficient in reversed(coeffs_f):
+    result = add_coefficients(
+        multiply_coefficients(result, coeffs_g),
+        np.full(constant_shape, coefficient, dtype=coeffs_f.dtype))
+  return trim(result)
+
+
 def _random_factor(integer):
-  factors = sympy.factorint(integer)
+  factors = factorization.factorint(integer)
   result = 1
   for factor, power in six.iteritems(factors):
     result *= factor ** random.randint(0, power)
@@ -355,7 +445,10 @@ def coefficients_linear_split(coefficients, entropy):
   for index, coefficient in enumerate(coefficients):
     entropy_coeff = entropy_coefficients[index]
     t = number.integer(entropy_coeff, signed=True)
-    x, y = diophantine_solve_linear_2d(c=coefficient, a=a, b=b, t=t)
+    # Note: sympy caches the solution, and would give different results for
+    # (equal) numpy and sympy integers, making the result depend on the cache.
+    x, y = diophantine_solve_linear_2d(
+        c=sympy.Integer(coefficient), a=a, b=b, t=t)
     coefficients_1[index] = x
     coefficients_2[index] = y
 
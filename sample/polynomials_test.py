@@ -85,6 +85,37 @@ class ExpressionWithValueTest(tf.test.TestCase, parameterized.TestCase):
     actual = polynomials.add_coefficients(coeffs1, coeffs2)
     self.assertAllEqual(target, actual)
 
+  def testMultiplyCoefficients(self):
+    # Multiply x + 2*y and 3*x - y.
+    coeffs1 = [[0, 2], [1, 0]]
+    coeffs2 = [[0, -1], [3, 0]]
+    target = [[0, 0, -2], [0, 5, 0], [3, 0, 0]]
+    actual = polynomials.multiply_coefficients(coeffs1, coeffs2)
+    self.assertAllEqual(target, actual)
+
+  def testMultiplyCoefficients_exact(self):
+    coeffs = np.array([10**15, 1], dtype=np.int64)
+    actual = polynomials.multiply_coefficients(coeffs, coeffs)
+    self.assertEqual(list(actual), [10**30, 2 * 10**15, 1])
+
+  def testComposeCoefficients(self):
+    x, y = sympy.symbols('x y')
+    for _ in range(10):
+      coeffs_f = polynomials.sample_coefficients([3], 4.0)
+      coeffs_g = polynomials.sample_coefficients([2, 1], 4.0)
+      f = polynomials.coefficients_to_sympy(coeffs_f, x)
+      g = polynomials.coefficients_to_sympy(coeffs_g, [x, y])
+      composed = polynomials.compose_coefficients(coeffs_f, coeffs_g)
+      self.assertEqual(polynomials.coefficients_to_sympy(composed, [x, y]),
+                       f.subs(x, g).expand())
+
+  def testCoefficientsToSympy(self):
+    x, y = sympy.symbols('x y')
+    coeffs = [[5, 0, 3], [-1, 2, 0], [sympy.Rational(1, 2), 0, 0]]
+    polynomial = polynomials.coefficients_to_sympy(coeffs, [x, y])
+    self.assertEqual(str(polynomial), 'x**2/2 + 2*x*y - x + 3*y**2 + 5')
+    self.assertEqual(polynomials.coefficients_to_sympy([0, 0], x), 0)
+
   def testCoefficientsLinearSplit(self):
     for degree in range(3):
       for ndims in range(3):
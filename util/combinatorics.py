@@ -33,6 +33,34 @@ def uniform_non_negative_integers_with_sum(count, sum_):
   return [i - 1 for i in positive]
 
 
+def partitions(sum_, count, min_part=1):
+  """Yields the partitions of `sum_` into `count` integers >= `min_part`.
+
+  Args:
+    sum_: Integer.
+    count: Integer >= 1.
+    min_part: Integer >= 1; lower bound on the parts.
+
+  Yields:
+    Lists of `count` integers, in non-decreasing order, summing to `sum_`.
+  """
+  if count == 1:
+    if sum_ >= min_part:
+      yield [sum_]
+    return
+  for part in range(min_part, sum_ // count + 1):
+    for rest in partitions(sum_ - part, count - 1, part):
+      yield [part] + rest
+
+
+def number_orderings(parts):
+  """Returns the number of distinct orderings of the list `parts`."""
+  result = math.factorial(len(parts))
+  for part in set(parts):
+    result //= math.factorial(parts.count(part))
+  return result
+
+
 def log_number_binary_trees(size):
   """Returns (nat) log of number of binary trees with `size` internal nodes."""
   # This is equal to log of C_size, where C_n is the nth Catalan number.
@@ -33,6 +33,23 @@ class CombinatoricsTest(absltest.TestCase):
     result = combinatorics.uniform_non_negative_integers_with_sum(3, 10)
     self.assertEqual(sum(result), 10)
 
+  def testPartitions(self):
+    self.assertEqual(list(combinatorics.partitions(5, 1)), [[5]])
+    self.assertEqual(list(combinatorics.partitions(6, 3)),
+                     [[1, 1, 4], [1, 2, 3], [2, 2, 2]])
+    self.assertEqual(list(combinatorics.partitions(2, 3)), [])
+    # The orderings of the partitions are the compositions, of which there are
+    # binomial(sum - 1, count - 1).
+    self.assertEqual(
+        sum(combinatorics.number_orderings(partition)
+            for partition in combinatorics.partitions(20, 6)),
+        math.factorial(19) // (math.factorial(5) * math.factorial(14)))
+
+  def testNumberOrderings(self):
+    self.assertEqual(combinatorics.number_orderings([]), 1)
+    self.assertEqual(combinatorics.number_orderings([1, 1, 4]), 3)
+    self.assertEqual(combinatorics.number_orderings([1, 2, 3]), 6)
+
   def testLogNumberBinaryTrees(self):
     self.assertAlmostEqual(
         combinatorics.log_number_binary_trees(0), math.log(1))
@@ -5,6 +5,7 @@ from __future__ import division
 from __future__ import print_function
 
 import collections
+import contextlib
 import random
 import string
 
@@ -14,6 +15,7 @@ from sample import ops
 from sample import polynomials
 from util import combinatorics
 from util import display
+from util import profiling
 import numpy as np
 import six
 from six.moves import range
@@ -25,6 +27,229 @@ import sympy
 # function symbol (and it's reserved for exponent).
 _ALLOWED_SYMBOLS = set(string.ascii_lowercase).difference(set(['e']))
 
+# Symbols tracked by `Context`, as bits of an integer mask; bit `i` is
+# `_SYMBOLS[i]`. This includes "e", which can still be marked as used.
+_SYMBOLS = string.ascii_lowercase
+_SYMBOL_BITS = {symbol: 1 << i for i, symbol in enumerate(_SYMBOLS)}
+_ALLOWED_MASK = sum(_SYMBOL_BITS[symbol] for symbol in _ALLOWED_SYMBOLS)
+
+# Maximum question length for the sample currently being built (or None); see
+# `max_question_length`.
+_max_question_length = None
+
+
+class QuestionTooLongError(Exception):
+  """Raised when the question being sampled must exceed the maximum length."""
+
+
+@contextlib.contextmanager
+def max_question_length(length):
+  """Abandons samples as soon as their question must be longer than `length`.
+
+  Within this context, `QuestionTooLongError` is raised as soon as the
+  descriptions of the entities built so far (which all end up in the question)
+  are longer than `length`, rather than after building and rendering the whole
+  question.
+
+  Args:
+    length: Integer; maximum question length.
+
+  Yields:
+    Nothing.
+  """
+  global _max_question_length
+  previous = _max_question_length
+  _max_question_length = length
+  try:
+    yield
+  finally:
+    _max_question_length = previous
+
+
+def _check_length(length, description):
+  """Raises `QuestionTooLongError` if `length` exceeds the maximum."""
+  if _max_question_length is not None and length > _max_question_length:
+    raise QuestionTooLongError(
+        '{} has length at least {} > {}'
+        .format(description, length, _max_question_length))
+
+
+_FORMATTER = string.Formatter()
+
+# Maps template string to the tuple of `(literal, field_name, format_spec,
+# conversion)` fragments returned by `string.Formatter.parse`. Cleared when it
+# reaches `_MAX_PARSED_TEMPLATES` entries, as some templates are built on the
+# fly.
+_PARSED_TEMPLATES = {}
+_MAX_PARSED_TEMPLATES = 2**12
+
+
+class Template(str):
+  """A format string, parsed once into its fragments when constructed.
+
+  This is a `str` (so can be used wherever a template string is expected),
+  whose fragments are used directly when it is rendered by a `Description`.
+  See `example.register_templates`.
+  """
+
+  def __new__(cls, template):
+    self = super(Template, cls).__new__(cls, template)
+    self.fragments = tuple(_FORMATTER.parse(template))
+    return self
+
+  def field_names(self):
+    """Returns set of the names of the fields in the template."""
+    return set(field_name for _, field_name, _, _ in self.fragments
+               if field_name is not None)
+
+
+def _parse_template(template):
+  """Returns tuple of fragments of the format string `template` (cached)."""
+  if isinstance(template, Template):
+    return template.fragments
+  fragments = _PARSED_TEMPLATES.get(template)
+  if fragments is None:
+    fragments = tuple(_FORMATTER.parse(template))
+    if len(_PARSED_TEMPLATES) >= _MAX_PARSED_TEMPLATES:
+      _PARSED_TEMPLATES.clear()
+    _PARSED_TEMPLATES[template] = fragments
+  return fragments
+
+
+def _min_length(value):
+  """Returns lower bound on `len(str(value))` for a formatting argument."""
+  if isinstance(value, Description):
+    return value.min_length()
+  if isinstance(value, six.string_types):
+    return len(value)
+  if isinstance(value, sympy.Symbol):
+    return len(value.name)
+  # Numbers, expressions and handles are never rendered as an empty string.
+  return 1
+
+
+class Description(object):
+  """Text that is formatted lazily, when converted to a string.
+
+  `Description(template, kwargs)` renders as `template.format(**kwargs)`, and
+  `Description.join(separator, parts)` as `separator.join(parts)` (skipping
+  empty parts). Arguments and parts can themselves be `Description`s, so entity
+  and question descriptions form a tree, which is only rendered (in a single
+  pass, into one list of strings) if the question is actually used. Until then,
+  `min_length` gives a lower bound on the length of the text.
+  """
+
+  __slots__ = ('_template', '_kwargs', '_separator', '_parts', '_text',
+               '_min_length')
+
+  def __init__(self, template, kwargs=None):
+    """Initializes a `Description`.
+
+    Args:
+      template: Format string, e.g., 'Let {self} = {value}.'.
+      kwargs: Optional dict of arguments for `template` (strings,
+          `Description`s, or anything else that can be converted to a string).
+    """
+    self._template = template
+    self._kwargs = {} if kwargs is None else kwargs
+    self._separator = None
+    self._parts = None
+    if '{' in template or '}' in template:
+      self._text = None
+    else:
+      self._text = template
+    self._min_length = None
+
+  @classmethod
+  def join(cls, separator, parts):
+    """Returns `Description` of the non-empty `parts` joined by `separator`."""
+    description = cls('')
+    description._separator = separator
+    description._parts = [part for part in parts if not _is_empty(part)]
+    description._text = None if description._parts else ''
+    return description
+
+  def min_length(self):
+    """Returns lower bound on the length of the rendered text."""
+    if self._text is not None:
+      return len(self._text)
+    if self._min_length is None:
+      if self._parts is not None:
+        length = sum(_min_length(part) for part in self._parts)
+        length += len(self._separator) * (len(self._parts) - 1)
+      else:
+        length = 0
+        for literal, field_name, format_spec, conversion in _parse_template(
+            self._template):
+          length += len(literal)
+          if (field_name in self._kwargs
+              and not format_spec and not conversion):
+            length += _min_length(self._kwargs[field_name])
+      self._min_length = length
+    return self._min_length
+
+  def _render(self, out, strings):
+    """Appends the strings making up the text to list `out`.
+
+    Args:
+      out: List of strings.
+      strings: Dict mapping `id` of arguments (other than strings and
+          `Description`s) to their string form, shared across the tree so that
+          each argument (e.g., a handle occurring in several descriptions) is
+          converted once.
+    """
+    if self._text is not None:
+      out.append(self._text)
+    elif self._parts is not None:
+      for i, part in enumerate(self._parts):
+        if i:
+          out.append(self._separator)
+        if isinstance(part, Description):
+          part._render(out, strings)
+        else:
+          out.append(str(part))
+    else:
+      for literal, field_name, format_spec, conversion in _parse_template(
+          self._template):
+        if literal:
+          out.append(literal)
+        if field_name is None:
+          continue
+        if field_name in self._kwargs:
+          value = self._kwargs[field_name]
+        else:
+          value, _ = _FORMATTER.get_field(field_name, (), self._kwargs)
+        if format_spec or conversion:
+          value = _FORMATTER.convert_field(value, conversion)
+          out.append(_FORMATTER.format_field(value, format_spec))
+        elif isinstance(value, six.string_types):
+          out.append(value)
+        elif isinstance(value, Description):
+          value._render(out, strings)
+        else:
+          string = strings.get(id(value))
+          if string is None:
+            string = format(value)
+            strings[id(value)] = string
+          out.append(string)
+
+  def __str__(self):
+    if self._text is None:
+      out = []
+      self._render(out, {})
+      self._text = ''.join(out)
+    return self._text
+
+  def __format__(self, format_spec):
+    return format(str(self), format_spec)
+
+
+def _is_empty(text):
+  """Returns whether string or `Description` `text` is empty."""
+  if isinstance(text, Description):
+    return not text.min_length() and not str(text)
+  return not text
+
 
 class Polynomial(collections.namedtuple('Polynomial', ('coefficients'))):
   """Value wrapper for a polynomial function.
@@ -54,6 +279,14 @@ def is_integer_polynomial(value):
 # `Entity`.
 _FILTERS_AND_SAMPLERS = []
 
+# Maps the result of `value_kind` to the list of samplers whose filter accepts
+# values of that kind (in the order of `_FILTERS_AND_SAMPLERS`). Filled lazily,
+# and cleared when a module is added.
+_SAMPLERS_BY_KIND = {}
+
+# Number of times each sampler (by name) was chosen by `Context._sampler`.
+_SAMPLER_COUNTS = collections.Counter()
+
 
 def module(filter_):
   """Returns a Decorator for a module function.
@@ -62,6 +295,7 @@ def module(filter_):
 
   Args:
     filter_: Callable determining whether the module can handle a given value.
+        Its result must only depend on `value_kind(value)`.
 
   Returns:
     Decorator that adds the module function to the library.
@@ -69,10 +303,55 @@ def module(filter_):
   def decorator(module_fn):
     """Decorates a module function."""
     _FILTERS_AND_SAMPLERS.append((filter_, module_fn))
+    _SAMPLERS_BY_KIND.clear()
     return module_fn
   return decorator
 
 
+def _sign(value):
+  return int(bool(value > 0)) - int(bool(value < 0))
+
+
+def value_kind(value):
+  """Returns hashable kind of `value`, determining which modules can handle it.
+
+  Args:
+    value: Value to sample an entity for.
+
+  Returns:
+    Tuple, or None if `value` is not of a known kind.
+  """
+  if number.is_integer(value):
+    return ('integer', _sign(value))
+  if isinstance(value, sympy.Rational):
+    return ('rational', _sign(value))
+  if isinstance(value, display.Decimal):
+    return ('decimal', _sign(value))
+  if isinstance(value, Polynomial):
+    return ('polynomial', np.ndim(value.coefficients),
+            is_integer_polynomial(value))
+  return None
+
+
+def _samplers_for(value):
+  """Returns list of samplers whose filter accepts `value`."""
+  kind = value_kind(value)
+  if kind is None:
+    return [sampler for filter_, sampler in _FILTERS_AND_SAMPLERS
+            if filter_(value)]
+  samplers = _SAMPLERS_BY_KIND.get(kind)
+  if samplers is None:
+    samplers = [sampler for filter_, sampler in _FILTERS_AND_SAMPLERS
+                if filter_(value)]
+    _SAMPLERS_BY_KIND[kind] = samplers
+  return samplers
+
+
+def sampler_counts():
+  """Returns `Counter` of how often each sampler was chosen, by name."""
+  return _SAMPLER_COUNTS.copy()
+
+
 class SampleArgs(
     collections.namedtuple('SampleArgs', ('num_modules', 'entropy'))):
   """For sampling mathematical entities / questions."""
@@ -96,6 +375,7 @@ class SampleArgs(
         num_modules=self.num_modules, entropy=self.entropy - entropy)
     return entropy, new_sample_args
 
+  @profiling.timed('split')
   def split(self, count):
     """Splits the entropy and module counts up.
 
@@ -223,11 +503,33 @@ def _polynomial_entity(value, context):
       polynomial=polynomial)
 
 
+def _symbols_to_mask(symbols):
+  """Returns integer mask of the set of symbols `symbols`."""
+  mask = 0
+  for symbol in symbols:
+    assert symbol in _SYMBOL_BITS, symbol
+    mask |= _SYMBOL_BITS[symbol]
+  return mask
+
+
+def _mask_to_symbols(mask):
+  """Returns set of symbols in the integer mask `mask`."""
+  return set(symbol for symbol, bit in six.iteritems(_SYMBOL_BITS)
+             if mask & bit)
+
+
+def _popcount(mask):
+  return bin(mask).count('1')
+
+
 class Context(object):
   """Keeps track of used symbols, and sampling of children.
 
   Each context is associated with an entity. Entities are constructed in a
   tree-like fashion.
+
+  The symbols are stored as integer masks (see `_SYMBOL_BITS`), as many
+  contexts are created per example.
   """
 
   def __init__(self, relation_symbols=None):
@@ -239,29 +541,28 @@ class Context(object):
           occurring that aren't in this node or sub-nodes.
     """
     if relation_symbols is None:
-      relation_symbols = set()
+      relation_mask = 0
     else:
       assert isinstance(relation_symbols, set)
-    for symbol in relation_symbols:
-      assert isinstance(symbol, str)
+      relation_mask = _symbols_to_mask(relation_symbols)
 
-    self._relation_symbols = relation_symbols
-    self._self_symbols = set()
-    self._child_symbols = set()
+    self._relation_mask = relation_mask
+    self._self_mask = 0
+    self._child_mask = 0
     self._module_count = 1
     self._child_entities = []
 
   @property
   def relation_symbols(self):
-    return self._relation_symbols.copy()
+    return _mask_to_symbols(self._relation_mask)
 
   @property
   def self_symbols(self):
-    return self._self_symbols.copy()
+    return _mask_to_symbols(self._self_mask)
 
   @property
   def child_symbols(self):
-    return self._child_symbols.copy()
+    return _mask_to_symbols(self._child_mask)
 
   @property
   def child_entities(self):
@@ -269,24 +570,27 @@ class Context(object):
 
   def pop(self):
     """Returns an unused symbol (and keeps track of it being used)."""
-    allowed = (_ALLOWED_SYMBOLS
-               .difference(self._relation_symbols)
-               .difference(self._self_symbols)
-               .difference(self._child_symbols))
+    allowed = _ALLOWED_MASK & ~(
+        self._relation_mask | self._self_mask | self._child_mask)
     if not allowed:
       raise ValueError('Ran out of symbols')
-    symbol = random.choice(list(allowed))
-    self._self_symbols.add(symbol)
-    return symbol
+    # Choose uniformly amongst the set bits (equivalent to `random.choice` of
+    # the sorted allowed symbols): clear the lowest `index` of them, and take
+    # the lowest remaining one.
+    index = random.randrange(_popcount(allowed))
+    for _ in range(index):
+      allowed &= allowed - 1
+    bit = allowed & -allowed
+    self._self_mask |= bit
+    return _SYMBOLS[bit.bit_length() - 1]
 
   def mark_used(self, symbol):
     """Marks a given symbol as used."""
     assert isinstance(symbol, str)
-    if (symbol in self._relation_symbols
-        or symbol in self._self_symbols
-        or symbol in self._child_symbols):
+    bit = _SYMBOL_BITS[symbol]
+    if (self._relation_mask | self._self_mask | self._child_mask) & bit:
       raise ValueError('Symbol {} already used'.format(symbol))
-    self._self_symbols.add(symbol)
+    self._self_mask |= bit
 
   @property
   def module_count(self):
@@ -306,14 +610,13 @@ class Context(object):
     Raises:
       ValueError: If no valid samplers were found.
     """
-    valid = []
-    for filter_, sampler in _FILTERS_AND_SAMPLERS:
-      if filter_(value):
-        valid.append(sampler)
+    valid = _samplers_for(value)
     if not valid:
       raise ValueError('No valid samplers found: value={} sample_args={}'
                        .format(value, sample_args))
-    return random.choice(valid)
+    sampler = random.choice(valid)
+    _SAMPLER_COUNTS[sampler.__name__] += 1
+    return sampler
 
   def _value_entity(self, value, context):
     if isinstance(value, (sympy.Integer, sympy.Rational, display.Decimal)):
@@ -340,24 +643,20 @@ class Context(object):
     """
     # Can only sample children once.
     assert self._module_count == 1
-    assert not self._child_symbols
+    assert not self._child_mask
     assert not self._child_entities
 
     if isinstance(sample_args, PreSampleArgs):
       sample_args = sample_args()
     sample_args_split = sample_args.split(len(values))
 
-    def all_symbols():
-      return (self._relation_symbols
-              .union(self._self_symbols)
-              .union(self._child_symbols))
-
     for value, child_sample_args in zip(values, sample_args_split):
       if number.is_integer(value):
         value = sympy.Integer(value)
 
-      all_symbols_ = all_symbols()
-      context = Context(all_symbols_)
+      all_mask = self._relation_mask | self._self_mask | self._child_mask
+      context = Context()
+      context._relation_mask = all_mask
 
       if child_sample_args.num_modules == 0:
         entity = self._value_entity(value, context)
@@ -386,9 +685,16 @@ class Context(object):
         self._module_count += context.module_count
 
       self._child_entities.append(entity)
-      for symbol in context.self_symbols.union(context.child_symbols):
-        assert symbol not in all_symbols_
-        self._child_symbols.add(symbol)
+      child_mask = context._self_mask | context._child_mask
+      assert not child_mask & all_mask
+      self._child_mask |= child_mask
+
+      if _max_question_length is not None:
+        # The descriptions of all child entities end up in the question, joined
+        # by spaces.
+        lengths = [child.min_length() for child in self._child_entities]
+        lengths = [length for length in lengths if length]
+        _check_length(sum(lengths) + len(lengths) - 1, 'Child entities')
 
     return self._child_entities
 
@@ -421,14 +727,18 @@ def expand_entities(context, **kwargs):
     **kwargs: Dictionary of key/value pairs, some of which are `Entity`s.
 
   Returns:
-    Pair `(child_description, new_kwargs)`. `child_description` is a description
-    of the entities contained in `kwargs`, and `new_kwargs` contains handles.
+    Pair `(child_description, new_kwargs)`. `child_description` is a
+    `Description` of the entities contained in `kwargs`, and `new_kwargs`
+    contains handles.
   """
   kwargs = kwargs.copy()
-  entities = set(context.child_entities)
+  # Deduplicate preserving order (rather than via a `set`, whose order depends
+  # on object ids), so that sampling is reproducible from a seed.
+  entities = collections.OrderedDict(
+      (entity, None) for entity in context.child_entities)
   for key, maybe_entity in six.iteritems(kwargs):
     if isinstance(maybe_entity, Entity):
-      entities.add(maybe_entity)
+      entities[maybe_entity] = None
       kwargs[key] = maybe_entity.handle
   entities = list(entities)
   random.shuffle(entities)
@@ -439,7 +749,8 @@ def expand_entities(context, **kwargs):
     if not entity.expression_used:
       child_descriptions.append(entity.description)
 
-  child_description = ' '.join([s for s in child_descriptions if s])
+  child_description = Description.join(' ', child_descriptions)
+  _check_length(child_description.min_length(), 'Child description')
   return child_description, kwargs
 
 
@@ -508,7 +819,7 @@ class Entity(object):
       raise ValueError('Must provided polynomial_variables')
 
     self._child_description = child_description
-    self._description = description.format(**description_kwargs)
+    self._description = Description(description, description_kwargs)
     self._handle = handle
     self._expression = expression
     self._polynomial_variables = polynomial_variables
@@ -525,12 +836,12 @@ class Entity(object):
 
   @property
   def child_description(self):
-    """A string describing the entities that this Entity relies on."""
+    """`Description` of the entities that this Entity relies on."""
     return self._child_description
 
   @property
   def description(self):
-    """A string describing the entity."""
+    """`Description` of the entity (use `str` to get the text)."""
     assert not self._expression_used
     self._handle_used = True
     return self._description
@@ -559,6 +870,19 @@ class Entity(object):
     self._expression_used = True
     return self._expression
 
+  def min_length(self):
+    """Returns lower bound on the length this entity contributes to a question.
+
+    The child description always appears, and so does the description unless
+    there is an expression that could be used instead of the handle.
+    """
+    length = self._child_description.min_length()
+    if self._expression is None:
+      description_length = self._description.min_length()
+      if description_length:
+        length += description_length + (1 if length else 0)
+    return length
+
   @property
   def polynomial_variables(self):
     """For when `expression` is not None, and this entity is a polynomial."""
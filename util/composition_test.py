@@ -10,6 +10,31 @@ from util import composition
 import sympy
 
 
+class DescriptionTest(absltest.TestCase):
+
+  def testStr(self):
+    inner = composition.Description('{x} + {{1}}', {'x': sympy.Symbol('x')})
+    outer = composition.Description(
+        'Let {self} = {inner:>8}; {inner}.', {'self': 'y', 'inner': inner})
+    self.assertEqual(str(outer), 'Let y =  x + {1}; x + {1}.')
+    self.assertEqual('{}'.format(outer), str(outer))
+
+  def testJoin(self):
+    joined = composition.Description.join(
+        ' ', ['', composition.Description('a'), composition.Description(''),
+              composition.Description('{x}', {'x': 2})])
+    self.assertEqual(str(joined), 'a 2')
+    self.assertEqual(str(composition.Description.join(' ', [])), '')
+
+  def testMinLength(self):
+    description = composition.Description(
+        'Let {self} = {value}.', {'self': 'ab', 'value': sympy.Integer(123)})
+    self.assertEqual(description.min_length(), len('Let ab = 1.'))
+    self.assertEqual(len(str(description)), len('Let ab = 123.'))
+    # Exact once rendered.
+    self.assertEqual(description.min_length(), len('Let ab = 123.'))
+
+
 class FunctionHandleTest(absltest.TestCase):
 
   def testApply(self):
@@ -37,6 +62,71 @@ class ContextTest(absltest.TestCase):
     self.assertAlmostEqual(sum([child.entropy for child in children]), 5.0)
 
 
+class ContextSymbolsTest(absltest.TestCase):
+
+  def testPop(self):
+    context = composition.Context(set('abcdfghijklmnopqrstuvwx'))
+    self.assertIn(context.pop(), ('y', 'z'))
+    self.assertIn(context.pop(), ('y', 'z'))
+    self.assertEqual(context.self_symbols, set('yz'))
+    with self.assertRaisesRegexp(ValueError, 'Ran out of symbols'):
+      context.pop()
+
+  def testPop_skipsE(self):
+    context = composition.Context()
+    symbols = [context.pop() for _ in range(25)]
+    self.assertEqual(set(symbols), composition._ALLOWED_SYMBOLS)
+
+  def testMarkUsed(self):
+    context = composition.Context(set('a'))
+    context.mark_used('e')
+    self.assertEqual(context.relation_symbols, set('a'))
+    self.assertEqual(context.self_symbols, set('e'))
+    with self.assertRaisesRegexp(ValueError, 'already used'):
+      context.mark_used('a')
+    # Returned sets are copies.
+    context.self_symbols.add('b')
+    self.assertEqual(context.self_symbols, set('e'))
+
+
+class SamplerIndexTest(absltest.TestCase):
+
+  def testValueKind(self):
+    self.assertEqual(composition.value_kind(3), ('integer', 1))
+    self.assertEqual(composition.value_kind(sympy.Integer(-2)), ('integer', -1))
+    self.assertEqual(
+        composition.value_kind(sympy.Rational(1, 2)), ('rational', 1))
+    self.assertEqual(
+        composition.value_kind(composition.Polynomial([1, 2])),
+        ('polynomial', 1, True))
+    self.assertEqual(
+        composition.value_kind(
+            composition.Polynomial([sympy.Rational(1, 2), 2])),
+        ('polynomial', 1, False))
+    self.assertIsNone(composition.value_kind('x'))
+
+  def testSampler(self):
+    def integer_sampler(value, sample_args, context=None):
+      del value, sample_args, context  # unused
+
+    saved = list(composition._FILTERS_AND_SAMPLERS)
+    def restore():
+      composition._FILTERS_AND_SAMPLERS[:] = saved
+      composition._SAMPLERS_BY_KIND.clear()
+    self.addCleanup(restore)
+    composition._FILTERS_AND_SAMPLERS[:] = []
+    composition.module(lambda value: value == 5)(integer_sampler)
+
+    context = composition.Context()
+    sample_args = composition.SampleArgs(1, 1.0)
+    self.assertIs(context._sampler(5, sample_args), integer_sampler)
+    self.assertEqual(composition.sampler_counts()['integer_sampler'], 1)
+    # Indexed by kind, so values of the same kind get the same samplers.
+    self.assertIs(context._sampler(6, sample_args), integer_sampler)
+    with self.assertRaisesRegexp(ValueError, 'No valid samplers'):
+      context._sampler(-5, sample_args)
+
+
 class EntityTest(absltest.TestCase):
 
   def testInit_valueErrorIfSelfAndHandle(self):
@@ -46,6 +136,24 @@ class EntityTest(absltest.TestCase):
                          description='Something with {self}. ',
                          handle='additional')
 
+  def testInit_questionTooLong(self):
+    def make_entities():
+      context = composition.Context()
+      child = composition.Entity(
+          context=context, value=sympy.Integer(1),
+          description='Пусть {self} = 1.')
+      return composition.Entity(
+          context=context, value=sympy.Integer(2),
+          description='Пусть {self} = {child} + 1.', child=child)
+
+    entity = make_entities()
+    self.assertEqual(entity.min_length(), len('Пусть a = 1. Пусть b = a + 1.'))
+    with composition.max_question_length(12):
+      make_entities()
+    with composition.max_question_length(11):
+      with self.assertRaises(composition.QuestionTooLongError):
+        make_entities()
+
 
 if __name__ == '__main__':
   absltest.main()
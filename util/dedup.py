@@ -0,0 +1,170 @@
+"""Memory-bounded sets of examples, for removing duplicates while generating.
+
+Examples are identified by a 64-bit `fingerprint` of the question and answer.
+Two set implementations are provided, with the same interface (`add` returns
+whether the fingerprint was new):
+
+*   `FingerprintSet` is exact (up to fingerprint collisions, which are
+    negligible for 64 bits and realistic corpus sizes). It keeps up to
+    `max_in_memory` fingerprints in memory; beyond that, they are written to
+    disk as sorted runs, which are memory-mapped and binary searched.
+*   `BloomFilter` uses a fixed amount of memory, determined by the expected
+    number of examples and the false positive rate; a false positive means a
+    new example is wrongly treated as a duplicate.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import hashlib
+import math
+import os
+import shutil
+import struct
+import tempfile
+
+# Dependency imports
+import numpy as np
+
+
+_FINGERPRINT = struct.Struct('<Q')
+
+
+def fingerprint(question, answer):
+  """Returns 64-bit integer hash of the pair of strings `question`, `answer`."""
+  question = question.encode('utf-8')
+  digest = hashlib.blake2b(digest_size=8)
+  # Prefix the length of the question, so that the split is unambiguous.
+  digest.update(_FINGERPRINT.pack(len(question)))
+  digest.update(question)
+  digest.update(answer.encode('utf-8'))
+  return _FINGERPRINT.unpack(digest.digest())[0]
+
+
+class FingerprintSet(object):
+  """Exact set of fingerprints, spilling sorted runs to disk."""
+
+  def __init__(self, max_in_memory=2**22, spill_dir=None):
+    """Initializes a `FingerprintSet`.
+
+    Args:
+      max_in_memory: Number of fingerprints to keep in memory before writing
+          them to disk.
+      spill_dir: Directory for the files of fingerprints written to disk; a
+          temporary directory (removed on `close`) if None.
+    """
+    self._max_in_memory = max_in_memory
+    self._spill_dir = spill_dir
+    self._owns_spill_dir = spill_dir is None
+    self._in_memory = set()
+    self._runs = []
+    self._size = 0
+
+  def __contains__(self, fingerprint_):
+    if fingerprint_ in self._in_memory:
+      return True
+    key = np.uint64(fingerprint_)
+    for run in self._runs:
+      index = np.searchsorted(run, key)
+      if index < len(run) and run[index] == key:
+        return True
+    return False
+
+  def add(self, fingerprint_):
+    """Adds `fingerprint_`, returning whether it was not already present."""
+    if fingerprint_ in self:
+      return False
+    self._in_memory.add(fingerprint_)
+    self._size += 1
+    if len(self._in_memory) >= self._max_in_memory:
+      self._spill()
+    return True
+
+  def _spill(self):
+    """Writes the fingerprints in memory to disk as a sorted run."""
+    if self._spill_dir is None:
+      self._spill_dir = tempfile.mkdtemp(prefix='dedup')
+    path = os.path.join(self._spill_dir, 'run{:05d}.npy'.format(
+        len(self._runs)))
+    run = np.array(sorted(self._in_memory), dtype=np.uint64)
+    np.save(path, run)
+    self._runs.append(np.load(path, mmap_mode='r'))
+    self._in_memory = set()
+
+  @property
+  def num_runs(self):
+    """Returns the number of runs written to disk."""
+    return len(self._runs)
+
+  def __len__(self):
+    return self._size
+
+  def close(self):
+    """Releases the runs on disk."""
+    self._runs = []
+    if self._owns_spill_dir and self._spill_dir is not None:
+      shutil.rmtree(self._spill_dir, ignore_errors=True)
+      self._spill_dir = None
+
+
+class BloomFilter(object):
+  """Bloom filter of fingerprints, with a bounded false positive rate."""
+
+  def __init__(self, capacity, false_positive_rate):
+    """Initializes a `BloomFilter`.
+
+    Args:
+      capacity: Expected number of fingerprints that will be added.
+      false_positive_rate: Probability that `add` of a new fingerprint returns
+          False, once `capacity` fingerprints have been added.
+
+    Raises:
+      ValueError: If the arguments are out of range.
+    """
+    if capacity < 1:
+      raise ValueError('capacity={} must be positive'.format(capacity))
+    if not 0 < false_positive_rate < 1:
+      raise ValueError('false_positive_rate={} must be in (0, 1)'
+                       .format(false_positive_rate))
+    num_bits = int(math.ceil(
+        -capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+    self._num_bits = max(8, num_bits)
+    self._num_hashes = max(
+        1, int(round(self._num_bits / capacity * math.log(2))))
+    self._bits = np.zeros([(self._num_bits + 7) // 8], dtype=np.uint8)
+    self._size = 0
+
+  @property
+  def num_bytes(self):
+    return self._bits.nbytes
+
+  def _positions(self, fingerprint_):
+    """Returns the bit positions for `fingerprint_` (by double hashing)."""
+    low = fingerprint_ & 0xffffffff
+    high = fingerprint_ >> 32
+    return (low + np.arange(self._num_hashes, dtype=np.uint64) * high
+           ) % self._num_bits
+
+  def __contains__(self, fingerprint_):
+    positions = self._positions(fingerprint_)
+    masks = np.left_shift(1, positions & 7).astype(np.uint8)
+    return bool(np.all(self._bits[positions >> 3] & masks))
+
+  def add(self, fingerprint_):
+    """Adds `fingerprint_`, returning whether it was (probably) new."""
+    positions = self._positions(fingerprint_)
+    bytes_ = positions >> 3
+    masks = np.left_shift(1, positions & 7).astype(np.uint8)
+    if np.all(self._bits[bytes_] & masks):
+      return False
+    np.bitwise_or.at(self._bits, bytes_, masks)
+    self._size += 1
+    return True
+
+  def __len__(self):
+    """Returns the number of fingerprints added (that were new)."""
+    return self._size
+
+  def close(self):
+    """Does nothing; for the same interface as `FingerprintSet`."""
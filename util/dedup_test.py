@@ -0,0 +1,67 @@
+"""Tests for mathematics_dataset.util.dedup."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+# Dependency imports
+from absl.testing import absltest
+from six.moves import range
+from util import dedup
+
+
+class FingerprintTest(absltest.TestCase):
+
+  def testFingerprint(self):
+    fingerprint = dedup.fingerprint('What is 1 + 1?', '2')
+    self.assertEqual(fingerprint, dedup.fingerprint('What is 1 + 1?', '2'))
+    self.assertGreaterEqual(fingerprint, 0)
+    self.assertLess(fingerprint, 2**64)
+    self.assertNotEqual(fingerprint, dedup.fingerprint('What is 1 + 1?', '3'))
+    # The split between question and answer matters.
+    self.assertNotEqual(dedup.fingerprint('ab', 'c'),
+                        dedup.fingerprint('a', 'bc'))
+
+
+class FingerprintSetTest(absltest.TestCase):
+
+  def testAdd(self):
+    fingerprints = dedup.FingerprintSet(max_in_memory=10)
+    try:
+      for i in range(35):
+        self.assertTrue(fingerprints.add(dedup.fingerprint(str(i), '')))
+      self.assertEqual(fingerprints.num_runs, 3)
+      self.assertLen(fingerprints, 35)
+      # Fingerprints both in memory and on disk are found.
+      for i in range(35):
+        self.assertIn(dedup.fingerprint(str(i), ''), fingerprints)
+        self.assertFalse(fingerprints.add(dedup.fingerprint(str(i), '')))
+      self.assertNotIn(dedup.fingerprint('35', ''), fingerprints)
+      self.assertLen(fingerprints, 35)
+    finally:
+      fingerprints.close()
+
+
+class BloomFilterTest(absltest.TestCase):
+
+  def testInvalid(self):
+    with self.assertRaises(ValueError):
+      dedup.BloomFilter(0, 0.01)
+    with self.assertRaises(ValueError):
+      dedup.BloomFilter(100, 1.0)
+
+  def testAdd(self):
+    bloom = dedup.BloomFilter(2000, 0.01)
+    num_new = sum(bloom.add(dedup.fingerprint(str(i), '')) for i in range(2000))
+    self.assertGreater(num_new, 1950)
+    self.assertEqual(len(bloom), num_new)
+    # No false negatives.
+    for i in range(2000):
+      self.assertIn(dedup.fingerprint(str(i), ''), bloom)
+    false_positives = sum(dedup.fingerprint(str(i), '') in bloom
+                          for i in range(2000, 12000))
+    self.assertLess(false_positives, 300)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -14,9 +14,9 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-import decimal
-
 # Dependency imports
+import numpy as np
+import six
 import sympy
 
 
@@ -167,8 +167,35 @@ def check_one_ending(num):
 
 
 
+def _decimal_scale(denom):
+  """Returns least `scale` such that `denom` divides `10**scale`, or None."""
+  twos = (denom & -denom).bit_length() - 1
+  denom >>= twos
+  fives = 0
+  while denom % 5 == 0:
+    denom //= 5
+    fives += 1
+  if denom != 1:
+    return None
+  return max(twos, fives)
+
+
+def _round_half_even(numer, denom):
+  """Returns `numer / denom` rounded to an integer, with ties to even."""
+  quotient, remainder = divmod(numer, denom)
+  if 2 * remainder > denom or (2 * remainder == denom and quotient % 2 == 1):
+    quotient += 1
+  return quotient
+
+
 class Decimal(object):
-  """Display a value as a decimal."""
+  """Display a value as a decimal.
+
+  The value is stored exactly as the pair `(mantissa, scale)` of integers, with
+  value `mantissa / 10**scale`, and `scale >= 0` as small as possible.
+  """
+
+  __slots__ = ('_mantissa', '_scale')
 
   def __init__(self, value):
     """Initializes a `Decimal`.
@@ -179,115 +206,135 @@ class Decimal(object):
     Raises:
       ValueError: If `value` cannot be represented as a non-terminating decimal.
     """
-    self._value = sympy.Rational(value)
-
-    numer = int(sympy.numer(self._value))
-    denom = int(sympy.denom(self._value))
-
-    denom_factors = list(sympy.factorint(denom).keys())
-    for factor in denom_factors:
-      if factor not in [2, 5]:
-        raise ValueError('Cannot represent {} as a non-recurring decimal.'
-                         .format(value))
-    self._decimal = decimal.Decimal(numer) / decimal.Decimal(denom)
+    if isinstance(value, (six.integer_types, np.integer, sympy.Integer)):
+      self._mantissa = int(value)
+      self._scale = 0
+      return
+    if not isinstance(value, sympy.Rational):
+      value = sympy.Rational(value)
+    numer = int(value.p)
+    denom = int(value.q)
+    scale = _decimal_scale(denom)
+    if scale is None:
+      raise ValueError('Cannot represent {} as a non-recurring decimal.'
+                       .format(value))
+    self._mantissa = numer * 10**scale // denom
+    self._scale = scale
+
+  @classmethod
+  def _from_pair(cls, mantissa, scale):
+    """Returns `Decimal` of `mantissa / 10**scale` (for any `scale >= 0`)."""
+    while scale > 0 and mantissa % 10 == 0:
+      mantissa //= 10
+      scale -= 1
+    decimal = cls.__new__(cls)
+    decimal._mantissa = mantissa
+    decimal._scale = scale
+    return decimal
+
+  def _aligned(self, other):
+    """Returns mantissas of `self` and `other` for a common scale, and scale."""
+    scale = max(self._scale, other._scale)
+    return (self._mantissa * 10**(scale - self._scale),
+            other._mantissa * 10**(scale - other._scale),
+            scale)
 
   @property
   def value(self):
     """Returns the value as a `sympy.Rational` object."""
-    return self._value
+    return sympy.Rational(self._mantissa, 10**self._scale)
 
   def _sympy_(self):
-    return self._value
+    return self.value
 
   def decimal_places(self):
     """Returns the number of decimal places, e.g., 32 has 0 and 1.43 has 2."""
-    if isinstance(self._decimal, int):
-      return 0
-    elif isinstance(self._decimal, decimal.Decimal):
-      return -self._decimal.as_tuple().exponent
+    return self._scale
 
   def __str__(self):
-    sign, digits, exponent = self._decimal.as_tuple()
-    sign = '' if sign == 0 else '-'
-
-    num_left_digits = len(digits) + exponent  # number digits "before" point
-
-    if num_left_digits > 0:
-      int_part = ''.join(str(digit) for digit in digits[:num_left_digits])
-    else:
-      int_part = '0'
-
-    if exponent < 0:
-      frac_part = '.'
-      if num_left_digits < 0:
-        frac_part += '0' * -num_left_digits
-      frac_part += ''.join(str(digit) for digit in digits[exponent:])
-    else:
-      frac_part = ''
-
-    return sign + int_part + frac_part
+    sign = '-' if self._mantissa < 0 else ''
+    digits = str(abs(self._mantissa))
+    if self._scale == 0:
+      return sign + digits
+    digits = digits.rjust(self._scale + 1, '0')
+    return sign + digits[:-self._scale] + '.' + digits[-self._scale:]
 
   def __add__(self, other):
     if not isinstance(other, Decimal):
       raise ValueError('Arithmetic support limited to other `Decimal`s.')
-    return Decimal(self.value + other.value)
+    mantissa, other_mantissa, scale = self._aligned(other)
+    return Decimal._from_pair(mantissa + other_mantissa, scale)
 
   def __sub__(self, other):
     if not isinstance(other, Decimal):
       raise ValueError('Arithmetic support limited to other `Decimal`s.')
-    return Decimal(self.value - other.value)
+    mantissa, other_mantissa, scale = self._aligned(other)
+    return Decimal._from_pair(mantissa - other_mantissa, scale)
 
   def __mul__(self, other):
     if not isinstance(other, Decimal):
       raise ValueError('Arithmetic support limited to other `Decimal`s.')
-    return Decimal(self.value * other.value)
+    return Decimal._from_pair(
+        self._mantissa * other._mantissa, self._scale + other._scale)
 
   def __neg__(self):
-    return Decimal(-self.value)
+    return Decimal._from_pair(-self._mantissa, self._scale)
 
   def round(self, ndigits=0):
     """Returns a new `Decimal` rounded to this many decimal places."""
-    scale = sympy.Integer(10 ** ndigits)
-    numer = sympy.numer(self.value) * scale
-    denom = sympy.denom(self.value)
-    return Decimal(int(round(numer / denom)) / scale)
+    if ndigits >= self._scale:
+      return Decimal._from_pair(self._mantissa, self._scale)
+    mantissa = _round_half_even(self._mantissa, 10**(self._scale - ndigits))
+    return Decimal._from_pair(mantissa, ndigits)
 
   def __round__(self, ndigits):
     return self.round(ndigits)
 
   def __int__(self):
     """Returns conversion to integer if possible; TypeError if non-integer."""
-    if self.decimal_places() == 0:
-      return int(self._decimal)
+    if self._scale == 0:
+      return self._mantissa
     else:
       raise TypeError('Cannot represent {} as an integer.'.format(str(self)))
 
+  def _compare(self, other):
+    """Returns pair of mantissas of `self` and `other` if `other` a `Decimal`."""
+    if isinstance(other, Decimal):
+      return self._aligned(other)[:2]
+    return self.value, other
+
   # NOTE: this is implemented in addition to `__cmp__` because SymPy does not
   # support inequality comparison between sympy objects and objects that are not
   # convertible to sympy objects (such as strings).
   def __eq__(self, other):
-    return self.value == other
+    left, right = self._compare(other)
+    return left == right
 
   # Python 2 comparison
   def __cmp__(self, other):
-    if self.value == other:
+    left, right = self._compare(other)
+    if left == right:
       return 0
-    if self.value < other:
+    if left < right:
       return -1
     return 1
 
   # Python 3 comparison:
   def __lt__(self, other):
-    return self.value < other
+    left, right = self._compare(other)
+    return left < right
 
   def __le__(self, other):
-    return self.value <= other
+    left, right = self._compare(other)
+    return left <= right
 
   def __gt__(self, other):
-    return self.value > other
+    left, right = self._compare(other)
+    return left > right
 
   def __ge__(self, other):
-    return self.value >= other
+    left, right = self._compare(other)
+    return left >= right
 
 
 class Percentage(object):
@@ -44,8 +44,24 @@ class DecimalTest(absltest.TestCase):
     decimal = display.Decimal(sympy.Rational(1, 1000000000))
     self.assertEqual(str(decimal), '0.000000001')
 
+  def testStr_manyDigits(self):
+    decimal = (display.Decimal(sympy.Rational(45386461233, 640))
+               * display.Decimal(sympy.Rational(-243865792383, 8)))
+    self.assertEqual(str(decimal), '-2161758853915206286.7654296875')
+
+  def testInit_nonDecimal(self):
+    with self.assertRaisesRegexp(ValueError, 'non-recurring'):
+      display.Decimal(sympy.Rational(1, 3))
+
+  def testInit_float(self):
+    self.assertEqual(str(display.Decimal(2.5)), '2.5')
+
   def testAdd(self):
     self.assertEqual((display.Decimal(2) + display.Decimal(3)).value, 5)
+    decimal = (display.Decimal(sympy.Rational(3, 4))
+               + display.Decimal(sympy.Rational(1, 4)))
+    self.assertEqual(str(decimal), '1')
+    self.assertEqual(decimal.decimal_places(), 0)
 
   def testSub(self):
     self.assertEqual((display.Decimal(2) - display.Decimal(3)).value, -1)
@@ -61,6 +77,12 @@ class DecimalTest(absltest.TestCase):
     self.assertEqual(sympy.sympify(decimal.round(3)),
                      sympy.Rational(2675, 1000))
 
+  def testRound_halfToEven(self):
+    for value, ndigits, rounded in [
+        (0.5, 0, 0), (1.5, 0, 2), (2.5, 0, 2), (-2.5, 0, -2), (-3.5, 0, -4),
+        (-0.25, 1, -0.2)]:
+      self.assertEqual(display.Decimal(value).round(ndigits), rounded)
+
   def testInt(self):
     decimal = display.Decimal(123)
     self.assertEqual(int(decimal), 123)
@@ -0,0 +1,114 @@
+"""Reading the example files written by `generate_to_file.py`.
+
+Each module of a regime is written to files in one of three formats:
+
+*   'text': `<module>.txt`, UTF-8 encoded, with lines alternating between
+    question and answer.
+*   'shards': `<module>.shard` and its index (see `util/shards.py`).
+*   'npy': `<module>.questions.npy` and `<module>.answers.npy` (see
+    `util/tokenization.py`).
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import io
+import os
+
+# Dependency imports
+import numpy as np
+from six.moves import zip
+from util import shards
+from util import tokenization
+
+
+FORMATS = ('text', 'shards', 'npy')
+TEXT_SUFFIX = '.txt'
+SHARD_SUFFIX = '.shard'
+
+# Suffixes of the file identifying a module (see `module_files`).
+_SUFFIXES = (TEXT_SUFFIX, SHARD_SUFFIX, tokenization.QUESTIONS_SUFFIX)
+
+# Number of bytes read at a time when counting the examples of text files.
+_BLOCK_SIZE = 2**20
+
+
+def paths(path, format_):
+  """Returns list of the files of a module.
+
+  Args:
+    path: Path of the module's output, without file extension.
+    format_: One of `FORMATS`.
+
+  Returns:
+    List of paths; the first is the one returned by `module_files`.
+
+  Raises:
+    ValueError: If `format_` is unknown.
+  """
+  if format_ == 'text':
+    return [path + TEXT_SUFFIX]
+  elif format_ == 'shards':
+    return [path + SHARD_SUFFIX, shards.index_path(path + SHARD_SUFFIX)]
+  elif format_ == 'npy':
+    return [path + tokenization.QUESTIONS_SUFFIX,
+            path + tokenization.ANSWERS_SUFFIX]
+  else:
+    raise ValueError('Unknown format {}'.format(format_))
+
+
+def module_files(regime_dir):
+  """Returns sorted list of `(module_name, path)` of the files in `regime_dir`.
+
+  Args:
+    regime_dir: Directory of a regime written by `generate_to_file.py`.
+
+  Returns:
+    List of pairs, where `path` is the text file, the shard, or (for the npy
+    format) the questions array of the module.
+  """
+  files = []
+  for filename in sorted(os.listdir(regime_dir)):
+    for suffix in _SUFFIXES:
+      if filename.endswith(suffix):
+        files.append((filename[:-len(suffix)],
+                      os.path.join(regime_dir, filename)))
+        break
+  return files
+
+
+def iter_examples(path):
+  """Yields the `(question, answer)` pairs of a file in `module_files`."""
+  if path.endswith(TEXT_SUFFIX):
+    with io.open(path, encoding='utf-8') as text_file:
+      for question, answer in zip(text_file, text_file):
+        yield question.rstrip('\n'), answer.rstrip('\n')
+  elif path.endswith(SHARD_SUFFIX):
+    with shards.ShardReader(path) as reader:
+      for example in reader:
+        yield example
+  elif path.endswith(tokenization.QUESTIONS_SUFFIX):
+    base = path[:-len(tokenization.QUESTIONS_SUFFIX)]
+    questions = np.load(path, mmap_mode='r')
+    answers = np.load(base + tokenization.ANSWERS_SUFFIX, mmap_mode='r')
+    for question, answer in zip(questions, answers):
+      yield tokenization.decode(question), tokenization.decode(answer)
+  else:
+    raise ValueError('Unknown format of {}'.format(path))
+
+
+def count_examples(path):
+  """Returns the number of examples in a file in `module_files`."""
+  if path.endswith(TEXT_SUFFIX):
+    num_lines = 0
+    with open(path, 'rb') as text_file:
+      for block in iter(lambda: text_file.read(_BLOCK_SIZE), b''):
+        num_lines += block.count(b'\n')
+    return num_lines // 2
+  elif path.endswith(SHARD_SUFFIX):
+    return os.path.getsize(shards.index_path(path)) // 8
+  elif path.endswith(tokenization.QUESTIONS_SUFFIX):
+    return len(np.load(path, mmap_mode='r'))
+  else:
+    raise ValueError('Unknown format of {}'.format(path))
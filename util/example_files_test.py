@@ -0,0 +1,60 @@
+"""Tests for mathematics_dataset.util.example_files."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+
+# Dependency imports
+from absl.testing import absltest
+from absl.testing import parameterized
+from util import example_files
+from util import shards
+from util import tokenization
+
+
+_EXAMPLES = [('What is 1 + 1?', '2'), ('Решите x = 1 для x.', '1'),
+             ('', '')]
+
+
+class ExampleFilesTest(parameterized.TestCase):
+
+  def setUp(self):
+    super(ExampleFilesTest, self).setUp()
+    self._dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self._dir)
+
+  def _write(self, path, format_):
+    if format_ == 'text':
+      with open(path + example_files.TEXT_SUFFIX, 'w') as text_file:
+        for question, answer in _EXAMPLES:
+          text_file.write(question + '\n' + answer + '\n')
+      return
+    if format_ == 'shards':
+      writer = shards.ShardWriter(path + example_files.SHARD_SUFFIX)
+    else:
+      writer = tokenization.ArrayWriter(path, 10)
+    with writer:
+      for question, answer in _EXAMPLES:
+        writer.write(question, answer)
+
+  @parameterized.parameters(*example_files.FORMATS)
+  def testReadExamples(self, format_):
+    path = os.path.join(self._dir, 'arithmetic__add')
+    self._write(path, format_)
+    for file_path in example_files.paths(path, format_):
+      self.assertTrue(os.path.exists(file_path), file_path)
+
+    module_files = example_files.module_files(self._dir)
+    self.assertEqual(module_files, [
+        ('arithmetic__add', example_files.paths(path, format_)[0])])
+    _, file_path = module_files[0]
+    self.assertEqual(list(example_files.iter_examples(file_path)), _EXAMPLES)
+    self.assertEqual(example_files.count_examples(file_path), 3)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,109 @@
+"""Cached integer factorization, shared by the samplers and modules.
+
+`factorint` gives the same results as `sympy.factorint` (including the order of
+the prime factors), but:
+
+*   Integers in `[2, SIEVE_LIMIT)` are factorized by repeatedly looking up their
+    smallest prime factor in a sieve, which is computed on first use.
+*   Other integers are factorized by `sympy.factorint`, and the results kept in
+    a bounded least-recently-used cache, as the same integers (or their
+    numerators and denominators) are typically factorized several times while
+    sampling a problem.
+
+`cache_info` returns counters for how often each path is taken.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+
+# Dependency imports
+import numpy as np
+import six
+from six.moves import range
+import sympy
+
+
+SIEVE_LIMIT = 2**16
+CACHE_SIZE = 2**14
+
+CacheInfo = collections.namedtuple(
+    'CacheInfo', ('sieve', 'hits', 'misses', 'maxsize', 'currsize'))
+
+_smallest_prime_factor = None
+
+# Maps integer to tuple of `(prime, multiplicity)` pairs, least recently used
+# first.
+_cache = collections.OrderedDict()
+_counts = collections.Counter()
+
+
+def _sieve(limit):
+  """Returns array mapping integers in [0, limit) to smallest prime factor."""
+  smallest = np.zeros(limit, dtype=np.int32)
+  for prime in range(2, int(limit ** 0.5) + 1):
+    if smallest[prime] == 0:
+      multiples = smallest[prime * prime::prime]
+      multiples[multiples == 0] = prime
+  unset = smallest == 0
+  smallest[unset] = np.arange(limit)[unset]
+  return smallest
+
+
+def _factorint_sieve(integer):
+  """Returns `factorint(integer)` for 2 <= integer < SIEVE_LIMIT."""
+  global _smallest_prime_factor
+  if _smallest_prime_factor is None:
+    _smallest_prime_factor = _sieve(SIEVE_LIMIT).tolist()
+  factors = {}
+  while integer > 1:
+    prime = _smallest_prime_factor[integer]
+    factors[prime] = factors.get(prime, 0) + 1
+    integer //= prime
+  return factors
+
+
+def factorint(integer):
+  """Returns dict mapping the prime factors of `integer` to their multiplicity.
+
+  Args:
+    integer: Python, numpy or sympy integer.
+
+  Returns:
+    New dict (so it can be modified by the caller), with the same contents as
+    `sympy.factorint(integer)`.
+
+  Raises:
+    ValueError: If `integer` is not an integer.
+  """
+  if int(integer) != integer:
+    raise ValueError('Cannot factorize non-integer {}'.format(integer))
+  integer = int(integer)
+  if 2 <= integer < SIEVE_LIMIT:
+    _counts['sieve'] += 1
+    return _factorint_sieve(integer)
+  items = _cache.pop(integer, None)
+  if items is None:
+    _counts['misses'] += 1
+    items = tuple(six.iteritems(sympy.factorint(integer)))
+    if len(_cache) >= CACHE_SIZE:
+      _cache.popitem(last=False)
+  else:
+    _counts['hits'] += 1
+  _cache[integer] = items
+  return dict(items)
+
+
+def cache_info():
+  """Returns `CacheInfo` of the number of factorizations by each method."""
+  return CacheInfo(
+      sieve=_counts['sieve'], hits=_counts['hits'], misses=_counts['misses'],
+      maxsize=CACHE_SIZE, currsize=len(_cache))
+
+
+def cache_clear():
+  """Clears the cache and its counters."""
+  _cache.clear()
+  _counts.clear()
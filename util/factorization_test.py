@@ -0,0 +1,65 @@
+"""Tests for mathematics_dataset.util.factorization."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+# Dependency imports
+from absl.testing import absltest
+from absl.testing import parameterized
+import numpy as np
+from six.moves import range
+import sympy
+from util import factorization
+
+
+class FactorizationTest(parameterized.TestCase):
+
+  def setUp(self):
+    super(FactorizationTest, self).setUp()
+    factorization.cache_clear()
+
+  def testSieve(self):
+    smallest = factorization._sieve(30)
+    self.assertEqual(
+        list(smallest[2:]),
+        [2, 3, 2, 5, 2, 7, 2, 3, 2, 11, 2, 13, 2, 3, 2, 17, 2, 19, 2, 3, 2, 23,
+         2, 5, 2, 3, 2, 29])
+
+  def testFactorint_smallIntegers(self):
+    for integer in range(-100, 2000):
+      self.assertEqual(list(factorization.factorint(integer).items()),
+                       list(sympy.factorint(integer).items()))
+
+  @parameterized.parameters(
+      2**16, 2**16 + 1, 2 * 3 * 5 * 7 * 11 * 13 * 17 * 19 * 23, 2**61 - 1,
+      -6 * 1000003, 10**18)
+  def testFactorint_largeIntegers(self, integer):
+    self.assertEqual(list(factorization.factorint(integer).items()),
+                     list(sympy.factorint(integer).items()))
+
+  def testFactorint_types(self):
+    expected = {2: 2, 3: 1}
+    for integer in [12, np.int64(12), sympy.Integer(12)]:
+      factors = factorization.factorint(integer)
+      self.assertEqual(factors, expected)
+      for prime, multiplicity in factors.items():
+        self.assertIsInstance(prime, int)
+        self.assertIsInstance(multiplicity, int)
+    with self.assertRaises(ValueError):
+      factorization.factorint(sympy.Rational(1, 2))
+
+  def testCache(self):
+    integer = 3 * 10**6
+    factors = factorization.factorint(integer)
+    del factors[2]  # Must not affect the cached result.
+    self.assertEqual(factorization.factorint(integer),
+                     sympy.factorint(integer))
+    factorization.factorint(10)
+    info = factorization.cache_info()
+    self.assertEqual((info.sieve, info.hits, info.misses, info.currsize),
+                     (1, 1, 1, 1))
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -21,10 +21,12 @@ from __future__ import division
 from __future__ import print_function
 
 import abc
+import collections
 import itertools
 
 # Dependency imports
 import six
+from six.moves import range
 from six.moves import zip
 import sympy
 
@@ -153,6 +155,41 @@ class CountLevelSetEvent(Event):
     return self._all_sequences
 
 
+class SetCountLevelSetEvent(Event):
+  """Event of all sequences with fixed numbers of values from disjoint sets.
+
+  This is the inverse of a `CountLevelSetEvent` under a random variable that
+  maps every element of a sequence in the same way: e.g., if indices {0, 1}
+  map to red and {2} maps to green, then the inverse of getting two reds and a
+  green is the event of two values from {0, 1} and one value from {2}.
+  """
+
+  def __init__(self, set_counts):
+    """Initializes `SetCountLevelSetEvent`.
+
+    Args:
+      set_counts: List of pairs `(values, count)`, where `values` are disjoint
+          sets, and `count` is the number of times a value from that set occurs
+          in a sequence.
+    """
+    self._set_counts = [(frozenset(values), count)
+                        for values, count in set_counts]
+
+  @property
+  def set_counts(self):
+    return self._set_counts
+
+  def all_sequences(self):
+    """Returns all sequences generated by this level set."""
+    labels = CountLevelSetEvent(
+        {i: count for i, (_, count) in enumerate(self._set_counts)})
+    sequences = []
+    for label_sequence in labels.all_sequences():
+      sequences += itertools.product(
+          *[self._set_counts[label][0] for label in label_sequence])
+    return sequences
+
+
 class SequenceEvent(Event):
   """Collection of sequences."""
 
@@ -271,6 +308,20 @@ class SampleWithoutReplacementSpace(ProbabilitySpace):
     return self._n_samples
 
   def probability(self, event):
+    # Specializations for optimization: count instead of enumerating sequences.
+    if self._is_uniform():
+      if isinstance(event, FiniteProductEvent):
+        probability = self._uniform_product_probability(event)
+        if probability is not None:
+          return probability
+      if isinstance(event, CountLevelSetEvent):
+        event = SetCountLevelSetEvent(
+            [({value}, count) for value, count in six.iteritems(event.counts)])
+      if isinstance(event, SetCountLevelSetEvent):
+        probability = self._uniform_set_count_probability(event)
+        if probability is not None:
+          return probability
+
     try:
       all_sequences = event.all_sequences()
     except AttributeError:
@@ -292,6 +343,76 @@ class SampleWithoutReplacementSpace(ProbabilitySpace):
       probability_sum += p_sequence
     return probability_sum
 
+  def _is_uniform(self):
+    return len(set(six.itervalues(self._weights))) == 1
+
+  def _uniform_product_probability(self, event):
+    """Returns probability of `FiniteProductEvent`, or None if not handled.
+
+    With uniform weights, the probability of a product of sets that are equal or
+    disjoint is the number of injective sequences in the product, divided by
+    the number of all injective sequences.
+
+    Args:
+      event: Instance of `FiniteProductEvent`.
+
+    Returns:
+      `sympy.Rational`, or None if the event is not a product of equal or
+      disjoint `DiscreteEvent`s of length `n_samples`.
+    """
+    if len(event.events) != self._n_samples:
+      return None
+    if not all(isinstance(sub_event, DiscreteEvent)
+               for sub_event in event.events):
+      return None
+    multiplicities = collections.Counter(
+        frozenset(sub_event.values) for sub_event in event.events)
+    union_size = len(frozenset().union(*multiplicities))
+    if union_size != sum(len(values) for values in multiplicities):
+      return None  # not disjoint
+    num_injective = 1
+    for values, multiplicity in six.iteritems(multiplicities):
+      num_injective *= _falling_factorial(
+          len(values.intersection(self._weights)), multiplicity)
+    return sympy.Rational(
+        num_injective, _falling_factorial(len(self._weights), self._n_samples))
+
+  def _uniform_set_count_probability(self, event):
+    """Returns the (multivariate hypergeometric) probability of the event.
+
+    With uniform weights, the set of sampled values is a uniformly random subset
+    of size `n_samples`, and the event holds for every ordering of it.
+
+    Args:
+      event: Instance of `SetCountLevelSetEvent`.
+
+    Returns:
+      `sympy.Rational`, or None if the counts do not sum to `n_samples`.
+    """
+    total = sum(count for _, count in event.set_counts)
+    if total != self._n_samples:
+      return None
+    num_subsets = 1
+    for values, count in event.set_counts:
+      num_subsets *= _binomial(len(values.intersection(self._weights)), count)
+    return sympy.Rational(
+        num_subsets, _binomial(len(self._weights), self._n_samples))
+
+
+def _falling_factorial(n, k):
+  """Returns n * (n - 1) * ... * (n - k + 1), as a python integer."""
+  result = 1
+  for i in range(k):
+    result *= n - i
+  return result
+
+
+def _binomial(n, k):
+  """Returns binomial coefficient "n choose k" (0 if k > n), as python int."""
+  if k > n:
+    return 0
+  return _falling_factorial(n, k) // _falling_factorial(k, k)
+
 
 class IdentityRandomVariable(RandomVariable):
   """Identity map of a probability space."""
@@ -374,6 +495,17 @@ class FiniteProductRandomVariable(RandomVariable):
           random_variable.inverse(sub_event)
           for random_variable, sub_event in zipped))
 
+    # Specialization for `CountLevelSetEvent` when every element is mapped the
+    # same way: the inverse is counts of values from the inverse of each value.
+    first = self._random_variables[0] if self._random_variables else None
+    if (isinstance(event, CountLevelSetEvent)
+        and isinstance(first, DiscreteRandomVariable)
+        and all(random_variable is first
+                for random_variable in self._random_variables)):
+      return SetCountLevelSetEvent([
+          (first.inverse(DiscreteEvent({value})).values, count)
+          for value, count in six.iteritems(event.counts)])
+
     # Try fallback of mapping each sequence separately.
     try:
       all_sequences = event.all_sequences()
@@ -99,6 +99,50 @@ class SampleWithoutReplacementSpaceTest(absltest.TestCase):
     self.assertEqual(p_1, 0)
     self.assertEqual(p_2, 0)
 
+  def testProbability_FiniteProductEvent_uniform(self):
+    space = probability.SampleWithoutReplacementSpace(
+        {i: 1 for i in range(5)}, 3)
+    red = probability.DiscreteEvent({0, 1, 2})
+    green = probability.DiscreteEvent({3, 4})
+    event = probability.FiniteProductEvent([red, green, red])
+    # 3/5 * 2/4 * 2/3.
+    self.assertEqual(space.probability(event), sympy.Rational(1, 5))
+    event = probability.FiniteProductEvent([green, green, green])
+    self.assertEqual(space.probability(event), 0)
+
+  def testProbability_SetCountLevelSetEvent(self):
+    space = probability.SampleWithoutReplacementSpace(
+        {i: 1 for i in range(5)}, 3)
+    event = probability.SetCountLevelSetEvent([({0, 1, 2}, 2), ({3, 4}, 1)])
+    # (3 choose 2) * (2 choose 1) / (5 choose 3).
+    self.assertEqual(space.probability(event), sympy.Rational(3, 5))
+    self.assertLen(event.all_sequences(), 3 * 3 * 3 * 2)
+
+  def testProbability_CountLevelSetEvent_large(self):
+    # Too many sequences to enumerate.
+    space = probability.SampleWithoutReplacementSpace(
+        {i: 1 for i in range(1000)}, 10)
+    random_variable = probability.DiscreteRandomVariable(
+        {i: i % 2 for i in range(1000)})
+    product = probability.FiniteProductRandomVariable([random_variable] * 10)
+    event = product.inverse(probability.CountLevelSetEvent({0: 10, 1: 0}))
+    self.assertEqual(
+        space.probability(event),
+        sympy.binomial(500, 10) / sympy.binomial(1000, 10))
+
+  def testProbability_matchesEnumeration(self):
+    weights = {i: 1 for i in range(6)}
+    random_variable = probability.DiscreteRandomVariable(
+        {0: 'a', 1: 'a', 2: 'b', 3: 'b', 4: 'b', 5: 'c'})
+    product = probability.FiniteProductRandomVariable([random_variable] * 3)
+    event = product.inverse(
+        probability.CountLevelSetEvent({'a': 1, 'b': 1, 'c': 1}))
+    space = probability.SampleWithoutReplacementSpace(weights, 3)
+    enumerated = probability.SampleWithoutReplacementSpace(
+        weights, 3).probability(probability.SequenceEvent(
+            event.all_sequences()))
+    self.assertEqual(space.probability(event), enumerated)
+
 
 class DiscreteRandomVariableTest(absltest.TestCase):
 
@@ -146,6 +190,14 @@ class FiniteProductRandomVariableTest(absltest.TestCase):
     self.assertEqual(result.events[0].values, {1, 2})
     self.assertEqual(result.events[1].values, {1, 3})
 
+  def testInverse_CountLevelSetEvent_sameRandomVariable(self):
+    rv = probability.DiscreteRandomVariable({1: 'a', 2: 'b', 3: 'a'})
+    product = probability.FiniteProductRandomVariable((rv, rv))
+    result = product.inverse(probability.CountLevelSetEvent({'a': 1, 'b': 1}))
+    self.assertIsInstance(result, probability.SetCountLevelSetEvent)
+    self.assertEqual(set(result.all_sequences()),
+                     {(1, 2), (3, 2), (2, 1), (2, 3)})
+
   def testInverse_CountLevelSetEvent(self):
     rv = self._random_variable()
     event = probability.CountLevelSetEvent({'a': 1, 'x': 1})
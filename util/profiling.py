@@ -0,0 +1,191 @@
+"""Opt-in timing of the stages of sampling a problem, aggregated per module.
+
+Profiling is disabled until `enable` is called (or inside an `enabled`
+context), and until `disable` is called. Time is then recorded while
+inside a `module` context (one per sampled example), and attributed to the
+innermost active stage; for example, time spent sampling a number inside
+`SampleArgs.split` counts towards 'number' and not 'split'. Time not inside any
+stage is attributed to 'other', so the stages of a module sum to its total time.
+
+Stages are marked with the `timed` decorator or the `stage` context manager.
+The stages used by the library are:
+
+*   'split': Entropy splitting (`composition.SampleArgs.split`).
+*   'number': Sampling of numbers (the public functions in `sample.number`).
+*   'sympy': Calls to the sympy functions in `SYMPY_FUNCTIONS` (made via the
+    `sympy` namespace; these are wrapped while profiling is enabled).
+*   'question': Rendering of the question (`example.question`).
+*   'answer': Converting the answer to a string.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import contextlib
+import functools
+import timeit
+
+# Dependency imports
+import six
+import sympy
+
+
+SYMPY_FUNCTIONS = (
+    'denom', 'det', 'expand', 'factor', 'factorint', 'gcd', 'lcm', 'numer',
+    'poly', 'prod', 'simplify', 'solve', 'sympify')
+
+_enabled = False
+
+# Maps name in `SYMPY_FUNCTIONS` to the sympy function replaced by `enable`.
+_sympy_functions = {}
+
+# Maps module key to dict mapping stage to list `[calls, seconds]`.
+_stats = {}
+
+# Active stages, innermost last; each is a list
+# `[key, stage, start_time, seconds_in_child_stages]`.
+_stack = []
+
+
+def enable():
+  """Enables profiling, wrapping the functions in `SYMPY_FUNCTIONS`."""
+  global _enabled
+  if _enabled:
+    return
+  _enabled = True
+  for name in SYMPY_FUNCTIONS:
+    _sympy_functions[name] = getattr(sympy, name)
+    setattr(sympy, name, timed('sympy')(_sympy_functions[name]))
+
+
+def disable():
+  """Disables profiling, restoring the functions in `SYMPY_FUNCTIONS`.
+
+  The stats recorded so far are kept.
+  """
+  global _enabled
+  if not _enabled:
+    return
+  _enabled = False
+  for name, function in six.iteritems(_sympy_functions):
+    setattr(sympy, name, function)
+  _sympy_functions.clear()
+
+
+@contextlib.contextmanager
+def enabled(enable_=True):
+  """Context with profiling enabled (if `enable_`), disabled again on exit."""
+  if not enable_ or _enabled:
+    yield
+    return
+  enable()
+  try:
+    yield
+  finally:
+    disable()
+
+
+def is_enabled():
+  return _enabled
+
+
+def _push(key, stage_):
+  _stack.append([key, stage_, timeit.default_timer(), 0.0])
+
+
+def _pop():
+  """Pops the innermost stage, recording its time minus that of its children."""
+  key, stage_, start, child_seconds = _stack.pop()
+  seconds = timeit.default_timer() - start
+  stage_stats = _stats.setdefault(key, {}).setdefault(stage_, [0, 0.0])
+  stage_stats[0] += 1
+  stage_stats[1] += seconds - child_seconds
+  if _stack:
+    _stack[-1][3] += seconds
+
+
+@contextlib.contextmanager
+def module(key):
+  """Context for sampling from the module `key` (e.g., a module name)."""
+  if not _enabled:
+    yield
+    return
+  _push(key, 'other')
+  try:
+    yield
+  finally:
+    _pop()
+
+
+@contextlib.contextmanager
+def stage(name):
+  """Context attributing the time spent inside it to stage `name`."""
+  if not _stack:
+    yield
+    return
+  _push(_stack[-1][0], name)
+  try:
+    yield
+  finally:
+    _pop()
+
+
+def timed(name):
+  """Decorator attributing the time spent in the function to stage `name`."""
+  def decorator(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+      # `_stack` is only non-empty when profiling inside a `module` context.
+      if not _stack:
+        return function(*args, **kwargs)
+      _push(_stack[-1][0], name)
+      try:
+        return function(*args, **kwargs)
+      finally:
+        _pop()
+    return wrapper
+  return decorator
+
+
+def pop_stats():
+  """Returns and clears the recorded stats (see `merge_stats`)."""
+  global _stats
+  stats, _stats = _stats, {}
+  return stats
+
+
+def merge_stats(stats):
+  """Adds stats returned by `pop_stats` (e.g., in another process)."""
+  for key, stages in six.iteritems(stats):
+    key_stats = _stats.setdefault(key, {})
+    for stage_, (calls, seconds) in six.iteritems(stages):
+      stage_stats = key_stats.setdefault(stage_, [0, 0.0])
+      stage_stats[0] += calls
+      stage_stats[1] += seconds
+
+
+def format_report(stats=None):
+  """Returns a string with the time per stage for each module.
+
+  Args:
+    stats: Stats as returned by `pop_stats`; defaults to those recorded so far.
+
+  Returns:
+    String with one line per module key (sorted), giving the total time, the
+    number of examples, and the time in each stage (slowest first).
+  """
+  if stats is None:
+    stats = _stats
+  lines = []
+  for key in sorted(stats, key=str):
+    stages = stats[key]
+    total = sum(seconds for _, seconds in six.itervalues(stages))
+    num_examples = stages.get('other', [0])[0]
+    ordered = sorted(six.iteritems(stages), key=lambda item: -item[1][1])
+    lines.append('{}: {:.3f}s over {} examples; {}'.format(
+        key, total, num_examples,
+        ', '.join('{} {:.3f}s ({:.1%}, {} calls)'.format(
+            stage_, seconds, seconds / max(total, 1e-9), calls)
+                  for stage_, (calls, seconds) in ordered)))
+  return '\n'.join(lines)
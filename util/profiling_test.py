@@ -0,0 +1,94 @@
+"""Tests for mathematics_dataset.util.profiling."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+# Dependency imports
+from absl.testing import absltest
+from six.moves import range
+import sympy
+from util import profiling
+
+
+@profiling.timed('inner')
+def _inner():
+  return 3
+
+
+class ProfilingTest(absltest.TestCase):
+
+  def setUp(self):
+    super(ProfilingTest, self).setUp()
+    profiling.pop_stats()
+    self.addCleanup(profiling.pop_stats)
+
+  def _enable(self):
+    # Like `profiling.enable`, but without wrapping the sympy functions.
+    self.addCleanup(setattr, profiling, '_enabled', profiling._enabled)
+    profiling._enabled = True
+
+  def testDisabled(self):
+    with profiling.module('module'):
+      with profiling.stage('outer'):
+        self.assertEqual(_inner(), 3)
+    self.assertEqual(profiling.pop_stats(), {})
+
+  def testStages(self):
+    self._enable()
+    for _ in range(2):
+      with profiling.module('module'):
+        with profiling.stage('outer'):
+          self.assertEqual(_inner(), 3)
+          self.assertEqual(_inner(), 3)
+    stats = profiling.pop_stats()
+    self.assertEqual(list(stats), ['module'])
+    calls = {stage: calls for stage, (calls, _) in stats['module'].items()}
+    self.assertEqual(calls, {'other': 2, 'outer': 2, 'inner': 4})
+    for _, seconds in stats['module'].values():
+      self.assertGreaterEqual(seconds, 0)
+
+  def testTimedPropagatesExceptions(self):
+    @profiling.timed('failing')
+    def failing():
+      raise ValueError('failed')
+    self._enable()
+    with self.assertRaises(ValueError):
+      with profiling.module('module'):
+        failing()
+    self.assertEqual(profiling.pop_stats()['module']['failing'][0], 1)
+    self.assertEqual(profiling._stack, [])
+
+  def testEnabled(self):
+    functions = [getattr(sympy, name) for name in profiling.SYMPY_FUNCTIONS]
+    gcd = sympy.gcd
+    with self.assertRaises(ValueError):
+      with profiling.enabled():
+        self.assertTrue(profiling.is_enabled())
+        self.assertIsNot(sympy.gcd, gcd)
+        with profiling.module('module'):
+          self.assertEqual(sympy.gcd(4, 6), 2)
+        raise ValueError('failed')
+    self.assertFalse(profiling.is_enabled())
+    self.assertEqual(
+        [getattr(sympy, name) for name in profiling.SYMPY_FUNCTIONS],
+        functions)
+    self.assertEqual(profiling.pop_stats()['module']['sympy'][0], 1)
+
+  def testEnabled_false(self):
+    with profiling.enabled(False):
+      self.assertFalse(profiling.is_enabled())
+
+  def testMergeStatsAndFormatReport(self):
+    profiling.merge_stats({'a': {'other': [1, 1.0], 'sympy': [3, 3.0]}})
+    profiling.merge_stats({'a': {'other': [1, 1.0]}, 'b': {'other': [2, 0.5]}})
+    report = profiling.format_report()
+    self.assertEqual(
+        report.split('\n'),
+        ['a: 5.000s over 2 examples; sympy 3.000s (60.0%, 3 calls), '
+         'other 2.000s (40.0%, 2 calls)',
+         'b: 0.500s over 2 examples; other 0.500s (100.0%, 2 calls)'])
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,173 @@
+"""Binary shard format for generated question / answer pairs.
+
+A shard stores the examples of one module in two files:
+
+*   The shard file (e.g., `algebra__linear_1d.shard`) is a sequence of records.
+    Each record is a header of two little-endian uint32s, giving the length in
+    bytes of the UTF-8 encoded question and answer, followed by the question
+    and answer bytes, zero-padded so that every record starts at a multiple of
+    `ALIGNMENT` bytes.
+*   The index file (the shard path plus `.idx`) is an array of little-endian
+    uint64s, giving the offset of each record in the shard file. The offsets
+    are appended as the records are flushed, so the shard can be read (up to
+    the last flush) while it is being written.
+
+Both files can be memory-mapped, so example `i` can be read in O(1) without
+reading the rest of the shard.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import mmap
+import os
+import struct
+
+# Dependency imports
+import numpy as np
+from six.moves import range
+
+
+ALIGNMENT = 8
+INDEX_SUFFIX = '.idx'
+
+_HEADER = struct.Struct('<II')
+_INDEX_DTYPE = np.dtype('<u8')
+
+
+def index_path(path):
+  """Returns the path of the index file belonging to the shard at `path`."""
+  return path + INDEX_SUFFIX
+
+
+class ShardWriter(object):
+  """Writes question / answer pairs to a shard and its index."""
+
+  def __init__(self, path, num_existing=0):
+    """Initializes a `ShardWriter`.
+
+    Args:
+      path: Path of the shard file to create. The index is written alongside it
+          (on `flush` and `close`).
+      num_existing: If positive, keeps the first `num_existing` records of the
+          existing shard at `path` (e.g., written and flushed by an interrupted
+          writer), truncating anything after them, and appends to it.
+
+    Raises:
+      ValueError: If the existing shard has fewer than `num_existing` records.
+    """
+    self._path = path
+    # Offsets of the records not yet written to the index.
+    self._offsets = []
+    self._num_indexed = num_existing
+    self._offset = 0
+    if not num_existing:
+      self._file = open(path, 'wb')
+      self._index_file = open(index_path(path), 'wb')
+      return
+
+    offsets = np.fromfile(index_path(path), dtype=_INDEX_DTYPE)[:num_existing]
+    self._file = open(path, 'r+b')
+    size = os.fstat(self._file.fileno()).st_size
+    if len(offsets) == num_existing:
+      self._file.seek(int(offsets[-1]))
+      question_length, answer_length = _HEADER.unpack(
+          self._file.read(_HEADER.size))
+      length = _HEADER.size + question_length + answer_length
+      self._offset = int(offsets[-1]) + length + (-length % ALIGNMENT)
+    if len(offsets) < num_existing or self._offset > size:
+      self._file.close()
+      raise ValueError('Shard {} has fewer than {} records'.format(
+          path, num_existing))
+    self._file.seek(self._offset)
+    self._file.truncate()
+    self._index_file = open(index_path(path), 'r+b')
+    self._index_file.seek(num_existing * _INDEX_DTYPE.itemsize)
+    self._index_file.truncate()
+
+  def write(self, question, answer):
+    """Appends a record containing strings `question` and `answer`."""
+    question = question.encode('utf-8')
+    answer = answer.encode('utf-8')
+    length = _HEADER.size + len(question) + len(answer)
+    padding = -length % ALIGNMENT
+    self._file.write(_HEADER.pack(len(question), len(answer)))
+    self._file.write(question)
+    self._file.write(answer)
+    self._file.write(b'\0' * padding)
+    self._offsets.append(self._offset)
+    self._offset += length + padding
+
+  def __len__(self):
+    return self._num_indexed + len(self._offsets)
+
+  def _write_index(self):
+    """Appends the offsets of the records written since to the index."""
+    self._file.flush()
+    self._index_file.write(
+        np.asarray(self._offsets, dtype=_INDEX_DTYPE).tobytes())
+    self._num_indexed += len(self._offsets)
+    self._offsets = []
+
+  def flush(self):
+    """Writes the records so far and their index durably to disk."""
+    self._write_index()
+    self._index_file.flush()
+    for file_ in (self._file, self._index_file):
+      os.fsync(file_.fileno())
+
+  def close(self):
+    """Closes the shard file, and writes the index."""
+    self._write_index()
+    self._file.close()
+    self._index_file.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *unused_exc_info):
+    self.close()
+
+
+class ShardReader(object):
+  """Random access to the question / answer pairs in a shard."""
+
+  def __init__(self, path):
+    """Initializes a `ShardReader`, memory-mapping the shard and its index."""
+    # Empty files can't be memory-mapped.
+    if os.path.getsize(index_path(path)):
+      self._offsets = np.memmap(
+          index_path(path), dtype=_INDEX_DTYPE, mode='r')
+      with open(path, 'rb') as shard_file:
+        self._data = mmap.mmap(shard_file.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+      self._offsets = np.zeros([0], dtype=_INDEX_DTYPE)
+      self._data = b''
+
+  def __len__(self):
+    return len(self._offsets)
+
+  def __getitem__(self, index):
+    """Returns pair `(question, answer)` of strings for example `index`."""
+    offset = int(self._offsets[index])
+    question_length, answer_length = _HEADER.unpack_from(self._data, offset)
+    start = offset + _HEADER.size
+    middle = start + question_length
+    end = middle + answer_length
+    return (self._data[start:middle].decode('utf-8'),
+            self._data[middle:end].decode('utf-8'))
+
+  def __iter__(self):
+    for index in range(len(self)):
+      yield self[index]
+
+  def close(self):
+    if isinstance(self._data, mmap.mmap):
+      self._data.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *unused_exc_info):
+    self.close()
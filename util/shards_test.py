@@ -0,0 +1,72 @@
+"""Tests for mathematics_dataset.util.shards."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+
+# Dependency imports
+from absl.testing import absltest
+from util import shards
+
+
+class ShardsTest(absltest.TestCase):
+
+  def setUp(self):
+    super(ShardsTest, self).setUp()
+    self._dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self._dir)
+
+  def testWriteAndRead(self):
+    path = os.path.join(self._dir, 'module.shard')
+    examples = [
+        ('Вычислите 2 + 3.', '5'),
+        ('', ''),
+        ('Решите -3*x = 6 для x.', '-2'),
+    ]
+    with shards.ShardWriter(path) as writer:
+      for question, answer in examples:
+        writer.write(question, answer)
+      self.assertLen(writer, 3)
+
+    self.assertEqual(os.path.getsize(path) % shards.ALIGNMENT, 0)
+    with shards.ShardReader(path) as reader:
+      self.assertLen(reader, 3)
+      self.assertEqual(reader[2], examples[2])
+      self.assertEqual(reader[0], examples[0])
+      self.assertEqual(reader[-1], examples[-1])
+      self.assertEqual(list(reader), examples)
+
+  def testResume(self):
+    path = os.path.join(self._dir, 'module.shard')
+    writer = shards.ShardWriter(path)
+    writer.write('1 + 1', '2')
+    writer.write('2 + 2', '4')
+    writer.flush()
+    with shards.ShardReader(path) as reader:
+      self.assertEqual(list(reader), [('1 + 1', '2'), ('2 + 2', '4')])
+    writer.write('3 + 3', '6')  # Not flushed.
+    del writer  # Interrupted before closing.
+
+    with shards.ShardWriter(path, num_existing=2) as writer:
+      self.assertLen(writer, 2)
+      writer.write('4 + 4', '8')
+    with shards.ShardReader(path) as reader:
+      self.assertEqual(list(reader), [('1 + 1', '2'), ('2 + 2', '4'),
+                                      ('4 + 4', '8')])
+    with self.assertRaisesRegexp(ValueError, 'fewer than 4 records'):
+      shards.ShardWriter(path, num_existing=4)
+
+  def testEmpty(self):
+    path = os.path.join(self._dir, 'module.shard')
+    shards.ShardWriter(path).close()
+    with shards.ShardReader(path) as reader:
+      self.assertEmpty(reader)
+      self.assertEqual(list(reader), [])
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,143 @@
+"""Encoding of questions and answers as padded arrays of character indices.
+
+Characters are mapped to indices with `generate_settings.CHAR_TO_INDEX`, and
+arrays are padded with `generate_settings.EMPTY_INDEX` up to
+`MAX_QUESTION_LENGTH` (for questions) or `MAX_ANSWER_LENGTH` (for answers).
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+
+# Dependency imports
+import generate_settings
+import numpy as np
+from six.moves import range
+from six.moves import zip
+
+
+QUESTIONS_SUFFIX = '.questions.npy'
+ANSWERS_SUFFIX = '.answers.npy'
+
+assert generate_settings.NUM_INDICES <= 256
+_DTYPE = np.uint8
+
+# Lookup table from unicode code point to index (or -1 if not allowed).
+_CODE_POINT_TO_INDEX = np.full(
+    [max(ord(char) for char in generate_settings.QUESTION_CHARS if char) + 1],
+    -1, dtype=np.int32)
+for _char, _index in generate_settings.CHAR_TO_INDEX.items():
+  if _char:
+    _CODE_POINT_TO_INDEX[ord(_char)] = _index
+_INDEX_TO_CHAR = np.array(
+    [generate_settings.INDEX_TO_CHAR[index]
+     for index in range(generate_settings.NUM_INDICES)])
+
+
+def encode(text, length, out=None):
+  """Returns `text` as a uint8 array of character indices, padded to `length`.
+
+  Args:
+    text: String.
+    length: Integer; the length of the returned array.
+    out: Optional uint8 array of shape `[length]` to write into.
+
+  Returns:
+    uint8 array of shape `[length]`.
+
+  Raises:
+    ValueError: If `text` is longer than `length`, or contains characters not
+        in `generate_settings.QUESTION_CHARS`.
+  """
+  if len(text) > length:
+    raise ValueError('Text of length {} exceeds {}: {}'
+                     .format(len(text), length, text))
+  code_points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+  if code_points.size and code_points.max() >= len(_CODE_POINT_TO_INDEX):
+    indices = -np.ones(code_points.shape, dtype=np.int32)
+  else:
+    indices = _CODE_POINT_TO_INDEX[code_points]
+  if np.any(indices < 0):
+    unknown = sorted(set(text) - set(generate_settings.CHAR_TO_INDEX))
+    raise ValueError('Unknown characters {} in: {}'.format(unknown, text))
+  if out is None:
+    out = np.empty([length], dtype=_DTYPE)
+  out[:len(indices)] = indices
+  out[len(indices):] = generate_settings.EMPTY_INDEX
+  return out
+
+
+def decode(indices):
+  """Returns the string encoded by the array `indices` (inverse of `encode`)."""
+  return ''.join(_INDEX_TO_CHAR[np.asarray(indices)])
+
+
+class ArrayWriter(object):
+  """Writes encoded questions and answers to memory-mapped `.npy` files.
+
+  The questions are written to `path + QUESTIONS_SUFFIX` with shape
+  `[count, MAX_QUESTION_LENGTH]`, and the answers to `path + ANSWERS_SUFFIX`
+  with shape `[count, MAX_ANSWER_LENGTH]`. If fewer than `count` examples are
+  written, the arrays are truncated on `close`.
+
+  Passing `num_existing` reopens the arrays of an interrupted writer (that were
+  not closed), keeping their first `num_existing` examples.
+  """
+
+  def __init__(self, path, count, num_existing=0):
+    self._paths = (path + QUESTIONS_SUFFIX, path + ANSWERS_SUFFIX)
+    self._lengths = (generate_settings.MAX_QUESTION_LENGTH,
+                     generate_settings.MAX_ANSWER_LENGTH)
+    if num_existing:
+      self._arrays = [np.lib.format.open_memmap(array_path, mode='r+')
+                      for array_path in self._paths]
+      for array, length in zip(self._arrays, self._lengths):
+        if array.shape != (count, length) or array.dtype != _DTYPE:
+          raise ValueError('Cannot resume array of shape {} and dtype {}'
+                           .format(array.shape, array.dtype))
+    else:
+      self._arrays = [
+          np.lib.format.open_memmap(
+              array_path, mode='w+', dtype=_DTYPE, shape=(count, length))
+          for array_path, length in zip(self._paths, self._lengths)]
+    self._count = num_existing
+
+  def write(self, question, answer):
+    """Encodes and appends strings `question` and `answer`."""
+    questions, answers = self._arrays
+    if self._count >= len(questions):
+      raise ValueError('Already written {} examples'.format(self._count))
+    encode(question, self._lengths[0], out=questions[self._count])
+    encode(answer, self._lengths[1], out=answers[self._count])
+    self._count += 1
+
+  def __len__(self):
+    return self._count
+
+  def flush(self):
+    """Flushes the examples written so far to disk."""
+    for array in self._arrays:
+      array.flush()
+
+  def close(self):
+    """Flushes the arrays, truncating them to the number of examples written."""
+    for array_path, array in zip(self._paths, self._arrays):
+      array.flush()
+      if self._count < len(array):
+        truncated_path = array_path + '.tmp'
+        truncated = np.lib.format.open_memmap(
+            truncated_path, mode='w+', dtype=_DTYPE,
+            shape=(self._count,) + array.shape[1:])
+        truncated[:] = array[:self._count]
+        truncated.flush()
+        del truncated
+        os.rename(truncated_path, array_path)
+    self._arrays = []
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *unused_exc_info):
+    self.close()
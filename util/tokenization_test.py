@@ -0,0 +1,74 @@
+"""Tests for mathematics_dataset.util.tokenization."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+
+# Dependency imports
+from absl.testing import absltest
+import generate_settings
+import numpy as np
+from util import tokenization
+
+
+class TokenizationTest(absltest.TestCase):
+
+  def testEncodeDecode(self):
+    text = 'Вычислите -2 + 3*x, ёлка.'
+    encoded = tokenization.encode(text, 40)
+    self.assertEqual(encoded.dtype, np.uint8)
+    self.assertEqual(encoded.shape, (40,))
+    self.assertEqual(encoded[0], generate_settings.CHAR_TO_INDEX['В'])
+    self.assertTrue(np.all(encoded[len(text):] == generate_settings.EMPTY_INDEX))
+    self.assertEqual(tokenization.decode(encoded), text)
+
+  def testEncode_errors(self):
+    with self.assertRaisesRegex(ValueError, 'exceeds'):
+      tokenization.encode('12345', 4)
+    with self.assertRaisesRegex(ValueError, 'Unknown characters'):
+      tokenization.encode('2 × 3', 10)
+    with self.assertRaisesRegex(ValueError, 'Unknown characters'):
+      tokenization.encode('\U0001f600', 10)
+
+  def testArrayWriter(self):
+    directory = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, directory)
+    path = os.path.join(directory, 'module')
+    with tokenization.ArrayWriter(path, 3) as writer:
+      writer.write('Сколько будет 2 + 2?', '4')
+      writer.write('Решите x = 1 для x.', '1')
+
+    questions = np.load(path + tokenization.QUESTIONS_SUFFIX, mmap_mode='r')
+    answers = np.load(path + tokenization.ANSWERS_SUFFIX, mmap_mode='r')
+    self.assertEqual(questions.shape,
+                     (2, generate_settings.MAX_QUESTION_LENGTH))
+    self.assertEqual(answers.shape, (2, generate_settings.MAX_ANSWER_LENGTH))
+    self.assertEqual(tokenization.decode(questions[1]), 'Решите x = 1 для x.')
+    self.assertEqual(tokenization.decode(answers[0]), '4')
+
+  def testArrayWriter_resume(self):
+    directory = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, directory)
+    path = os.path.join(directory, 'module')
+    writer = tokenization.ArrayWriter(path, 3)
+    writer.write('1 + 1', '2')
+    writer.write('2 + 2', '4')
+    writer.flush()
+    del writer  # Interrupted before closing.
+
+    with tokenization.ArrayWriter(path, 3, num_existing=1) as writer:
+      self.assertLen(writer, 1)
+      writer.write('3 + 3', '6')
+    questions = np.load(path + tokenization.QUESTIONS_SUFFIX)
+    self.assertEqual([tokenization.decode(question) for question in questions],
+                     ['1 + 1', '3 + 3'])
+    with self.assertRaisesRegex(ValueError, 'Cannot resume'):
+      tokenization.ArrayWriter(path, 3, num_existing=1)
+
+
+if __name__ == '__main__':
+  absltest.main()